@@ -0,0 +1,52 @@
+"""
+임베딩 실행기(EmbeddingExecutor) 처리량 벤치마크: 워커 수 x 배치 크기 조합별 docs/sec
+
+실행: Backend 디렉토리에서
+  `python benchmarks/bench_embedding_executor.py --docs 20000 --workers 1 2 4 --batch-sizes 64 256`
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.embedding_executor import EmbeddingExecutor  # noqa: E402
+
+
+def synthetic_texts(count, seed=0):
+    """커밋/이슈 문서처럼 길이가 제각각인 텍스트"""
+    rng = random.Random(seed)
+    words = ["fix", "add", "update", "remove", "refactor", "issue", "module", "test", "docs", "build"]
+    return [
+        f"Commit: {' '.join(rng.choice(words) for _ in range(rng.randint(3, 120)))}, Author: author{i % 50}"
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=10_000)
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[64, 256])
+    args = parser.parse_args()
+
+    texts = synthetic_texts(args.docs)
+    results = []
+    for workers in args.workers:
+        for batch_size in args.batch_sizes:
+            executor = EmbeddingExecutor(args.model, workers=workers, batch_size=batch_size)
+            # 워커의 모델 로드 시간은 제외
+            executor.embed(texts[:workers * batch_size])
+            executor.embed(texts)
+            results.append(executor.last_stats)
+            executor.shutdown()
+
+    print(f"\n{'workers':>8} {'batch':>6} {'seconds':>9} {'docs/s':>10}")
+    for stats in results:
+        print(f"{stats['workers']:>8} {stats['batch_size']:>6} {stats['seconds']:>9.2f} {stats['docs_per_sec']:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+로컬 GitHub API 대역 서버를 띄워 순차 수집(기존 방식)과 비동기 병렬 스트리밍 수집을 비교하는 벤치마크
+
+실행: Backend 디렉토리에서 `python benchmarks/bench_github_ingest.py --pages 20 --latency 0.05`
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.github_client import stream_project_pages  # noqa: E402
+
+
+def make_handler(pages, latency):
+    """리소스마다 `pages`개의 페이지를 Link 헤더와 함께 돌려주는 핸들러"""
+
+    def item(resource, page, i):
+        n = page * 1000 + i
+        if resource == "commits":
+            return {"sha": f"{n:040x}", "author": {"login": "bench"},
+                    "commit": {"author": {"date": "2024-01-01T00:00:00Z"}, "message": f"commit {n}"}}
+        return {"id": n, "title": f"{resource} {n}", "state": "open", "user": {"login": "bench"},
+                "created_at": "2024-01-01T00:00:00Z", "merged_at": None, "closed_at": None}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            url = urlparse(self.path)
+            parts = url.path.strip("/").split("/")
+            query = parse_qs(url.query)
+            if len(parts) == 3:
+                body = {"id": 1, "name": parts[2], "owner": {"login": parts[1]}}
+                headers = {}
+            else:
+                resource = parts[3]
+                page = int(query.get("page", ["1"])[0])
+                per_page = int(query.get("per_page", ["30"])[0])
+                body = [item(resource, page, i) for i in range(per_page)] if page <= pages else []
+                base = f"http://{self.headers['Host']}{url.path}?per_page={per_page}"
+                headers = {"Link": f'<{base}&page={min(page + 1, pages)}>; rel="next", <{base}&page={pages}>; rel="last"'}
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+def fetch_sequential(base_url, owner, repo):
+    """기존 github_service 방식: 리소스/페이지를 하나씩, 매번 새 연결로 요청"""
+
+    def fetch_all_data(url, params=None):
+        all_data, page = [], 1
+        params = dict(params or {})
+        while True:
+            params.update({"per_page": 100, "page": page})
+            response = requests.get(url, params=params)
+            data = response.json()
+            if response.status_code != 200 or not data:
+                break
+            all_data.extend(data)
+            page += 1
+        return all_data
+
+    repo_url = f"{base_url}/repos/{owner}/{repo}"
+    requests.get(repo_url).json()
+    return {
+        "commits": fetch_all_data(f"{repo_url}/commits"),
+        "pull_requests": fetch_all_data(f"{repo_url}/pulls", {"state": "all"}),
+        "issues": fetch_all_data(f"{repo_url}/issues"),
+    }
+
+
+def fetch_streaming(base_url, owner, repo, max_concurrency):
+    """download_project와 같은 경로: 페이지를 받는 즉시 콜백으로 넘기고 보관하지 않음. 테이블별 행 수 반환"""
+    rows = {"commits": 0, "pull_requests": 0, "issues": 0}
+
+    def counter(table):
+        def on_page(page, items, last_page):
+            rows[table] += len(items)
+        return on_page
+
+    handlers = {table: counter(table) for table in rows}
+    asyncio.run(stream_project_pages(owner, repo, handlers, base_url=base_url, max_concurrency=max_concurrency))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="요청당 인위적 지연(초)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.pages, args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    start = time.perf_counter()
+    data = fetch_sequential(base_url, "bench", "repo")
+    elapsed = time.perf_counter() - start
+    rows = sum(len(v) for v in data.values())
+    print(f"sequential          : {elapsed:7.2f}s  ({rows} rows)")
+
+    for concurrency in args.concurrency:
+        start = time.perf_counter()
+        data = fetch_streaming(base_url, "bench", "repo", concurrency)
+        elapsed = time.perf_counter() - start
+        rows = sum(data.values())
+        print(f"async concurrency={concurrency:<3}: {elapsed:7.2f}s  ({rows} rows)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+변경분 반영(apply_changes + save_vectorstore) 단계별 시간: 문서 수 대비 변경 수가 적을 때
+docstore 패치(patch_compact_docstore)와 전체 재기록(write_compact_docstore) 비교,
+그리고 버전마다 전체를 기록해야 하는 인덱스 파일과 metadata.sqlite 복사 비용 측정
+
+실행: Backend 디렉토리에서 `python benchmarks/bench_incremental_update.py --docs 500000 --changes 100`
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.compact_docstore import CompactDocstore, patch_compact_docstore, write_compact_docstore  # noqa: E402
+from services.index_factory import build_index  # noqa: E402
+from services.vector_files import read_index  # noqa: E402
+
+
+def timed(label, fn, results):
+    start = time.perf_counter()
+    value = fn()
+    results.append((label, time.perf_counter() - start))
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=200_000)
+    parser.add_argument("--changes", type=int, default=100)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--text-bytes", type=int, default=1000)
+    args = parser.parse_args()
+
+    import faiss
+
+    rng = np.random.default_rng(0)
+    keys = [f"issue:{i}" for i in range(args.docs)]
+    texts = [f"document {i} " + "x" * args.text_bytes for i in range(args.docs)]
+    vectors = rng.standard_normal((args.docs, args.dim)).astype(np.float32)
+    changed = rng.choice(args.docs, args.changes // 2, replace=False)
+    new_ids = np.arange(args.docs, args.docs + args.changes - len(changed))
+    labels = np.concatenate([changed, new_ids]).astype(np.int64)
+    change_keys = [keys[i] if i < args.docs else f"issue:{i}" for i in labels]
+    change_texts = [f"edited {i}" for i in labels]
+    change_vectors = rng.standard_normal((len(labels), args.dim)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source, target, full = (os.path.join(tmp, name) for name in ("source", "target", "full"))
+        index, _ = build_index(vectors, ids=np.arange(args.docs), updatable=True)
+        os.makedirs(source)
+        faiss.write_index(index, os.path.join(source, "index.faiss"))
+        write_compact_docstore(source, keys, texts, labels=np.arange(args.docs))
+        # metadata.sqlite 대신 비슷한 크기의 파일로 복사 비용만 측정
+        with open(os.path.join(source, "metadata.sqlite"), "wb") as f:
+            f.write(os.urandom(args.docs * (args.text_bytes // 2)))
+
+        results = []
+        index = timed("index load (read_index)", lambda: read_index(os.path.join(source, "index.faiss"), mmap=False), results)
+        docstore = CompactDocstore(source)
+        timed("key lookup (changed keys)", lambda: [docstore.row_for_key(key) for key in change_keys], results)
+        timed("index remove_ids + add_with_ids", lambda: (
+            index.remove_ids(changed.astype(np.int64)), index.add_with_ids(change_vectors, labels),
+        ), results)
+        os.makedirs(target)
+        timed("index write (full file)", lambda: faiss.write_index(index, os.path.join(target, "index.faiss")), results)
+        timed("docstore patch", lambda: patch_compact_docstore(source, target, change_keys, change_texts, labels), results)
+        timed("metadata.sqlite copy", lambda: shutil.copy2(
+            os.path.join(source, "metadata.sqlite"), os.path.join(target, "metadata.sqlite"),
+        ), results)
+
+        # 비교: 모든 문서를 디코딩해 다시 기록하는 전체 재기록
+        def full_rewrite():
+            merged = dict(zip(keys, texts))
+            merged.update(zip(change_keys, change_texts))
+            all_keys = keys + change_keys[len(changed):]
+            write_compact_docstore(full, all_keys, [merged[key] for key in all_keys], labels=np.arange(len(all_keys)))
+        timed("docstore full rewrite (comparison)", full_rewrite, results)
+
+        sizes = {name: os.path.getsize(os.path.join(target, name)) / (1024 * 1024) for name in ("index.faiss", "metadata.sqlite")}
+
+    print(f"\n{args.docs} documents, {args.changes} changed/added")
+    print(f"{'stage':<36} {'seconds':>8}")
+    for label, seconds in results:
+        print(f"{label:<36} {seconds:>8.3f}")
+    print(f"index.faiss {sizes['index.faiss']:.1f} MB, metadata.sqlite {sizes['metadata.sqlite']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
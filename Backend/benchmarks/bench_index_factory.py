@@ -0,0 +1,60 @@
+"""
+인덱스 종류별 검색 지연 시간과 recall@k 비교 (기준: 정확한 Flat 검색)
+
+실행: Backend 디렉토리에서 `python benchmarks/bench_index_factory.py --vectors 500000 --dim 384`
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.index_factory import build_index, choose_index_config  # noqa: E402
+
+
+def clustered_vectors(count, dim, clusters=1000, seed=0):
+    """임베딩처럼 군집을 이루는 합성 벡터"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, count)
+    return centers[labels] + 0.3 * rng.standard_normal((count, dim)).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", nargs="+", default=["flat", "auto", "ivf", "hnsw", "ivfpq"])
+    args = parser.parse_args()
+
+    vectors = clustered_vectors(args.vectors, args.dim)
+    queries = clustered_vectors(args.queries, args.dim, seed=1)
+
+    exact = None
+    print(f"{'type':>8} {'build s':>8} {'ms/query':>9} {'recall@k':>9}")
+    for index_type in args.types:
+        config = choose_index_config(args.vectors, args.dim, index_type=index_type)
+        start = time.perf_counter()
+        index, config = build_index(vectors, config=config)
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, labels = index.search(queries, args.k)
+        ms_per_query = (time.perf_counter() - start) * 1000 / args.queries
+
+        if exact is None and config["type"] == "flat":
+            exact = labels
+        recall = (
+            np.mean([len(set(a) & set(b)) / args.k for a, b in zip(labels, exact)]) if exact is not None else float("nan")
+        )
+        label = f"{index_type}" if index_type != "auto" else f"auto:{config['type']}"
+        print(f"{label:>8} {build_seconds:>8.1f} {ms_per_query:>9.3f} {recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+합성 커밋 테이블로 CSV와 Parquet의 저장 크기, 전체/컬럼 선택 로드 시간을 비교하는 벤치마크
+
+실행: Backend 디렉토리에서 `python benchmarks/bench_storage_load.py --rows 200000`
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.project_store import read_table, write_rows  # noqa: E402
+
+COLUMNS = ["ID", "Author", "Date", "Message"]
+
+
+def synthetic_commits(rows):
+    for i in range(rows):
+        yield [
+            f"{i:040x}",
+            f"author{i % 50}",
+            f"2024-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}T12:00:00Z",
+            f"Fix issue #{i} in module {i % 97}\n\nLonger commit body describing change {i}",
+        ]
+
+
+def timed(label, fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<36}: {best * 1000:8.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = Path(tmp)
+        write_rows(project_dir / "csv" / "bench_commits.csv", "commits", COLUMNS, synthetic_commits(args.rows))
+        write_rows(project_dir / "parquet" / "bench_commits.parquet", "commits", COLUMNS, synthetic_commits(args.rows))
+
+        for fmt in ("csv", "parquet"):
+            size = (project_dir / fmt / f"bench_commits.{fmt}").stat().st_size
+            print(f"{fmt:<8} size: {size / 1e6:8.1f} MB")
+
+        timed("csv      read (all columns)", lambda: pd.read_csv(project_dir / "csv" / "bench_commits.csv"))
+        timed("csv      read (Author, Date)",
+              lambda: pd.read_csv(project_dir / "csv" / "bench_commits.csv", usecols=["Author", "Date"],
+                                  parse_dates=["Date"]))
+        timed("parquet  read (all columns)", lambda: read_table(project_dir, "bench", "commits"))
+        timed("parquet  read (Author, Date)", lambda: read_table(project_dir, "bench", "commits", ["Author", "Date"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+인덱스/임베딩 로드 시간과 RSS 비교: 일반 읽기 vs 메모리 매핑, float32 vs float16 vs int8
+(RSS는 프로세스마다 측정해야 하므로 각 조합을 별도 프로세스에서 로드)
+
+실행: Backend 디렉토리에서 `python benchmarks/bench_vector_load.py --vectors 1000000 --dim 384`
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.index_factory import build_index, choose_index_config  # noqa: E402
+from services.vector_files import LoadTimer, load_vectors, read_index, save_vectors  # noqa: E402
+
+
+def child(kind, path, mmap):
+    """한 조합을 로드하고 첫 검색/조회까지의 시간과 RSS를 JSON으로 출력"""
+    timer = LoadTimer()
+    if kind == "index":
+        index = read_index(path, mmap=mmap)
+        index.search(np.zeros((1, index.d), dtype=np.float32), 10)
+    else:
+        vectors = load_vectors(path, mmap=mmap)
+        vectors.get(slice(0, 10))
+    print(json.dumps(timer.stop()))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, default=500_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--child", nargs=3, metavar=("KIND", "PATH", "MMAP"))
+    args = parser.parse_args()
+
+    if args.child:
+        kind, path, mmap = args.child
+        child(kind, path, mmap == "1")
+        return
+
+    import faiss
+
+    vectors = np.random.default_rng(0).standard_normal((args.vectors, args.dim)).astype(np.float32)
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = []
+        for precision in ("float32", "float16", "int8"):
+            path = os.path.join(tmp, f"embeddings_{precision}.npy")
+            save_vectors(path, vectors, precision)
+            cases.append((f"embeddings {precision}", "vectors", path))
+            for index_type in ("flat", "ivf"):
+                config = choose_index_config(args.vectors, args.dim, index_type=index_type, precision=precision)
+                index, _ = build_index(vectors, config=config)
+                path = os.path.join(tmp, f"{index_type}_{precision}.faiss")
+                faiss.write_index(index, path)
+                cases.append((f"{index_type} index {precision}", "index", path))
+
+        print(f"\n{'case':<26} {'mmap':>5} {'size MB':>8} {'load s':>7} {'RSS +MB':>8}")
+        for label, kind, path in cases:
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            for mmap in ("0", "1"):
+                output = subprocess.run(
+                    [sys.executable, __file__, "--child", kind, path, mmap],
+                    capture_output=True, text=True, check=True,
+                ).stdout.strip().splitlines()[-1]
+                stats = json.loads(output)
+                print(f"{label:<26} {mmap:>5} {size_mb:>8.1f} {stats['seconds']:>7.3f} {stats['rss_delta_mb'] or 0:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
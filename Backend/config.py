@@ -10,4 +10,54 @@ class Settings:
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
     DEFAULT_CHAT_MODEL: str = "gpt-4o-mini"
 
+    # GitHub 수집 설정
+    GITHUB_API_URL: str = os.getenv("GITHUB_API_URL", "https://api.github.com")
+    GITHUB_MAX_CONCURRENCY: int = int(os.getenv("GITHUB_MAX_CONCURRENCY", "8"))
+    GITHUB_TIMEOUT: float = float(os.getenv("GITHUB_TIMEOUT", "30"))
+
+    # 프로젝트 데이터 저장 형식 ("parquet" 또는 "csv")
+    STORAGE_FORMAT: str = os.getenv("STORAGE_FORMAT", "parquet")
+
+    # 벡터 DB 구축 설정
+    EMBED_BATCH_SIZE: int = int(os.getenv("EMBED_BATCH_SIZE", "256"))
+    # 임베딩 워커 프로세스 수 (1 이하이면 현재 프로세스에서 임베딩)
+    EMBED_WORKERS: int = int(os.getenv("EMBED_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+    # 동시에 실행할 저장소 가져오기(다운로드 + 임베딩) 작업 수
+    BUILD_MAX_WORKERS: int = int(os.getenv("BUILD_MAX_WORKERS", "2"))
+
+    # FAISS 인덱스 종류 ("auto", "flat", "ivf", "hnsw", "ivfpq")와 자동 선택 기준
+    INDEX_TYPE: str = os.getenv("INDEX_TYPE", "auto")
+    INDEX_MEMORY_BUDGET_MB: int = int(os.getenv("INDEX_MEMORY_BUDGET_MB", "2048"))
+    INDEX_LATENCY_BUDGET_MS: float = float(os.getenv("INDEX_LATENCY_BUDGET_MS", "10"))
+    # 인덱스/임베딩 벡터 저장 정밀도 ("float32", "float16", "int8")
+    VECTOR_PRECISION: str = os.getenv("VECTOR_PRECISION", "float32")
+    # 인덱스를 메모리 매핑으로 읽기 (여러 프로세스가 페이지 캐시 공유)
+    INDEX_MMAP: bool = os.getenv("INDEX_MMAP", "true").lower() in ("1", "true", "yes")
+
+    # 메모리에 유지할 프로젝트 인덱스의 총 크기 (넘으면 가장 오래 사용하지 않은 프로젝트부터 내림)
+    INDEX_CACHE_MEMORY_MB: int = int(os.getenv("INDEX_CACHE_MEMORY_MB", "2048"))
+
+    # 보관할 벡터 스토어 버전 수 (현재 버전 포함)와 API가 새 버전을 확인하는 간격
+    INDEX_VERSIONS_KEEP: int = int(os.getenv("INDEX_VERSIONS_KEEP", "2"))
+    INDEX_RELOAD_CHECK_SECONDS: float = float(os.getenv("INDEX_RELOAD_CHECK_SECONDS", "5"))
+
+    # 임베딩 캐시 (모델 + 텍스트 해시 → 벡터)
+    EMBEDDING_CACHE_DIR: str = os.getenv(
+        "EMBEDDING_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "embeddings")
+    )
+    EMBEDDING_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "2000000"))
+
+    # /chat 프롬프트에 넣을 검색 컨텍스트의 최대 토큰 수 (대상 모델의 토크나이저 기준)
+    CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+
+    # /chat 응답 캐시: 최대 항목 수, 유효 시간, 같은 질문으로 볼 쿼리 임베딩의 코사인 유사도
+    ANSWER_CACHE_MAX_ENTRIES: int = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+    ANSWER_CACHE_TTL_SECONDS: float = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+    ANSWER_CACHE_SIMILARITY: float = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+
+    # 검색 쿼리 임베딩: 메모리 LRU 캐시 크기, 동시에 들어온 쿼리를 묶는 최대 배치 크기와 대기 시간
+    QUERY_CACHE_SIZE: int = int(os.getenv("QUERY_CACHE_SIZE", "10000"))
+    QUERY_BATCH_MAX: int = int(os.getenv("QUERY_BATCH_MAX", "32"))
+    QUERY_BATCH_WAIT_MS: float = float(os.getenv("QUERY_BATCH_WAIT_MS", "2"))
+
 settings = Settings()
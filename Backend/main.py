@@ -1,6 +1,13 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from routes import chat, project_load, github_data
+from routes import chat, project_load, github_data, metrics
+from services.metrics import REGISTRY
+
+# 스트리밍 응답은 헤더를 보낼 때까지(첫 바이트)의 시간
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "chatbot_http_request_seconds", "HTTP request latency until the response starts", ("method", "route", "status"),
+)
 
 app = FastAPI()
 
@@ -19,9 +26,24 @@ app.add_middleware(
     allow_headers=["*"],  # 허용할 HTTP 헤더
 )
 
+
+@app.middleware("http")
+async def record_request_time(request: Request, call_next):
+    """라우트(경로 템플릿)별 요청 처리 시간 기록"""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - start,
+        method=request.method, route=route.path if route is not None else "unmatched", status=response.status_code,
+    )
+    return response
+
+
 app.include_router(chat.router)
 app.include_router(project_load.router)
 app.include_router(github_data.router)
+app.include_router(metrics.router)
 
 if __name__ == "__main__":
     import uvicorn
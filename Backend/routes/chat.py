@@ -1,38 +1,245 @@
 # app/routes/chat.py
-from fastapi import APIRouter, HTTPException
-from services.vectorstore import VectorStoreService
-from services.openai_service import OpenAIService
+import asyncio
+import time
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from services.answer_cache import ANSWER_CACHE, params_key
+from services.context_builder import build_context
+from services.index_registry import INDEX_REGISTRY
+from services.metrics import record, span, start_timings, timings_ms
+from services.model_registry import model_stats
+from services.query_encoder import get_query_encoder, normalize_query
+from services.openai_service import ERROR_MESSAGE, OpenAIService
+from services.progress import sse
+from services.search_filters import normalize_filters
+from services.single_flight import SingleFlight
 
 router = APIRouter()
-vectorstore_service = VectorStoreService()
 openai_service = OpenAIService()
+# 같은 질문/프로젝트/파라미터로 동시에 들어온 /chat 요청은 검색과 LLM 생성을 한 번만 실행
+chat_flights = SingleFlight(error_event={"type": "error", "error": ERROR_MESSAGE})
 
-@router.post("/chat")
-def chat_endpoint(query: str, model_name: str = "gpt-4o-mini", temperature: float = 0.1, top_p: float = 1.0, k: int = 20):
+
+def project_vectorstore(project: Optional[str] = Query(None, description="프로젝트 (storage의 저장소 이름, 없으면 기본 벡터 스토어)")):
+    """프로젝트의 벡터 스토어 (처음 사용할 때 로드, 메모리 예산 안에서 유지)"""
+    try:
+        return INDEX_REGISTRY.get(project)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def search_filters(
+    type: Optional[List[str]] = Query(None, description="문서 타입 (issue, pull_request, commit)"),
+    state: Optional[List[str]] = Query(None, description="상태 (open, closed 등)"),
+    author: Optional[List[str]] = Query(None, description="작성자"),
+    date_from: Optional[str] = Query(None, description="시작 날짜 (ISO 8601, 포함)"),
+    date_to: Optional[str] = Query(None, description="끝 날짜 (ISO 8601, 제외. 날짜만 주면 그날까지 포함)"),
+):
+    """검색 필터 쿼리 파라미터 (여러 값은 ?type=issue&type=pull_request 형식)"""
+    return normalize_filters(type, state, author, date_from, date_to)
+
+
+@router.get("/search")
+def search_endpoint(query: str, k: int = 20, filters: Optional[dict] = Depends(search_filters),
+                    vectorstore_service=Depends(project_vectorstore),
+                    timings: bool = Query(False, description="true이면 단계별 소요 시간(ms) 포함")):
+    """필터를 적용한 유사 문서 검색 (문서 내용과 메타데이터 반환)"""
+    stage_timings = start_timings()
+    try:
+        results = vectorstore_service.similarity_search(query, k=k, filters=filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = {
+        "query": query,
+        "filters": filters,
+        "results": [{"content": doc.page_content, "metadata": doc.metadata} for doc in results],
+    }
+    if timings:
+        response["timings"] = timings_ms(stage_timings)
+    return response
+
+
+def build_prompt(query, results, model_name, max_context_tokens=None):
+    """
+    검색 결과로 (컨텍스트 정보, 프롬프트) 생성. 중복 문서를 합치고 토큰 예산 안에서 순위가 높은 문서부터 채움
+    """
+    context = build_context(results, model_name, max_context_tokens)
+    return context, f"Context:\n{context['context']}\n\nQuestion:\n{query}\n\nAnswer:"
+
+
+def context_fields(context):
+    """응답에 포함할 컨텍스트 정보 (사용한 문서와 토큰 수)"""
+    return {
+        "context": context["context"],
+        "context_tokens": context["tokens"],
+        "context_documents": context["documents"],
+        "context_duplicates": context["duplicates"],
+        "context_dropped": context["dropped"],
+    }
+
+
+async def retrieve(vectorstore_service, query, k, filters, query_vector=None):
+    """
+    유사 문서 검색 (필터는 FAISS 검색 안에서 적용). 실패하면 (None, 오류 메시지)
+    """
     try:
-        # VectorStore에서 유사 문서 검색
-        results = vectorstore_service.similarity_search(query, k=k)
+        return await vectorstore_service.asimilarity_search(query, k=k, filters=filters, query_vector=query_vector), None
+    except ValueError as e:
+        return None, str(e)
     except KeyError as e:
         print(f"KeyError during similarity_search: {e}")
-        return {"error": "문서 검색 중 오류가 발생했습니다."}
+        return None, "문서 검색 중 오류가 발생했습니다."
     except Exception as e:
         print(f"Unexpected error during similarity_search: {e}")
-        return {"error": "문서 검색 중 예상치 못한 오류가 발생했습니다."}
-
-    # 검색 결과의 문서 내용 합치기
-    context = ""
-    for doc in results:
-        doc_id = doc.metadata.get('id', 'Unknown')
-        if isinstance(doc_id, (int,)):
-            doc_id_str = vectorstore_service.index_to_docstore_id.get(int(doc_id), 'Unknown')
-            print(f"문서 ID (변환 전): {doc_id}, 타입: {type(doc_id)}")
-            print(f"문서 ID (변환 후): {doc_id_str}, 타입: {type(doc_id_str)}")
-            context += f"- {vectorstore_service.get_document_content(doc_id_str)}\n"
-        else:
-            context += f"- {doc.page_content}\n"
-
-    # OpenAI API 호출
-    prompt = f"Context:\n{context}\n\nQuestion:\n{query}\n\nAnswer:"
-    answer = openai_service.query_openai(prompt, model_name=model_name, temperature=temperature, top_p=top_p)
-
-    return {"query": query, "response": answer, "context": context}
+        return None, "문서 검색 중 예상치 못한 오류가 발생했습니다."
+
+
+async def chat_events(vectorstore_service, query, model_name, temperature, top_p, k, max_context_tokens, filters,
+                      use_cache, cache_params):
+    """
+    /chat 처리 과정을 이벤트로 내보내는 비동기 제너레이터:
+    context(검색된 컨텍스트) → token(생성되는 텍스트 조각)... → done(전체 응답), 실패하면 error.
+    같은 프로젝트/인덱스 버전/파라미터에서 비슷한 질문의 응답이 캐시에 있으면 검색과 LLM 호출 없이 반환
+    """
+    # 단계별 소요 시간 (done 이벤트에 포함, 검색 스레드의 시간도 함께 모임)
+    stage_timings = start_timings()
+    project, version = vectorstore_service.project, vectorstore_service.version
+    query_vector = None
+    if use_cache:
+        # 캐시 조회에 쓴 쿼리 벡터를 아래 검색에서 그대로 사용
+        with span("query_embedding"):
+            query_vector = await asyncio.wrap_future(vectorstore_service.query_encoder.encode_async(query))
+        with span("answer_cache_lookup"):
+            cached, similarity = ANSWER_CACHE.lookup(project, version, cache_params, query_vector)
+        if cached is not None:
+            cache_info = {"query": cached["query"], "similarity": round(similarity, 4)}
+            yield {"type": "context", **cached["fields"], "cached": cache_info}
+            yield {"type": "token", "token": cached["response"]}
+            yield {"type": "done", "response": cached["response"], "cached": cache_info, "timings": timings_ms(stage_timings)}
+            return
+
+    results, error = await retrieve(vectorstore_service, query, k, filters, query_vector)
+    if error is not None:
+        yield {"type": "error", "error": error}
+        return
+
+    # 검색 결과를 토큰 예산 안에서 컨텍스트로 구성 (docstore에서 상위 k개만 읽어 온 Document)
+    with span("prompt_build"):
+        context, prompt = build_prompt(query, results, model_name, max_context_tokens)
+        fields = context_fields(context)
+    yield {"type": "context", **fields}
+
+    # OpenAI 응답을 토큰 단위로 전달 (첫 토큰까지의 시간과 전체 생성 시간을 따로 기록)
+    tokens = []
+    llm_start = time.perf_counter()
+    try:
+        async for token in openai_service.stream_openai(prompt, model_name=model_name, temperature=temperature, top_p=top_p):
+            if not tokens:
+                record("llm_first_token", time.perf_counter() - llm_start)
+            tokens.append(token)
+            yield {"type": "token", "token": token}
+    except Exception as e:
+        print(f"Error streaming OpenAI response: {e}")
+        yield {"type": "error", "error": ERROR_MESSAGE}
+        return
+    finally:
+        record("llm", time.perf_counter() - llm_start)
+    answer = "".join(tokens).strip()
+    if use_cache and answer:
+        ANSWER_CACHE.store(project, version, cache_params, query_vector, {"query": query, "response": answer, "fields": fields})
+    yield {"type": "done", "response": answer, "timings": timings_ms(stage_timings)}
+
+
+async def chat_event_stream(events, query, filters, include_timings=False):
+    """공유 작업의 이벤트를 이 요청의 SSE 스트림으로 (context 이벤트에는 요청한 쿼리와 필터를 붙임)"""
+    async for event in events:
+        if event["type"] == "context":
+            event = {**event, "query": query, "filters": filters}
+        elif event["type"] == "done" and not include_timings:
+            event = {name: value for name, value in event.items() if name != "timings"}
+        yield sse(event)
+
+
+@router.post("/chat")
+async def chat_endpoint(query: str, model_name: str = "gpt-4o-mini", temperature: float = 0.1, top_p: float = 1.0, k: int = 20,
+                        stream: bool = Query(False, description="true이면 토큰 단위로 SSE 스트리밍"),
+                        max_context_tokens: Optional[int] = Query(None, ge=0, description="컨텍스트 토큰 예산 (기본 CONTEXT_TOKEN_BUDGET)"),
+                        use_cache: bool = Query(True, description="false이면 응답 캐시를 사용하지 않음"),
+                        timings: bool = Query(False, description="true이면 단계별 소요 시간(ms) 포함"),
+                        filters: Optional[dict] = Depends(search_filters), vectorstore_service=Depends(project_vectorstore)):
+    """
+    검색 결과를 컨텍스트로 OpenAI 응답 생성. 검색과 LLM 호출 모두 이벤트 루프를 막지 않음.
+    stream=true이면 text/event-stream으로 context → token... → done 이벤트를 보냄.
+    같은 질문(정규화 기준)/프로젝트/파라미터의 요청이 진행 중이면 새로 실행하지 않고 그 결과를 함께 받음
+    """
+    # 알 수 없는 필터 값은 공유 작업을 시작하기 전에 400으로 응답
+    try:
+        vectorstore_service.check_filters(filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    cache_params = params_key(model_name=model_name, temperature=temperature, top_p=top_p, k=k,
+                              filters=filters, max_context_tokens=max_context_tokens)
+    key = (vectorstore_service.project, vectorstore_service.version, normalize_query(query), cache_params, use_cache)
+    flight, _ = chat_flights.join(key, lambda: chat_events(
+        vectorstore_service, query, model_name, temperature, top_p, k, max_context_tokens, filters, use_cache, cache_params,
+    ))
+
+    if stream:
+        return StreamingResponse(chat_event_stream(flight.subscribe(), query, filters, timings), media_type="text/event-stream")
+
+    # 스트리밍하지 않으면 이벤트를 모아 한 번에 응답
+    response = {"query": query}
+    async for event in flight.subscribe():
+        if event["type"] == "error":
+            return {"error": event["error"]}
+        if event["type"] == "context":
+            response.update({name: value for name, value in event.items() if name != "type"})
+        elif event["type"] == "done":
+            response["response"] = event["response"]
+            if timings:
+                response["timings"] = event["timings"]
+    response["filters"] = filters
+    return response
+
+
+@router.get("/indexes")
+def index_stats():
+    """
+    메모리에 올라와 있는 프로젝트 인덱스와 로드/적중/제거 횟수
+    """
+    return INDEX_REGISTRY.stats()
+
+
+@router.get("/models")
+def embedding_model_stats():
+    """
+    이 프로세스에서 로드된 임베딩 모델과 로드 횟수 (duplicate_loads가 0이 아니면 중복 로드)
+    """
+    return model_stats()
+
+
+@router.get("/query-encoder")
+def query_encoder_stats():
+    """
+    쿼리 임베딩 캐시 적중률, 배치 크기, 배치 대기 시간
+    """
+    return get_query_encoder().metrics()
+
+
+@router.get("/answer-cache")
+def answer_cache_stats():
+    """
+    응답 캐시 적중률과 항목 수
+    """
+    return ANSWER_CACHE.metrics()
+
+
+@router.get("/chat/coalescing")
+def chat_coalescing_stats():
+    """
+    동시에 들어온 같은 /chat 요청을 합친 횟수
+    """
+    return chat_flights.metrics()
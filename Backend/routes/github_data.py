@@ -1,56 +1,113 @@
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from services.github_service import download_github_repo
+from config import settings
+from services.github_service import SCHEDULER, download_github_repo, parse_repo_url
 from services.vector_service import build_vector_database
+from services.index_registry import INDEX_REGISTRY
+from services.answer_cache import ANSWER_CACHE
+from services.job_manager import JobManager
+from services.metrics import span
+from services.progress import emit, sse, to_percent
 import asyncio
-import json
 
 router = APIRouter()
 
-async def progress_stream(repo_url: str):
+# 저장소 가져오기 작업 큐 (동시에 실행되는 다운로드/임베딩 작업 수 제한)
+job_manager = JobManager(max_workers=settings.BUILD_MAX_WORKERS)
+
+
+def import_repository(repo_url: str, incremental: bool, progress):
+    """GitHub 저장소 다운로드 후 벡터 데이터베이스 구축 (작업 스레드에서 실행)"""
+    with span("github_download"):
+        repo_name = download_github_repo(repo_url, incremental, progress)
+    emit(progress, "embed", "Building vector database")
+    with span("vector_build"):
+        vector_db_result = build_vector_database(repo_name, progress)
+    # 이미 로드된 프로젝트는 새 버전을 백그라운드에서 로드해 교체 (재시작 불필요)
+    INDEX_REGISTRY.reload(repo_name)
+    # 이전 인덱스로 만든 응답은 더 이상 사용하지 않음
+    ANSWER_CACHE.invalidate(repo_name)
+    return {
+        'repository_name': repo_name,
+        'vectorstore_directory': vector_db_result['vectorstore_directory']
+    }
+
+
+async def job_event_stream(job):
     """
-    GitHub 저장소 다운로드 및 벡터 데이터베이스 구축 진행률을 SSE 방식으로 스트리밍
+    작업의 진행 이벤트를 SSE 방식으로 스트리밍.
+    같은 작업을 여러 요청이 구독해도 각자 같은 이벤트를 받음
     """
+    events = job.subscribe(asyncio.get_running_loop())
     try:
-        total_steps = 100
-        current_progress = 0
-
-        async def update_progress(step_count, status_message):
-            """ 진행률을 업데이트하면서 프론트엔드로 전송 """
-            nonlocal current_progress
-            for _ in range(step_count):
-                current_progress += 1
-                yield f"data: {json.dumps({'progress': current_progress, 'status': status_message})}\n\n"
-                await asyncio.sleep(0.1)  # 🎯 비동기 대기
-
-        # 1️⃣ GitHub 저장소 다운로드 (총 30%)
-        yield f"data: {json.dumps({'progress': current_progress, 'status': 'Starting repository download'})}\n\n"
-        repo_name = await asyncio.to_thread(download_github_repo, repo_url)
-        async for progress in update_progress(30, "Downloading repository completed."):
-            yield progress
-
-        # 2️⃣ 벡터 데이터베이스 구축 (총 70%)
-        yield f"data: {json.dumps({'progress': current_progress, 'status': 'Building vector database'})}\n\n"
-        vector_db_result = await asyncio.to_thread(build_vector_database, repo_name)
-        async for progress in update_progress(70, "Building vector database."):
-            yield progress
-
-        # 🎯 최종 완료
-        yield f"""data: {json.dumps({
-            'progress': 100,
-            'status': 'Process complete',
-            'repository_name': repo_name,
-            'vectorstore_directory': vector_db_result['vectorstore_directory']
-        })}\n\n"""
+        while (event := await events.get()) is not None:
+            yield sse({'job_id': job.id, 'progress': to_percent(event), **event})
+    finally:
+        job.unsubscribe(events)
+
+
+async def error_stream(message):
+    yield sse({'progress': 0, 'status': 'Error', 'message': message})
 
-    except HTTPException as e:
-        yield f"data: {json.dumps({'progress': 0, 'status': 'Error', 'message': str(e.detail)})}\n\n"
-    except Exception as e:
-        yield f"data: {json.dumps({'progress': 0, 'status': 'Error', 'message': str(e)})}\n\n"
 
 @router.get("/progress")
-async def progress(repo_url: str = Query(...)):
+async def progress(repo_url: str = Query(...), incremental: bool = Query(True)):
     """
     진행률을 스트리밍 응답으로 반환 (프론트엔드에서 실시간으로 확인 가능)
+    같은 저장소를 가져오는 작업이 이미 있으면 새로 시작하지 않고 그 작업의 진행 상황에 연결.
+    incremental=true이면 이전에 받은 저장소는 변경분만 동기화
+    """
+    try:
+        owner, repo = parse_repo_url(repo_url)
+    except HTTPException as e:
+        return StreamingResponse(error_stream(str(e.detail)), media_type="text/event-stream")
+
+    # 같은 요청(owner/repo, 전체/변경분)은 진행 중인 작업에 합류.
+    # 저장 디렉토리(storage/<repo>)가 같은 다른 작업이 실행 중이면 끝난 뒤에 실행
+    mode = "sync" if incremental else "full"
+    job, _ = job_manager.submit(
+        f"{owner}/{repo}:{mode}".lower(),
+        lambda report: import_repository(repo_url, incremental, report),
+        resource=repo,
+        repo_url=repo_url,
+        incremental=incremental,
+    )
+    return StreamingResponse(job_event_stream(job), media_type="text/event-stream")
+
+
+@router.get("/jobs")
+async def list_jobs():
+    """
+    최근 작업 목록과 상태
+    """
+    return job_manager.list()
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    작업 상태 조회
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.snapshot()
+
+
+@router.get("/jobs/{job_id}/progress")
+async def job_progress(job_id: str):
+    """
+    기존 작업의 진행률 스트림에 연결
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(job_event_stream(job), media_type="text/event-stream")
+
+
+@router.get("/github/rate-limit")
+async def github_rate_limit():
+    """
+    GitHub 요청 스케줄러의 처리량과 토큰별 남은 한도
     """
-    return StreamingResponse(progress_stream(repo_url), media_type="text/event-stream")
+    return SCHEDULER.metrics()
@@ -0,0 +1,28 @@
+# app/routes/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from services.answer_cache import ANSWER_CACHE
+from services.github_service import SCHEDULER
+from services.index_registry import INDEX_REGISTRY
+from services.metrics import REGISTRY
+from services.model_registry import model_stats
+from services.query_encoder import get_query_encoder
+from routes.chat import chat_flights
+
+router = APIRouter()
+
+# 각 서비스의 통계를 /metrics 게이지로 함께 출력
+REGISTRY.collector("chatbot_query_encoder", lambda: get_query_encoder().metrics())
+REGISTRY.collector("chatbot_answer_cache", ANSWER_CACHE.metrics)
+REGISTRY.collector("chatbot_index_registry", INDEX_REGISTRY.stats)
+REGISTRY.collector("chatbot_chat_coalescing", chat_flights.metrics)
+REGISTRY.collector("chatbot_embedding_models", lambda: model_stats()["models"])
+REGISTRY.collector("chatbot_github", SCHEDULER.metrics)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    단계별 소요 시간 히스토그램, HTTP 요청 시간, 서비스 통계 (Prometheus 텍스트 형식)
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
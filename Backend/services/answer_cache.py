@@ -0,0 +1,122 @@
+# app/services/answer_cache.py
+"""
+/chat 응답의 의미 기반 캐시.
+(프로젝트, 인덱스 버전, 모델 파라미터)가 같은 항목 중 쿼리 임베딩의 코사인 유사도가
+ANSWER_CACHE_SIMILARITY 이상인 항목이 있으면 검색과 LLM 호출 없이 저장된 응답을 돌려준다.
+항목은 TTL이 지나면 만료되고, 개수가 ANSWER_CACHE_MAX_ENTRIES를 넘으면 오래 사용하지 않은 것부터 제거한다.
+프로젝트의 인덱스 버전이 바뀌면 그 프로젝트의 항목은 모두 버린다.
+"""
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from config import settings
+
+
+def params_key(**params):
+    """모델 파라미터 → 캐시 그룹 키 (값 순서와 무관하게 같은 파라미터는 같은 키)"""
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class AnswerCache:
+    def __init__(self, max_entries=None, ttl_seconds=None, similarity=None):
+        self.max_entries = settings.ANSWER_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.ttl = settings.ANSWER_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.similarity = settings.ANSWER_CACHE_SIMILARITY if similarity is None else similarity
+        self.entries = OrderedDict()  # 항목 번호 → (그룹, 정규화된 쿼리 벡터, 응답, 만료 시각)
+        self.groups = {}  # (프로젝트, 버전, 파라미터 키) → {항목 번호}
+        self.versions = {}  # 프로젝트 → 마지막으로 본 인덱스 버전
+        self.stats = {"lookups": 0, "hits": 0, "stores": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _check_version(self, project, version):
+        # self._lock 안에서 호출. 인덱스가 다시 구축되었으면 그 프로젝트 항목을 모두 버림
+        if project in self.versions and self.versions[project] != version:
+            self._drop_project(project)
+            self.stats["invalidations"] += 1
+        self.versions[project] = version
+
+    def _drop_project(self, project):
+        for group in [group for group in self.groups if group[0] == project]:
+            for entry_id in self.groups.pop(group):
+                self.entries.pop(entry_id, None)
+
+    def _remove(self, entry_id):
+        group = self.entries.pop(entry_id)[0]
+        ids = self.groups.get(group)
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del self.groups[group]
+
+    def lookup(self, project, version, params, query_vector):
+        """
+        유사한 쿼리의 응답이 있으면 (응답, 유사도), 없으면 (None, None).
+        만료된 항목은 조회하면서 제거
+        """
+        query_vector = self._normalize(query_vector)
+        group = (project, version, params)
+        now = time.monotonic()
+        with self._lock:
+            self.stats["lookups"] += 1
+            self._check_version(project, version)
+            best_id, best_similarity = None, self.similarity
+            for entry_id in list(self.groups.get(group, ())):
+                _, vector, _, expires = self.entries[entry_id]
+                if expires <= now:
+                    self._remove(entry_id)
+                    self.stats["expired"] += 1
+                    continue
+                similarity = float(np.dot(vector, query_vector))
+                if similarity >= best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+            if best_id is None:
+                return None, None
+            self.entries.move_to_end(best_id)
+            self.stats["hits"] += 1
+            return self.entries[best_id][2], best_similarity
+
+    def store(self, project, version, params, query_vector, response):
+        if self.max_entries <= 0:
+            return
+        group = (project, version, params)
+        with self._lock:
+            self._check_version(project, version)
+            entry_id = next(self._ids)
+            self.entries[entry_id] = (group, self._normalize(query_vector), response, time.monotonic() + self.ttl)
+            self.groups.setdefault(group, set()).add(entry_id)
+            self.stats["stores"] += 1
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+                self.stats["evictions"] += 1
+
+    def invalidate(self, project):
+        """프로젝트의 항목을 모두 제거"""
+        with self._lock:
+            self._drop_project(project)
+            self.stats["invalidations"] += 1
+
+    def metrics(self):
+        with self._lock:
+            lookups = self.stats["lookups"]
+            return {
+                **self.stats,
+                "entries": len(self.entries),
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "similarity_threshold": self.similarity,
+                "ttl_seconds": self.ttl,
+            }
+
+
+# /chat 라우트가 사용하는 캐시
+ANSWER_CACHE = AnswerCache()
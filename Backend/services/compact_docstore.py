@@ -0,0 +1,245 @@
+# app/services/compact_docstore.py
+"""
+문서 텍스트를 하나의 연속된 바이트 배열과 오프셋 배열로 저장하는 docstore.
+문서마다 Document 객체와 dict 항목을 만드는 대신 파일을 메모리 매핑하고,
+검색 결과(top-k)에 해당하는 문서만 그때 Document로 만든다.
+
+파일 (벡터 스토어 디렉토리):
+  docs_text.bin / docs_text_offsets.npy   문서 텍스트 (UTF-8), 행 i는 [offsets[i], offsets[i+1])
+  docs_keys.bin / docs_keys_offsets.npy   문서 키 (docstore ID)
+  docs_keys_order.npy                     키 사전순 정렬 순서 (키 → 행 이진 탐색)
+  docs_labels.npy                         행별 FAISS ID (오름차순). 없으면 FAISS ID = 행 번호
+"""
+import json
+import os
+
+import numpy as np
+from langchain.schema import Document
+
+TEXT_FILE = "docs_text"
+KEYS_FILE = "docs_keys"
+ORDER_FILE = "docs_keys_order.npy"
+LABELS_FILE = "docs_labels.npy"
+
+
+def _atomic_save(path, array):
+    tmp_path = f"{path}.tmp.npy"
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+
+def _write_strings(directory, name, strings):
+    """문자열 목록을 <name>.bin과 <name>_offsets.npy로 기록"""
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    tmp_path = os.path.join(directory, f"{name}.bin.tmp")
+    with open(tmp_path, "wb") as f:
+        for i, value in enumerate(strings):
+            data = value.encode("utf-8")
+            f.write(data)
+            offsets[i + 1] = offsets[i] + len(data)
+    _atomic_save(os.path.join(directory, f"{name}_offsets.npy"), offsets)
+    os.replace(tmp_path, os.path.join(directory, f"{name}.bin"))
+
+
+class _StringArray:
+    """메모리 매핑된 문자열 배열. 요청한 행만 디코딩"""
+
+    def __init__(self, directory, name):
+        self.offsets = np.load(os.path.join(directory, f"{name}_offsets.npy"), mmap_mode="r")
+        path = os.path.join(directory, f"{name}.bin")
+        self.blob = np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) else np.empty(0, np.uint8)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        return self.blob[self.offsets[row]:self.offsets[row + 1]].tobytes().decode("utf-8")
+
+
+def write_compact_docstore(directory, keys, texts, labels=None):
+    """
+    문서 키/텍스트를 행 순서대로 기록. labels(행별 FAISS ID)를 주면 ID 순으로 정렬하여 저장하고,
+    없으면 행 번호를 FAISS ID로 사용
+    """
+    os.makedirs(directory, exist_ok=True)
+    keys, texts = list(keys), list(texts)
+    labels_path = os.path.join(directory, LABELS_FILE)
+    if labels is not None:
+        labels = np.asarray(labels, dtype=np.int64)
+        order = np.argsort(labels, kind="stable")
+        keys, texts = [keys[i] for i in order], [texts[i] for i in order]
+        _atomic_save(labels_path, labels[order])
+    elif os.path.exists(labels_path):
+        os.remove(labels_path)
+
+    _write_strings(directory, TEXT_FILE, texts)
+    _write_strings(directory, KEYS_FILE, keys)
+    _atomic_save(os.path.join(directory, ORDER_FILE), np.argsort(np.array(keys, dtype=object), kind="stable"))
+
+
+def _patch_strings(directory, name, source, src_rows, new_values):
+    """
+    행별 원본 행 번호(src_rows, 새 값은 -1) 순서대로 문자열 배열 기록.
+    원본 행은 연속 구간마다 바이트를 그대로 복사하고 새 값(new_values, 순서대로)만 인코딩
+    """
+    encoded = [value.encode("utf-8") for value in new_values]
+    old = src_rows >= 0
+    lengths = np.zeros(len(src_rows), dtype=np.int64)
+    lengths[old] = source.offsets[src_rows[old] + 1] - source.offsets[src_rows[old]]
+    lengths[~old] = [len(data) for data in encoded]
+    offsets = np.zeros(len(src_rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    # 새 값이거나 원본 행이 이어지지 않는 위치에서 구간이 나뉨 (구간 수는 변경 수에 비례)
+    starts = np.ones(len(src_rows), dtype=bool)
+    starts[1:] = (src_rows[1:] < 0) | (src_rows[:-1] < 0) | (src_rows[1:] != src_rows[:-1] + 1)
+    bounds = [*np.flatnonzero(starts).tolist(), len(src_rows)]
+    tmp_path = os.path.join(directory, f"{name}.bin.tmp")
+    new_values = iter(encoded)
+    with open(tmp_path, "wb") as f:
+        for start, end in zip(bounds, bounds[1:]):
+            if src_rows[start] < 0:
+                f.write(next(new_values))
+            else:
+                f.write(source.blob[source.offsets[src_rows[start]]:source.offsets[src_rows[end - 1] + 1]])
+    _atomic_save(os.path.join(directory, f"{name}_offsets.npy"), offsets)
+    os.replace(tmp_path, os.path.join(directory, f"{name}.bin"))
+
+
+def patch_compact_docstore(source_dir, directory, keys, texts, labels):
+    """
+    source_dir의 압축 docstore에 변경분만 반영해 directory에 기록 (source_dir은 그대로 유지).
+    labels(FAISS ID)가 이미 있으면 그 행의 키/텍스트를 교체하고 없으면 추가.
+    바뀌지 않은 문서는 디코딩하지 않으므로 파이썬 작업량은 변경 수에 비례하고,
+    나머지는 기존 파일의 바이트 구간 복사와 행당 8바이트 배열 기록뿐
+    """
+    os.makedirs(directory, exist_ok=True)
+    source = CompactDocstore(source_dir)
+    old_labels = np.arange(len(source), dtype=np.int64) if source.labels is None else np.asarray(source.labels)
+    labels = np.asarray(labels, dtype=np.int64)
+    order = np.argsort(labels, kind="stable")
+    keys, texts, labels = [keys[i] for i in order], [texts[i] for i in order], labels[order]
+
+    # 교체되는 행은 원본에서 빼고, 결과는 FAISS ID 순서 유지
+    kept = ~np.isin(old_labels, labels)
+    new_labels = np.concatenate([old_labels[kept], labels])
+    src_rows = np.concatenate([np.flatnonzero(kept), np.full(len(labels), -1, dtype=np.int64)])
+    merge = np.argsort(new_labels, kind="stable")
+    new_labels, src_rows = new_labels[merge], src_rows[merge]
+
+    _patch_strings(directory, TEXT_FILE, source.texts, src_rows, texts)
+    _patch_strings(directory, KEYS_FILE, source.keys, src_rows, keys)
+    _atomic_save(os.path.join(directory, LABELS_FILE), new_labels)
+
+    # 키 정렬 순서: 원본 순서에서 남은 행을 새 행 번호로 바꾸고, 새 키만 이진 탐색으로 끼워 넣음
+    row_of_source = np.full(len(source), -1, dtype=np.int64)
+    row_of_source[src_rows[src_rows >= 0]] = np.flatnonzero(src_rows >= 0)
+    key_order = row_of_source[np.asarray(source.key_order)]
+    key_order = key_order[key_order >= 0]
+    new_rows = np.flatnonzero(src_rows < 0)  # FAISS ID 순서 = 위의 keys 순서
+    by_key = sorted(range(len(keys)), key=keys.__getitem__)
+    positions = []
+    for i in by_key:
+        low, high = 0, len(key_order)
+        while low < high:
+            mid = (low + high) // 2
+            if source.keys[src_rows[key_order[mid]]] < keys[i]:
+                low = mid + 1
+            else:
+                high = mid
+        positions.append(low)
+    key_order = np.insert(key_order, np.asarray(positions, dtype=np.int64), new_rows[by_key])
+    _atomic_save(os.path.join(directory, ORDER_FILE), key_order)
+
+
+def has_compact_docstore(directory):
+    return os.path.exists(os.path.join(directory, ORDER_FILE))
+
+
+class CompactDocstore:
+    """
+    FAISS 검색 결과 ID → 행 → 문서를 배열 조회로 찾는 읽기 전용 docstore.
+    LangChain Docstore처럼 search(key)도 지원
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.texts = _StringArray(directory, TEXT_FILE)
+        self.keys = _StringArray(directory, KEYS_FILE)
+        self.key_order = np.load(os.path.join(directory, ORDER_FILE), mmap_mode="r")
+        labels_path = os.path.join(directory, LABELS_FILE)
+        self.labels = np.load(labels_path, mmap_mode="r") if os.path.exists(labels_path) else None
+
+    def __len__(self):
+        return len(self.texts)
+
+    def rows_for_labels(self, labels):
+        """FAISS ID 배열 → 행 번호 배열 (없는 ID와 FAISS의 -1은 -1)"""
+        labels = np.asarray(labels, dtype=np.int64)
+        if self.labels is None:
+            return np.where((labels >= 0) & (labels < len(self)), labels, -1)
+        if len(self.labels) == 0:
+            return np.full(len(labels), -1, dtype=np.int64)
+        rows = np.searchsorted(self.labels, labels)
+        found = (rows < len(self.labels)) & (self.labels[np.minimum(rows, len(self.labels) - 1)] == labels)
+        return np.where(found & (labels >= 0), rows, -1)
+
+    def row_for_key(self, key):
+        """정렬 순서 배열을 이진 탐색하여 키의 행 번호 반환 (없으면 None)"""
+        low, high = 0, len(self.key_order)
+        while low < high:
+            mid = (low + high) // 2
+            if self.keys[self.key_order[mid]] < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < len(self.key_order) and self.keys[self.key_order[low]] == key:
+            return int(self.key_order[low])
+        return None
+
+    def document(self, row, label=None):
+        metadata = {"id": self.keys[row]}
+        if label is not None:
+            metadata["label"] = int(label)
+        return Document(page_content=self.texts[row], metadata=metadata)
+
+    def documents_for_labels(self, labels):
+        """검색 결과 ID 순서대로 Document 목록 (metadata의 label은 FAISS ID, 찾지 못한 ID는 제외)"""
+        labels = np.asarray(labels, dtype=np.int64)
+        return [
+            self.document(int(row), label)
+            for label, row in zip(labels, self.rows_for_labels(labels)) if row >= 0
+        ]
+
+    def get_text(self, key):
+        row = self.row_for_key(key)
+        return None if row is None else self.texts[row]
+
+    def search(self, key):
+        row = self.row_for_key(key)
+        return f"ID {key} not found." if row is None else self.document(row)
+
+
+def convert_json_docstore(directory):
+    """
+    기존 docstore.json + index_to_docstore_id.json을 압축 형식으로 변환 (한 번만 실행).
+    변환 후에는 JSON 파일을 다시 읽지 않음
+    """
+    with open(os.path.join(directory, "docstore.json"), "r", encoding="utf-8") as f:
+        doc_dict = json.load(f)
+    with open(os.path.join(directory, "index_to_docstore_id.json"), "r", encoding="utf-8") as f:
+        mapping = {int(k): str(v) for k, v in json.load(f).items()}
+    labels = sorted(mapping)
+    keys = [mapping[label] for label in labels]
+    texts = [doc_dict[key]["page_content"] for key in keys]
+    write_compact_docstore(directory, keys, texts, labels=labels)
+    print(f"Converted docstore.json to compact docstore in {directory} ({len(keys)} documents)")
+
+
+def load_compact_docstore(directory):
+    """압축 docstore 로드. 없고 JSON docstore만 있으면 먼저 변환"""
+    if not has_compact_docstore(directory):
+        if not os.path.isfile(os.path.join(directory, "docstore.json")):
+            raise FileNotFoundError(f"docstore not found in: {directory}")
+        convert_json_docstore(directory)
+    return CompactDocstore(directory)
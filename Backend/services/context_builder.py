@@ -0,0 +1,118 @@
+# app/services/context_builder.py
+"""
+검색 결과로 /chat 프롬프트의 컨텍스트를 만드는 모듈.
+대상 모델의 토크나이저(tiktoken)로 토큰 수를 세어 예산(CONTEXT_TOKEN_BUDGET) 안에서
+순위가 높은 문서부터 채우고, 해시/날짜/버전만 다른 문서(반복되는 bump, 릴리스 커밋 등)는 하나로 합친다.
+tiktoken을 쓸 수 없는 환경(미설치, 오프라인)에서는 문자 수로 토큰 수를 추정한다.
+"""
+import re
+from functools import lru_cache
+
+from config import settings
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# 중복 판별 전에 지우는 부분: 날짜/시각(ISO 8601), 커밋 해시(숫자와 a-f가 섞인 7~40자), 버전(v1.2.3).
+# 이슈/PR 번호 같은 일반 숫자는 서로 다른 문서를 가리키므로 남김
+_VOLATILE = re.compile(
+    r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?(?:Z|[+-]\d{2}:?\d{2})?"
+    r"|\b(?=[0-9a-f]*\d)(?=[0-9a-f]*[a-f])[0-9a-f]{7,40}\b"
+    r"|\bv?\d+(?:\.\d+)+(?:-(?:alpha|beta|rc|dev|pre)\.?\d*)?\b",
+    re.IGNORECASE,
+)
+
+# 토크나이저가 없을 때 토큰 하나로 보는 문자 수 (영어 기준 근사치)
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model_name):
+    """
+    모델의 토크나이저. tiktoken이 모르는 모델은 o200k_base(GPT-4o 계열) 사용.
+    tiktoken이 없거나 인코딩 파일을 받을 수 없으면(오프라인) None
+    """
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"tiktoken encoding unavailable for {model_name}, estimating tokens from length: {e}")
+        return None
+
+
+def count_tokens(encoding, texts):
+    """텍스트별 토큰 수 (encoding이 None이면 문자 수 / CHARS_PER_TOKEN)"""
+    if encoding is None:
+        return [len(text) // CHARS_PER_TOKEN for text in texts]
+    return [len(tokens) for tokens in encoding.encode_batch(texts, disallowed_special=())]
+
+
+def truncate_tokens(encoding, text, max_tokens):
+    """text의 앞부분을 max_tokens 토큰만큼 자름"""
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def dedup_signature(text):
+    """해시/날짜/버전을 지우고 공백과 대소문자를 정규화한 문자열 (같으면 중복으로 취급)"""
+    return " ".join(_VOLATILE.sub("#", text).lower().split())
+
+
+def build_context(documents, model_name, max_tokens=None):
+    """
+    documents(순위 순서)에서 중복을 합치고 토큰 예산 안에 들어가는 문서만 골라 컨텍스트 생성.
+    예산을 넘는 문서는 건너뛰고 뒤의 짧은 문서를 계속 채워 넣음.
+    {"context", "tokens", "budget", "documents": [사용한 문서], "duplicates", "dropped"} 반환
+    """
+    budget = settings.CONTEXT_TOKEN_BUDGET if max_tokens is None else max_tokens
+    encoding = get_encoding(model_name)
+
+    # 중복 합치기: 같은 서명의 문서는 처음(가장 순위가 높은) 문서만 사용
+    unique, by_signature = [], {}
+    for doc in documents:
+        signature = dedup_signature(doc.page_content)
+        if signature in by_signature:
+            by_signature[signature]["duplicates"].append(doc.metadata.get("id"))
+            continue
+        entry = {"doc": doc, "duplicates": []}
+        by_signature[signature] = entry
+        unique.append(entry)
+
+    lines = [f"- {entry['doc'].page_content}\n" for entry in unique]
+    token_counts = count_tokens(encoding, lines)
+
+    selected, used, dropped = [], 0, 0
+    for entry, line, n_tokens in zip(unique, lines, token_counts):
+        if used + n_tokens > budget:
+            if selected or budget <= 0:
+                dropped += 1
+                continue
+            # 첫 문서 하나가 예산보다 길면 예산만큼 잘라서 사용
+            line = truncate_tokens(encoding, line, budget).rstrip() + "\n"
+            n_tokens = budget
+        selected.append((entry, line, n_tokens))
+        used += n_tokens
+
+    return {
+        "context": "".join(line for _, line, _ in selected),
+        "tokens": used,
+        "budget": budget,
+        "documents": [
+            {
+                "id": entry["doc"].metadata.get("id"),
+                "score": entry["doc"].metadata.get("score"),
+                "tokens": n_tokens,
+                "duplicates": entry["duplicates"],
+            }
+            for entry, _, n_tokens in selected
+        ],
+        "duplicates": sum(len(entry["duplicates"]) for entry in unique),
+        "dropped": dropped,
+    }
@@ -0,0 +1,86 @@
+# app/services/document_builder.py
+"""
+DataFrame에서 임베딩할 문서 텍스트와 메타데이터를 컬럼 단위 연산으로 만드는 공용 모듈.
+행마다 iterrows()/to_dict()를 호출하는 대신 템플릿의 자리표시자({Title} 등)를
+컬럼 전체 문자열 연산으로 채우고, 메타데이터는 DataFrame 컬럼으로 유지한다.
+백엔드(vector_service)와 Github_dataset 스크립트가 함께 사용.
+"""
+from string import Formatter
+
+import pandas as pd
+
+# build_documents 결과에서 메타데이터가 아닌 컬럼
+DOC_COLUMNS = ["doc_id", "type", "text"]
+
+# 백엔드 벡터 DB용 (테이블 → 문서 타입, 템플릿)
+BACKEND_TEMPLATES = {
+    "issues": ("issue", "Issue: {Title}, State: {State}"),
+    "pull_requests": ("pull_request", "PR: {Title}, State: {State}"),
+    "commits": ("commit", "Commit: {Message}, Author: {Author}"),
+}
+
+
+def text_column(series, missing="N/A"):
+    """컬럼을 문자열로 변환 (타임스탬프는 ISO 8601, 결측값은 missing)"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        text = series.dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    else:
+        text = series.astype(str)
+    return text.where(series.notna(), missing).astype(object)
+
+
+def render_template(df, template, constants=None, missing="N/A"):
+    """
+    템플릿을 컬럼 단위로 채워 문자열 Series 반환.
+    자리표시자는 컬럼 이름 또는 constants의 키이며, 둘 다 없으면 missing으로 채움
+    """
+    constants = constants or {}
+    result = pd.Series("", index=df.index, dtype=object)
+    for literal, field, _, _ in Formatter().parse(template):
+        if literal:
+            result = result + literal
+        if field is None:
+            continue
+        if field in df.columns:
+            result = result + text_column(df[field], missing)
+        else:
+            result = result + str(constants.get(field, missing))
+    return result
+
+
+def build_documents(df, doc_type, template, constants=None, metadata_columns=None):
+    """
+    한 테이블의 문서 DataFrame 생성: doc_id, type, text + 메타데이터 컬럼.
+    metadata_columns({새 이름: 원본 컬럼})를 주면 해당 컬럼만 이름을 바꿔 남기고,
+    없으면 원본 컬럼을 모두 메타데이터로 유지
+    """
+    documents = pd.DataFrame({
+        "doc_id": text_column(df["ID"], "") if "ID" in df.columns else df.index.astype(str),
+        "type": doc_type,
+        "text": render_template(df, template, constants),
+    }, index=df.index)
+    if metadata_columns is None:
+        metadata = df
+    else:
+        metadata = pd.DataFrame({
+            name: df[source] if source in df.columns else None
+            for name, source in metadata_columns.items()
+        }, index=df.index)
+    return pd.concat([documents, metadata], axis=1).reset_index(drop=True)
+
+
+def combine(frames):
+    """여러 테이블의 문서 DataFrame에서 (texts, doc_ids, types) 리스트 추출"""
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return [], [], []
+    texts = pd.concat([frame["text"] for frame in frames], ignore_index=True)
+    doc_ids = pd.concat([frame["doc_id"] for frame in frames], ignore_index=True)
+    types = pd.concat([frame["type"] for frame in frames], ignore_index=True)
+    return texts.tolist(), doc_ids.tolist(), types.tolist()
+
+
+def metadata_frame(frame):
+    """문서 DataFrame에서 메타데이터 컬럼만 추출"""
+    return frame.drop(columns=DOC_COLUMNS)
+
@@ -0,0 +1,188 @@
+# app/services/embedding_cache.py
+"""
+디스크에 유지되는 임베딩 캐시. (모델 이름 + 텍스트) 해시를 키로 벡터를 저장하여
+재구축 시 이전에 임베딩한 텍스트는 다시 계산하지 않는다.
+
+저장 형식 (모델별 디렉토리, index_versions와 같은 버전 디렉토리 + CURRENT):
+  versions/<세대>/keys.npy      (N,) 16바이트 blake2b 다이제스트
+  versions/<세대>/vectors.npy   (N, d) float32 (메모리 매핑으로 읽음)
+  versions/<세대>/last_used.npy (N,) int64 마지막 사용 시각(LRU 제거 기준)
+세 파일을 새 세대 디렉토리에 모두 쓴 뒤 CURRENT를 교체하므로 기록 중에 중단되어도
+키와 벡터가 어긋난 상태가 읽히지 않는다. 새로 임베딩한 벡터는 save() 전까지 메모리에 둔다.
+"""
+import hashlib
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from config import settings
+from services.index_versions import current_version_dir, new_version_dir, publish_version
+
+DIGEST_SIZE = 16
+# 새 세대를 기록할 때 한 번에 복사하는 행 수 (메모리 매핑된 이전 벡터를 전부 올리지 않도록)
+SAVE_CHUNK_ROWS = 65536
+
+
+def text_digest(model_name, text):
+    return hashlib.blake2b(f"{model_name}\0{text}".encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+class EmbeddingCache:
+    def __init__(self, model_name, cache_dir=None, max_entries=None):
+        self.model_name = model_name
+        self.max_entries = max_entries or settings.EMBEDDING_CACHE_MAX_ENTRIES
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.directory = Path(cache_dir or settings.EMBEDDING_CACHE_DIR) / safe_name
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """현재 세대 로드. 벡터는 메모리 매핑하여 조회한 행만 읽음 (캐시가 커도 상주 메모리가 늘지 않음)"""
+        self.keys = np.empty(0, dtype=f"S{DIGEST_SIZE}")
+        self.vectors = None
+        self.last_used = np.empty(0, dtype=np.int64)
+        # save() 전에 새로 임베딩한 항목 (행 번호는 저장된 행 다음부터)
+        self.added_keys = []
+        self.added_vectors = None
+        self._dirty = False
+        directory = current_version_dir(self.directory)
+        keys_path = directory / "keys.npy"
+        if keys_path.exists():
+            keys = np.load(keys_path)
+            vectors = np.load(directory / "vectors.npy", mmap_mode="r")
+            last_used = np.load(directory / "last_used.npy")
+            if len(keys) == len(vectors) == len(last_used):
+                self.keys, self.vectors, self.last_used = keys, vectors, last_used
+            else:
+                print(f"Embedding cache at {directory} is inconsistent, starting empty")
+        self.positions = {key: i for i, key in enumerate(self.keys.tolist())}
+
+    def __len__(self):
+        return len(self.keys) + len(self.added_keys)
+
+    def _gather(self, rows):
+        """행 번호 배열의 벡터 (저장된 행은 메모리 매핑 파일에서, 새 행은 메모리에서 읽음)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        stored = rows < len(self.keys)
+        dim = (self.vectors if self.vectors is not None else self.added_vectors).shape[1]
+        out = np.empty((len(rows), dim), dtype=np.float32)
+        if stored.any():
+            out[stored] = self.vectors[rows[stored]]
+        if not stored.all():
+            out[~stored] = self.added_vectors[rows[~stored] - len(self.keys)]
+        return out
+
+    def embed(self, texts, embed_fn):
+        """
+        캐시에 없는 텍스트만 embed_fn(list[str]) -> 벡터 목록으로 임베딩하고,
+        입력 순서대로 (len(texts), d) float32 배열 반환
+        """
+        digests = [text_digest(self.model_name, text) for text in texts]
+        # 적중한 벡터는 잠금 안에서 바로 복사 (임베딩하는 동안 save()가 행 번호를 바꾸거나 제거할 수 있음)
+        with self._lock:
+            rows = [self.positions.get(digest) for digest in digests]
+            hits = [i for i, row in enumerate(rows) if row is not None]
+            hit_vectors = self._gather([rows[i] for i in hits]) if hits else None
+
+        # 캐시에 없는 텍스트는 중복을 제거하여 한 번씩만 임베딩
+        missing = {}
+        for text, digest, row in zip(texts, digests, rows):
+            if row is None and digest not in missing:
+                missing[digest] = text
+        new_vectors = None
+        if missing:
+            new_vectors = np.asarray(embed_fn(list(missing.values())), dtype=np.float32)
+
+        with self._lock:
+            if new_vectors is not None:
+                self._append(list(missing.keys()), new_vectors)
+            # 사용 시각은 지금 남아 있는 항목만 갱신 (행 번호는 다시 조회)
+            positions = [self.positions.get(digest) for digest in digests]
+            self.last_used[[row for row in positions if row is not None]] = int(time.time())
+            self._dirty = True
+            self.stats["hits"] += len(hits)
+            self.stats["misses"] += len(missing)
+
+        if hit_vectors is None and new_vectors is None:
+            return np.empty((0, 0), dtype=np.float32)
+        dim = (hit_vectors if hit_vectors is not None else new_vectors).shape[1]
+        result = np.empty((len(texts), dim), dtype=np.float32)
+        if hits:
+            result[hits] = hit_vectors
+        if missing:
+            index = {digest: i for i, digest in enumerate(missing)}
+            misses = [i for i, row in enumerate(rows) if row is None]
+            result[misses] = new_vectors[[index[digests[i]] for i in misses]]
+        return result
+
+    def _append(self, digests, vectors):
+        # 다른 스레드가 먼저 추가한 항목은 제외
+        new = [i for i, digest in enumerate(digests) if digest not in self.positions]
+        if not new:
+            return
+        digests, vectors = [digests[i] for i in new], vectors[new]
+        start = len(self)
+        self.added_keys.extend(digests)
+        self.added_vectors = vectors if self.added_vectors is None else np.concatenate([self.added_vectors, vectors])
+        self.last_used = np.concatenate([self.last_used, np.zeros(len(digests), dtype=np.int64)])
+        for i, digest in enumerate(digests):
+            self.positions[digest] = start + i
+
+    def save(self):
+        """
+        max_entries를 넘으면 가장 오래 사용하지 않은 항목부터 제거하고 새 세대 디렉토리에 기록한 뒤
+        CURRENT를 교체하여 공개. 기록한 세대를 다시 로드하므로 새 벡터도 메모리 매핑으로 바뀜
+        """
+        with self._lock:
+            if not self._dirty or not len(self):
+                return
+            total = len(self)
+            keep = np.arange(total)
+            if total > self.max_entries:
+                keep = np.sort(np.argsort(self.last_used, kind="stable")[total - self.max_entries:])
+            keys = np.concatenate([self.keys, np.array(self.added_keys, dtype=f"S{DIGEST_SIZE}")])
+            dim = (self.vectors if self.vectors is not None else self.added_vectors).shape[1]
+
+            target = new_version_dir(self.directory)
+            try:
+                np.save(target / "keys.npy", keys[keep])
+                np.save(target / "last_used.npy", self.last_used[keep])
+                vectors = np.lib.format.open_memmap(
+                    target / "vectors.npy", mode="w+", dtype=np.float32, shape=(len(keep), dim),
+                )
+                for start in range(0, len(keep), SAVE_CHUNK_ROWS):
+                    vectors[start:start + SAVE_CHUNK_ROWS] = self._gather(keep[start:start + SAVE_CHUNK_ROWS])
+                vectors.flush()
+                del vectors
+            except Exception:
+                shutil.rmtree(target, ignore_errors=True)
+                raise
+            publish_version(self.directory, target, keep=2)
+            self.stats["evictions"] += total - len(keep)
+            self._load()
+
+    def summary(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "model": self.model_name,
+                "entries": len(self),
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+                **self.stats,
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name):
+    """모델별로 프로세스 안에서 하나의 캐시 인스턴스를 공유"""
+    with _caches_lock:
+        if model_name not in _caches:
+            _caches[model_name] = EmbeddingCache(model_name)
+        return _caches[model_name]
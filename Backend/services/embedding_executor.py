@@ -0,0 +1,133 @@
+# app/services/embedding_executor.py
+"""
+여러 프로세스에 텍스트를 나누어 임베딩하는 실행기.
+워커 프로세스마다 모델을 한 번만 로드하고(현재 프로세스에서는 model_registry의 공유 모델 사용), 텍스트를 길이순으로 정렬해 배치를 만들어
+패딩 낭비를 줄인다. 결과 벡터는 미리 할당한 float32 배열의 원래 위치에 기록한다.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from config import settings
+from services.metrics import record
+from services.model_registry import get_embeddings
+from services.progress import emit
+
+# 워커 프로세스 안에서 사용하는 모델 (initializer에서 로드)
+_worker_embeddings = None
+
+
+def _init_worker(model_name, threads):
+    global _worker_embeddings
+    # 워커끼리 CPU 코어를 나눠 쓰도록 스레드 수 제한
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_embeddings = get_embeddings(model_name)
+
+
+def _embed_batch(texts):
+    return np.asarray(_worker_embeddings.embed_documents(texts), dtype=np.float32)
+
+
+class EmbeddingExecutor:
+    """
+    workers가 1 이하이면 현재 프로세스에서 임베딩하고(기본은 model_registry의 공유 모델),
+    2 이상이면 spawn 방식의 프로세스 풀을 처음 사용할 때 만들어 재사용
+    """
+
+    def __init__(self, model_name, workers=None, batch_size=None, local_embeddings=None):
+        self.model_name = model_name
+        self.workers = settings.EMBED_WORKERS if workers is None else workers
+        self.batch_size = max(1, batch_size or settings.EMBED_BATCH_SIZE)
+        self.local_embeddings = local_embeddings
+        self.last_stats = None
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                threads = max(1, (os.cpu_count() or 1) // self.workers)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, threads),
+                )
+            return self._pool
+
+    def _embed_local(self, texts):
+        with self._lock:
+            if self.local_embeddings is None:
+                self.local_embeddings = get_embeddings(self.model_name)
+        return np.asarray(self.local_embeddings.embed_documents(texts), dtype=np.float32)
+
+    def _iter_batches(self, batches):
+        """(배치 번호, 벡터)를 완료되는 순서대로 반환. 진행 중인 배치 수는 워커 수의 2배로 제한"""
+        if self.workers <= 1:
+            for i, batch in enumerate(batches):
+                start = time.perf_counter()
+                vectors = self._embed_local(batch)
+                record("embedding_batch", time.perf_counter() - start)
+                yield i, vectors
+            return
+
+        pool = self._get_pool()
+        pending = {}
+        next_batch = 0
+        while next_batch < len(batches) or pending:
+            while next_batch < len(batches) and len(pending) < self.workers * 2:
+                pending[pool.submit(_embed_batch, batches[next_batch])] = (next_batch, time.perf_counter())
+                next_batch += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                i, submitted = pending.pop(future)
+                # 워커에 제출한 뒤 결과를 받을 때까지 (대기 포함)
+                record("embedding_batch", time.perf_counter() - submitted)
+                yield i, future.result()
+
+    def embed(self, texts, progress=None):
+        """texts를 임베딩해 입력 순서대로 (len(texts), d) float32 배열 반환"""
+        texts = list(texts)
+        start_time = time.perf_counter()
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        # 길이순으로 정렬해 비슷한 길이끼리 배치 구성
+        order = np.argsort(np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts)), kind="stable")
+        bounds = [(start, min(start + self.batch_size, len(texts))) for start in range(0, len(texts), self.batch_size)]
+        batches = [[texts[i] for i in order[start:end]] for start, end in bounds]
+
+        vectors = None
+        documents = 0
+        for batches_done, (i, batch_vectors) in enumerate(self._iter_batches(batches), 1):
+            if vectors is None:
+                vectors = np.empty((len(texts), batch_vectors.shape[1]), dtype=np.float32)
+            start, end = bounds[i]
+            vectors[order[start:end]] = batch_vectors
+            documents += end - start
+            emit(progress, "embed", f"Embedded batch {batches_done}/{len(batches)}",
+                 batches_done=batches_done, batches_total=len(batches), documents=documents)
+
+        elapsed = time.perf_counter() - start_time
+        self.last_stats = {
+            "documents": len(texts),
+            "workers": max(1, self.workers),
+            "batch_size": self.batch_size,
+            "seconds": round(elapsed, 3),
+            "docs_per_sec": round(len(texts) / elapsed, 1) if elapsed else None,
+        }
+        print(f"Embedding throughput: {self.last_stats}")
+        return vectors
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
@@ -0,0 +1,250 @@
+# app/services/github_client.py
+import asyncio
+import re
+import httpx
+from config import settings
+from services.metrics import REGISTRY, span
+from services.rate_limiter import GitHubAPIError, RateLimitScheduler
+
+PER_PAGE = 100
+
+# Link: <https://api.github.com/...&page=34>; rel="last"
+LINK_LAST_PATTERN = re.compile(r'<[^>]*[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+GITHUB_REQUESTS = REGISTRY.counter("chatbot_github_requests_total", "GitHub API responses by status code", ("status",))
+
+
+def parse_last_page(link_header):
+    """Link 헤더에서 마지막 페이지 번호 추출 (없으면 None)"""
+    if not link_header:
+        return None
+    match = LINK_LAST_PATTERN.search(link_header)
+    return int(match.group(1)) if match else None
+
+
+class GitHubClient:
+    """
+    커넥션 풀을 공유하고 동시 요청 수를 제한하는 비동기 GitHub API 클라이언트.
+    토큰 선택과 한도 대기/재시도는 RateLimitScheduler가 담당
+    """
+
+    def __init__(self, token=None, base_url=None, max_concurrency=None, timeout=None, scheduler=None):
+        self.base_url = (base_url or settings.GITHUB_API_URL).rstrip("/")
+        self.max_concurrency = max_concurrency or settings.GITHUB_MAX_CONCURRENCY
+        self.timeout = timeout or settings.GITHUB_TIMEOUT
+        self.headers = {"Accept": "application/vnd.github+json"}
+        self.scheduler = scheduler or RateLimitScheduler([token])
+        self._client = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        limits = httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency,
+        )
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            limits=limits,
+            timeout=self.timeout,
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._client.aclose()
+        self._client = None
+
+    async def get(self, path, params=None, headers=None):
+        """동시성 제한 안에서 단일 GET 요청. 한도 초과/2차 제한/5xx는 스케줄러 판단에 따라 재시도"""
+        for attempt in range(self.scheduler.max_retries + 1):
+            async with self._semaphore:
+                # 실제로 보낼 차례가 된 요청만 토큰 한도를 차감 (대기 중인 페이지가 미리 소진하지 않도록)
+                budget, wait = self.scheduler.acquire()
+                if wait:
+                    print(f"Rate limit exhausted, waiting {wait:.0f}s for reset")
+                    self.scheduler.add_wait(wait)
+                    await asyncio.sleep(wait)
+
+                request_headers = {**self.scheduler.headers_for(budget), **(headers or {})}
+                with span("github_fetch"):
+                    response = await self._client.get(path, params=params, headers=request_headers)
+            GITHUB_REQUESTS.inc(status=response.status_code)
+
+            delay = self.scheduler.record(budget, response.status_code, response.headers, attempt, response.text)
+            if delay is None:
+                return response
+            self.scheduler.add_wait(delay)
+            await asyncio.sleep(delay)
+        return response
+
+    async def get_json(self, path, params=None):
+        response = await self.get(path, params=params)
+        if response.status_code != 200:
+            raise GitHubAPIError(response.status_code, path)
+        return response.json()
+
+    async def get_conditional(self, path, etag=None):
+        """ETag 조건부 GET. 변경이 없으면(304) 데이터 None 반환"""
+        headers = {"If-None-Match": etag} if etag else None
+        response = await self.get(path, headers=headers)
+        if response.status_code == 304:
+            return None, etag
+        if response.status_code != 200:
+            raise GitHubAPIError(response.status_code, path)
+        return response.json(), response.headers.get("ETag")
+
+    async def _get_page(self, path, params, page, headers=None):
+        page_params = dict(params or {})
+        page_params.update({"per_page": PER_PAGE, "page": page})
+        response = await self.get(path, params=page_params, headers=headers)
+        # 304: 변경 없음, 409: 커밋이 없는 빈 저장소
+        if response.status_code in (304, 409):
+            return response, []
+        if response.status_code != 200:
+            # 일부 페이지만 저장되지 않도록 실패를 그대로 올려보냄
+            raise GitHubAPIError(response.status_code, path, f"(page {page})")
+        return response, response.json()
+
+    async def _fetch_remaining(self, path, params, response, first_page):
+        """첫 페이지의 Link 헤더에서 마지막 페이지를 읽고 나머지 페이지를 병렬로 가져오기"""
+        all_data = list(first_page)
+        last_page = parse_last_page(response.headers.get("Link"))
+        if not last_page or last_page <= 1:
+            return all_data
+
+        results = await asyncio.gather(
+            *(self._get_page(path, params, page) for page in range(2, last_page + 1))
+        )
+        for _, data in results:
+            all_data.extend(data)
+        return all_data
+
+    async def fetch_pages(self, path, on_page, params=None, done_pages=frozenset()):
+        """
+        페이지를 받는 즉시 on_page(page, items, last_page)로 넘기고 보관하지 않음 (메모리는 동시 요청 수 × 페이지 크기).
+        done_pages에 있는 페이지는 건너뜀. 첫 페이지는 마지막 페이지 번호를 알기 위해 항상 요청
+        """
+        response, first_page = await self._get_page(path, params, 1)
+        if not first_page:
+            return 0
+        last_page = parse_last_page(response.headers.get("Link")) or 1
+        if 1 not in done_pages:
+            on_page(1, first_page, last_page)
+        del first_page
+
+        async def fetch_page(page):
+            _, data = await self._get_page(path, params, page)
+            if data:
+                on_page(page, data, last_page)
+
+        await asyncio.gather(
+            *(fetch_page(page) for page in range(2, last_page + 1) if page not in done_pages)
+        )
+        return last_page
+
+    async def stream_project(self, owner, repo, handlers, done_pages=None):
+        """
+        커밋, PR, 이슈를 동시에 페이지 단위로 handlers[table]에 전달하고 리포지토리 정보 반환
+        """
+        base_path = f"/repos/{owner}/{repo}"
+        done_pages = done_pages or {}
+        # 이슈도 state=all (기본값은 열린 이슈만 반환하여 증분 동기화와 데이터가 달라짐)
+        params = {"commits": None, "pull_requests": {"state": "all"}, "issues": {"state": "all"}}
+        paths = {"commits": "commits", "pull_requests": "pulls", "issues": "issues"}
+        repo_info, *_ = await asyncio.gather(
+            self.get_json(base_path),
+            *(
+                self.fetch_pages(f"{base_path}/{paths[table]}", handler, params=params[table],
+                                 done_pages=done_pages.get(table, frozenset()))
+                for table, handler in handlers.items()
+            ),
+        )
+        return repo_info
+
+    async def fetch_changes(self, path, params=None, etag=None):
+        """
+        첫 페이지를 ETag 조건부로 요청하여 변경이 없으면(304) 바로 종료하고,
+        변경이 있을 때만 나머지 페이지를 가져오기. (items 또는 None, 새 ETag) 반환
+        """
+        headers = {"If-None-Match": etag} if etag else None
+        response, first_page = await self._get_page(path, params, 1, headers=headers)
+        if response.status_code == 304:
+            return None, etag
+        new_etag = response.headers.get("ETag")
+        if not first_page:
+            return [], new_etag
+        return await self._fetch_remaining(path, params, response, first_page), new_etag
+
+    async def fetch_updated_since(self, path, since, params=None, etag=None):
+        """
+        `since` 파라미터를 지원하지 않는 엔드포인트(pulls)용.
+        updated 내림차순으로 페이지를 순서대로 읽다가 since 이전 항목이 나오면 중단
+        """
+        params = dict(params or {})
+        params.update({"sort": "updated", "direction": "desc"})
+        headers = {"If-None-Match": etag} if etag else None
+        response, data = await self._get_page(path, params, 1, headers=headers)
+        if response.status_code == 304:
+            return None, etag
+        new_etag = response.headers.get("ETag")
+
+        changed, page = [], 1
+        while data:
+            for item in data:
+                if since and (item.get("updated_at") or "") < since:
+                    return changed, new_etag
+                changed.append(item)
+            if len(data) < PER_PAGE:
+                break
+            page += 1
+            _, data = await self._get_page(path, params, page)
+        return changed, new_etag
+
+    async def get_project_changes(self, owner, repo, cursor):
+        """
+        동기화 커서(cursor) 이후 새로 생기거나 변경된 항목만 가져오기.
+        변경이 없는 리소스는 None으로 반환
+        """
+        base_path = f"/repos/{owner}/{repo}"
+        etags = cursor.get("etags", {})
+        commit_params = {"since": cursor["last_commit_date"]} if cursor.get("last_commit_date") else None
+        issue_params = {"state": "all"}
+        if cursor.get("issues_updated_at"):
+            issue_params["since"] = cursor["issues_updated_at"]
+
+        (repo_info, info_etag), (commits, commits_etag), (prs, prs_etag), (issues, issues_etag) = await asyncio.gather(
+            self.get_conditional(base_path, etag=etags.get("repo_info")),
+            self.fetch_changes(f"{base_path}/commits", params=commit_params, etag=etags.get("commits")),
+            self.fetch_updated_since(
+                f"{base_path}/pulls", cursor.get("pull_requests_updated_at"),
+                params={"state": "all"}, etag=etags.get("pull_requests"),
+            ),
+            self.fetch_changes(f"{base_path}/issues", params=issue_params, etag=etags.get("issues")),
+        )
+        return {
+            "repo_info": repo_info,
+            "commits": commits,
+            "pull_requests": prs,
+            "issues": issues,
+            "etags": {
+                "repo_info": info_etag,
+                "commits": commits_etag,
+                "pull_requests": prs_etag,
+                "issues": issues_etag,
+            },
+        }
+
+
+async def stream_project_pages(owner, repo, handlers, done_pages=None, token=None, base_url=None,
+                               max_concurrency=None, scheduler=None):
+    async with GitHubClient(token=token, base_url=base_url, max_concurrency=max_concurrency,
+                            scheduler=scheduler) as client:
+        return await client.stream_project(owner, repo, handlers, done_pages)
+
+
+async def fetch_project_changes(owner, repo, cursor, token=None, base_url=None, max_concurrency=None,
+                                scheduler=None):
+    async with GitHubClient(token=token, base_url=base_url, max_concurrency=max_concurrency,
+                            scheduler=scheduler) as client:
+        return await client.get_project_changes(owner, repo, cursor)
@@ -1,9 +1,15 @@
 import os
-import csv
-import requests
+import json
+import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
 from fastapi import HTTPException
+from services.github_client import fetch_project_changes, stream_project_pages
+from services.index_changes import record_changes, request_rebuild
+from services.page_spool import PageSpool
+from services.progress import emit
+from services.project_store import locate_table, merge_rows, table_path, write_rows
+from services.rate_limiter import RateLimitScheduler
 
 # .env 파일 로드
 load_dotenv("../../.env")
@@ -14,122 +20,204 @@ BASE_DIRECTORY.mkdir(parents=True, exist_ok=True)
 
 # GitHub Personal Access Token (환경 변수에서 가져오기)
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
-
-
-def fetch_all_data(url, params=None):
-    """페이징을 처리하여 모든 데이터를 가져오기"""
-    all_data = []
-    page = 1
-    while True:
-        if params is None:
-            params = {}
-        params.update({"per_page": 100, "page": page})  # 페이지 번호 추가
-
-        response = requests.get(url, headers=HEADERS, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            if not data:  # 더 이상 데이터가 없으면 종료
-                break
-            all_data.extend(data)
-            page += 1
-        else:
-            print(f"Error fetching data from {url}: {response.status_code}")
-            break
-    return all_data
-
-
-def get_project_details(owner, repo):
-    """특정 프로젝트의 상세 데이터 가져오기"""
-    base_url = f"https://api.github.com/repos/{owner}/{repo}"
-
-    # 리포지토리 기본 정보
-    repo_info = requests.get(base_url, headers=HEADERS).json()
-
-    # 모든 커밋 데이터
-    commits = fetch_all_data(f"{base_url}/commits")
-
-    # 모든 Pull Requests 데이터
-    pull_requests = fetch_all_data(f"{base_url}/pulls", params={"state": "all"})
-
-    # 모든 이슈 데이터
-    issues = fetch_all_data(f"{base_url}/issues")
-
-    return {
-        "repo_info": repo_info,
-        "commits": commits,
-        "pull_requests": pull_requests,
-        "issues": issues
-    }
-
-
-def save_to_csv(data, repo_name):
-    """데이터를 CSV 파일로 저장"""
-    repo_info = data["repo_info"]
-
-    # 📌 프로젝트마다 디렉토리 생성 후, 그 안에 csv 디렉토리 생성
-    project_path = BASE_DIRECTORY / repo_name / "csv"
+# 여러 토큰을 쉼표로 구분하여 지정하면 한도에 따라 번갈아 사용
+GITHUB_TOKENS = [t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",") if t.strip()] or [GITHUB_TOKEN]
+
+# 프로세스 전체에서 공유하는 요청 스케줄러 (토큰별 남은 한도 추적)
+SCHEDULER = RateLimitScheduler(GITHUB_TOKENS)
+
+
+# 테이블별 컬럼과 API 응답 → 저장 행 변환 함수
+INFO_COLUMNS = ["ID", "Name", "Description", "Stars", "Forks", "Language", "Last Updated", "Owner"]
+COMMIT_COLUMNS = ["ID", "Author", "Date", "Message"]
+PR_COLUMNS = ["ID", "Title", "Author", "State", "Created At", "Merged At", "Closed At"]
+ISSUE_COLUMNS = ["ID", "Title", "State", "Created At", "Closed At"]
+
+
+def info_to_row(repo_info):
+    return [
+        repo_info.get("id", ""),
+        repo_info.get("name", ""),
+        repo_info.get("description", ""),
+        repo_info.get("stargazers_count", 0),
+        repo_info.get("forks_count", 0),
+        repo_info.get("language", ""),
+        repo_info.get("updated_at", ""),
+        repo_info.get("owner", {}).get("login", "")
+    ]
+
+
+def commit_to_row(commit):
+    author_login = commit.get("author", {}).get("login") if commit.get("author") else "Unknown"
+    return [
+        commit.get("sha", ""),
+        author_login,
+        commit["commit"]["author"]["date"],
+        commit["commit"].get("message", "")
+    ]
+
+
+def pr_to_row(pr):
+    return [
+        pr.get("id", ""),
+        pr.get("title", ""),
+        pr["user"]["login"],
+        pr.get("state", ""),
+        pr.get("created_at", ""),
+        pr.get("merged_at", ""),
+        pr.get("closed_at", "")
+    ]
+
+
+def issue_to_row(issue):
+    return [
+        issue.get("id", ""),
+        issue.get("title", ""),
+        issue.get("state", ""),
+        issue.get("created_at", ""),
+        issue.get("closed_at", "")
+    ]
+
+
+def commit_date(commit):
+    return commit["commit"]["author"]["date"]
+
+
+def updated_at(item):
+    return item.get("updated_at") or ""
+
+
+# 테이블 → (컬럼, 행 변환 함수, 동기화 커서 키, 커서 기준 날짜)
+TABLES = {
+    "commits": (COMMIT_COLUMNS, commit_to_row, "last_commit_date", commit_date),
+    "pull_requests": (PR_COLUMNS, pr_to_row, "pull_requests_updated_at", updated_at),
+    "issues": (ISSUE_COLUMNS, issue_to_row, "issues_updated_at", updated_at),
+}
+
+
+def page_handler(spool, to_row, date_of, on_saved):
+    """받은 페이지를 필요한 컬럼만 남겨 바로 조각 파일에 기록하는 콜백"""
+    def on_page(page, items, last_page):
+        spool.write_page(page, [to_row(item) for item in items], meta={"latest": max(map(date_of, items))})
+        on_saved(page, last_page)
+    return on_page
+
+
+def download_project(owner, repo, max_concurrency=None, progress=None):
+    """
+    전체 이력을 페이지 단위로 스트리밍하여 저장(기본 Parquet)하고 동기화 커서 반환.
+    중단된 이전 수집이 있으면 완료된 페이지는 다시 받지 않음
+    """
+    # 📌 프로젝트마다 디렉토리 생성 (테이블은 storage/<repo>/<format>/ 아래)
+    project_path = BASE_DIRECTORY / repo
     project_path.mkdir(parents=True, exist_ok=True)
 
+    spools, handlers, done_pages = {}, {}, {}
+    pages_done, pages_total = {}, {}
+
+    def saved_callback(table):
+        def on_saved(page, last_page):
+            pages_done[table] += 1
+            pages_total[table] = last_page
+            emit(progress, "download", f"Fetched {table} page {page}/{last_page}",
+                 pages_done=sum(pages_done.values()), pages_total=sum(pages_total.values()))
+        return on_saved
+
+    for table, (columns, to_row, _, date_of) in TABLES.items():
+        spools[table] = PageSpool(project_path / ".parts" / table, table, columns)
+        handlers[table] = page_handler(spools[table], to_row, date_of, saved_callback(table))
+        done_pages[table] = spools[table].completed_pages()
+        pages_done[table] = len(done_pages[table])
+        if done_pages[table]:
+            print(f"{repo}: resuming {table} ({len(done_pages[table])} pages already saved)")
+
+    repo_info = asyncio.run(
+        stream_project_pages(owner, repo, handlers, done_pages, max_concurrency=max_concurrency, scheduler=SCHEDULER)
+    )
+
     # 프로젝트 기본 정보 저장
-    with open(project_path / f"{repo_name}_info.csv", "w", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
-        writer.writerow(["ID", "Name", "Description", "Stars", "Forks", "Language", "Last Updated", "Owner"])
-        writer.writerow([
-            repo_info.get("id", ""),
-            repo_info.get("name", ""),
-            repo_info.get("description", ""),
-            repo_info.get("stargazers_count", 0),
-            repo_info.get("forks_count", 0),
-            repo_info.get("language", ""),
-            repo_info.get("updated_at", ""),
-            repo_info.get("owner", {}).get("login", "")
-        ])
-
-    # 커밋 정보 저장
-    with open(project_path / f"{repo_name}_commits.csv", "w", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
-        writer.writerow(["ID", "Author", "Date", "Message"])
-        for commit in data["commits"]:
-            author_login = commit.get("author", {}).get("login") if commit.get("author") else "Unknown"
-            writer.writerow([
-                commit.get("sha", ""),
-                author_login,
-                commit["commit"]["author"]["date"],
-                commit["commit"].get("message", "")
-            ])
-
-    # Pull Requests 정보 저장
-    with open(project_path / f"{repo_name}_pull_requests.csv", "w", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
-        writer.writerow(["ID", "Title", "Author", "State", "Created At", "Merged At", "Closed At"])
-        for pr in data["pull_requests"]:
-            writer.writerow([
-                pr.get("id", ""),
-                pr.get("title", ""),
-                pr["user"]["login"],
-                pr.get("state", ""),
-                pr.get("created_at", ""),
-                pr.get("merged_at", ""),
-                pr.get("closed_at", "")
-            ])
-
-    # 이슈 정보 저장
-    with open(project_path / f"{repo_name}_issues.csv", "w", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
-        writer.writerow(["ID", "Title", "State", "Created At", "Closed At"])
-        for issue in data["issues"]:
-            writer.writerow([
-                issue.get("id", ""),
-                issue.get("title", ""),
-                issue.get("state", ""),
-                issue.get("created_at", ""),
-                issue.get("closed_at", "")
-            ])
-
-
-def download_github_repo(repo_url: str):
-    """GitHub 저장소를 다운로드하고 로컬에 저장"""
+    write_rows(table_path(project_path, repo, "info"), "info", INFO_COLUMNS, [info_to_row(repo_info)])
+
+    # 커밋, Pull Requests, 이슈 조각 파일을 최종 테이블 파일로 합치기
+    latest = {}
+    for table, spool in spools.items():
+        cursor_key = TABLES[table][2]
+        latest[cursor_key] = max((meta["latest"] for meta in spool.page_meta()), default="")
+        count = spool.finalize(table_path(project_path, repo, table))
+        print(f"{repo}: saved {count} {table}")
+        emit(progress, "write", f"Saved {count} {table}", table=table, rows=count)
+
+    return advance_cursor(None, latest)
+
+
+# 증분 동기화 커서: 마지막 커밋 날짜, PR/이슈의 마지막 updated_at, 리소스별 ETag
+def sync_state_path(repo_name):
+    return BASE_DIRECTORY / repo_name / "sync_state.json"
+
+
+def load_sync_state(repo_name):
+    path = sync_state_path(repo_name)
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_sync_state(repo_name, state):
+    path = sync_state_path(repo_name)
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def advance_cursor(cursor, latest, etags=None):
+    """가져온 항목의 최신 날짜로 커서를 앞으로 이동 (ISO 8601 문자열은 사전순 비교 가능)"""
+    cursor = dict(cursor or {})
+    for key, date in latest.items():
+        if date:
+            cursor[key] = max(cursor.get(key) or "", date)
+    merged_etags = dict(cursor.get("etags", {}))
+    merged_etags.update({k: v for k, v in (etags or {}).items() if v})
+    cursor["etags"] = merged_etags
+    return cursor
+
+
+def sync_project(owner, repo, cursor, max_concurrency=None, progress=None):
+    """커서 이후 변경분만 가져와 기존 테이블에 병합"""
+    emit(progress, "download", "Fetching changes since last sync")
+    changes = asyncio.run(
+        fetch_project_changes(owner, repo, cursor, max_concurrency=max_concurrency, scheduler=SCHEDULER)
+    )
+    project_path = BASE_DIRECTORY / repo
+
+    if changes["repo_info"] is not None:
+        write_rows(table_path(project_path, repo, "info"), "info", INFO_COLUMNS, [info_to_row(changes["repo_info"])])
+
+    latest = {}
+    upserted = {}
+    for table, (columns, to_row, cursor_key, date_of) in TABLES.items():
+        items = changes[table]
+        if not items:
+            continue
+        rows = [to_row(item) for item in items]
+        # 기존 CSV만 있는 저장소도 기본 형식(Parquet)으로 옮겨가며 병합
+        merge_rows(
+            table_path(project_path, repo, table), table, columns, rows,
+            source_path=locate_table(project_path, repo, table),
+        )
+        upserted[table] = [row[0] for row in rows]
+        latest[cursor_key] = max(map(date_of, items))
+        print(f"{repo}: merged {len(items)} new/updated {table}")
+        emit(progress, "write", f"Merged {len(items)} new/updated {table}", table=table, rows=len(items))
+
+    # 벡터 인덱스에는 바뀐 행만 반영하도록 기록
+    record_changes(project_path, upserted)
+    return advance_cursor(cursor, latest, changes["etags"])
+
+
+def parse_repo_url(repo_url: str):
+    """GitHub URL에서 (owner, repo) 추출"""
     if not repo_url.startswith("https://github.com/"):
         raise HTTPException(status_code=400, detail="Invalid GitHub URL")
 
@@ -137,12 +225,24 @@ def download_github_repo(repo_url: str):
     if len(repo_parts) < 2:
         raise HTTPException(status_code=400, detail="Invalid GitHub repository format")
 
-    owner, repo = repo_parts[0], repo_parts[1].replace(".git", "")
+    return repo_parts[0], repo_parts[1].replace(".git", "")
+
+
+def download_github_repo(repo_url: str, incremental: bool = False, progress=None):
+    """
+    GitHub 저장소를 다운로드하고 로컬에 저장.
+    incremental=True이고 이전 동기화 기록이 있으면 변경분만 가져와 병합.
+    progress 콜백에는 페이지 수집/저장 이벤트가 전달됨
+    """
+    owner, repo = parse_repo_url(repo_url)
 
-    # GitHub API에서 데이터 가져오기
-    repo_data = get_project_details(owner, repo)
+    cursor = load_sync_state(repo) if incremental else None
+    if cursor is not None:
+        save_sync_state(repo, sync_project(owner, repo, cursor, progress=progress))
+        return repo
 
-    # CSV 저장
-    save_to_csv(repo_data, repo)
+    # GitHub API에서 페이지 단위로 받아 바로 저장
+    save_sync_state(repo, download_project(owner, repo, progress=progress))
+    request_rebuild(BASE_DIRECTORY / repo)
 
     return repo
@@ -0,0 +1,96 @@
+# app/services/index_changes.py
+"""
+벡터 인덱스에 아직 반영하지 않은 변경분 기록 (storage/<repo>/index_changes.json).
+동기화(github_service)가 바뀐 행의 ID를 기록하고, 인덱스 갱신(vector_service)은
+시작할 때 기록을 처리 중 파일(index_changes.applying.json)로 옮겨 가져간 뒤(claim_changes)
+반영을 마치면 그 파일만 지운다(finish_changes). 갱신하는 동안 동기화가 기록한 변경분은
+새 기록 파일에 쌓여 다음 갱신에서 반영되고, 갱신이 중간에 실패하면 처리 중 파일이 남아
+다음 갱신에서 새 기록과 합쳐 다시 반영된다.
+변경분 동기화(since)로는 GitHub에서 삭제된 행을 알 수 없으므로 추가/수정만 기록하며,
+삭제를 반영하려면 전체 다운로드 후 다시 구축(request_rebuild)해야 한다.
+
+형식: {"rebuild": bool, "upserted": {table: [ID, ...]}}
+"""
+import json
+import os
+from pathlib import Path
+
+
+def changes_path(project_dir):
+    return Path(project_dir) / "index_changes.json"
+
+
+def _applying_path(project_dir):
+    return Path(project_dir) / "index_changes.applying.json"
+
+
+def _claimed_path(project_dir):
+    # 기록 파일을 옮겨 온 직후의 임시 이름 (처리 중 파일과 합치기 전)
+    return Path(project_dir) / "index_changes.claimed.json"
+
+
+def _read_changes(path):
+    changes = {"rebuild": False, "upserted": {}}
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            changes.update(json.load(f))
+    return changes
+
+
+def _write_changes(path, changes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(changes, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _merge(changes, other):
+    changes["rebuild"] = changes["rebuild"] or other["rebuild"]
+    for table, ids in other["upserted"].items():
+        changes["upserted"][table] = sorted(set(changes["upserted"].get(table, [])) | set(ids))
+    return changes
+
+
+def load_changes(project_dir):
+    return _read_changes(changes_path(project_dir))
+
+
+def record_changes(project_dir, upserted):
+    """추가/수정된 ID(upserted: {table: [ID]})를 테이블별로 누적 기록"""
+    changes = load_changes(project_dir)
+    _merge(changes, {"rebuild": False, "upserted": {table: [str(i) for i in ids] for table, ids in upserted.items()}})
+    _write_changes(changes_path(project_dir), changes)
+
+
+def request_rebuild(project_dir):
+    """전체 데이터를 새로 받은 경우 다음 갱신에서 인덱스를 처음부터 다시 구축"""
+    _write_changes(changes_path(project_dir), {"rebuild": True, "upserted": {}})
+
+
+def _absorb(changes, claimed, applying):
+    """옮겨 온 기록(claimed)을 처리 중 변경분에 합쳐 저장한 뒤 지움"""
+    _merge(changes, _read_changes(claimed))
+    _write_changes(applying, changes)
+    claimed.unlink()
+
+
+def claim_changes(project_dir):
+    """
+    반영할 변경분을 가져감. 기록 파일을 한 번의 rename으로 옮기므로 이후에 기록되는 변경분은
+    새 파일에 쌓임. 이전 갱신이 마치지 못한 처리 중 변경분이 있으면 함께 반환
+    """
+    applying, claimed = _applying_path(project_dir), _claimed_path(project_dir)
+    changes = _read_changes(applying)
+    # 옮긴 뒤 합치지 못한 기록(중단된 이전 호출)이 있으면 먼저 합침
+    if claimed.exists():
+        _absorb(changes, claimed, applying)
+    if changes_path(project_dir).exists():
+        os.replace(changes_path(project_dir), claimed)
+        _absorb(changes, claimed, applying)
+    return changes
+
+
+def finish_changes(project_dir):
+    """claim_changes로 가져간 변경분을 모두 반영한 뒤 호출 (그 뒤의 기록은 남김)"""
+    _applying_path(project_dir).unlink(missing_ok=True)
@@ -0,0 +1,184 @@
+# app/services/index_factory.py
+"""
+벡터 수와 메모리/지연 시간 예산으로 FAISS 인덱스 종류(Flat, IVF, HNSW, IVF-PQ)를 고르고
+학습/검색 파라미터를 정하는 공용 모듈. 선택한 구성은 인덱스 옆 index_config.json에 저장하여
+로더가 nprobe/efSearch 등 검색 파라미터를 복원한다.
+"""
+import json
+import math
+import os
+
+import faiss
+import numpy as np
+from config import settings
+from services.metrics import span
+
+CONFIG_FILE = "index_config.json"
+
+# 단일 코어 L2 스캔 처리량 추정치 (부동소수점 연산/ms)
+FLAT_FLOPS_PER_MS = 8e6
+# 학습에 클러스터당 최소/최대로 사용할 벡터 수 (FAISS 권장 범위)
+MIN_POINTS_PER_CENTROID = 39
+MAX_POINTS_PER_CENTROID = 256
+HNSW_M = 32
+# 저장 정밀도 → FAISS 벡터 인코딩 (float16/int8은 스칼라 양자화)
+ENCODINGS = {"float32": "Flat", "float16": "SQfp16", "int8": "SQ8"}
+BYTES_PER_DIM = {"float32": 4, "float16": 2, "int8": 1}
+
+
+def estimate_flat_latency_ms(n_vectors, dim):
+    return n_vectors * dim * 2 / FLAT_FLOPS_PER_MS
+
+
+def choose_nlist(n_vectors):
+    """약 4*sqrt(N)개의 클러스터. 클러스터마다 학습 벡터가 충분하도록 상한 적용"""
+    nlist = 2 ** round(math.log2(max(1.0, 4 * math.sqrt(n_vectors))))
+    return int(max(1, min(nlist, n_vectors // MIN_POINTS_PER_CENTROID)))
+
+
+def choose_pq_m(dim, max_m=64):
+    """차원을 나누어떨어지게 하는 서브벡터 수 중 서브벡터당 4차원 이상인 가장 큰 값"""
+    candidates = [m for m in range(1, min(max_m, dim // 4) + 1) if dim % m == 0]
+    return candidates[-1] if candidates else 1
+
+
+def choose_index_config(n_vectors, dim, index_type=None, memory_budget_mb=None, latency_budget_ms=None,
+                        updatable=False, precision=None):
+    """
+    인덱스 구성(dict) 선택.
+    - 전체 스캔 예상 시간이 지연 예산 안이거나 학습할 벡터가 부족하면 Flat
+    - 벡터 + 그래프가 메모리 예산에 들어가면 HNSW (updatable이면 삭제를 지원하지 않으므로 제외)
+    - 벡터가 메모리 예산에 들어가면 IVF-Flat, 아니면 IVF-PQ
+    벡터 크기는 저장 정밀도(float32/float16/int8) 기준
+    """
+    index_type = index_type or settings.INDEX_TYPE
+    precision = precision or settings.VECTOR_PRECISION
+    budget_bytes = (memory_budget_mb or settings.INDEX_MEMORY_BUDGET_MB) * 1024 * 1024
+    latency_budget_ms = latency_budget_ms or settings.INDEX_LATENCY_BUDGET_MS
+    nlist = choose_nlist(n_vectors)
+
+    if index_type == "auto":
+        raw_bytes = n_vectors * dim * BYTES_PER_DIM[precision]
+        if estimate_flat_latency_ms(n_vectors, dim) <= latency_budget_ms or nlist < 16:
+            index_type = "flat"
+        elif not updatable and raw_bytes + n_vectors * HNSW_M * 2 * 4 <= budget_bytes:
+            index_type = "hnsw"
+        elif raw_bytes <= budget_bytes:
+            index_type = "ivf"
+        else:
+            index_type = "ivfpq"
+
+    config = {"type": index_type, "dim": dim, "n_vectors": n_vectors, "metric": "l2"}
+    if index_type != "ivfpq":
+        config["precision"] = precision
+    if index_type in ("ivf", "ivfpq"):
+        # 지연 예산이 빠듯할수록 적은 클러스터를 탐색
+        config.update(nlist=nlist, nprobe=max(1, nlist // (16 if latency_budget_ms < 10 else 8)))
+    if index_type == "ivfpq":
+        config.update(pq_m=choose_pq_m(dim), pq_nbits=8 if n_vectors >= 256 * MIN_POINTS_PER_CENTROID else 4)
+    if index_type == "hnsw":
+        config.update(hnsw_m=HNSW_M, ef_construction=200, ef_search=64 if latency_budget_ms < 10 else 128)
+    return config
+
+
+def factory_string(config):
+    index_type = config["type"]
+    encoding = ENCODINGS[config.get("precision", "float32")]
+    if index_type == "flat":
+        return encoding
+    if index_type == "hnsw":
+        return f"HNSW{config['hnsw_m']}" if encoding == "Flat" else f"HNSW{config['hnsw_m']}_{encoding}"
+    if index_type == "ivf":
+        return f"IVF{config['nlist']},{encoding}"
+    if index_type == "ivfpq":
+        return f"IVF{config['nlist']},PQ{config['pq_m']}x{config['pq_nbits']}"
+    raise ValueError(f"Unknown index type: {index_type}")
+
+
+def uses_native_ids(config):
+    """IVF 계열은 add_with_ids/remove_ids를 직접 지원하므로 ID 맵으로 감싸지 않음"""
+    return config["type"] in ("ivf", "ivfpq")
+
+
+def supports_removal(config):
+    return config["type"] != "hnsw"
+
+
+def should_rebuild(config, n_vectors, updatable=False):
+    """
+    변경분 반영 후 벡터 수에 맞는 인덱스 종류가 달라졌거나
+    IVF 클러스터 수가 벡터 수에 비해 너무 적어졌으면 다시 구축
+    """
+    if settings.INDEX_TYPE != "auto":
+        return False
+    chosen = choose_index_config(n_vectors, config["dim"], updatable=updatable)
+    if chosen["type"] != config["type"]:
+        return True
+    return "nlist" in config and n_vectors > 4 * config["n_vectors"]
+
+
+def apply_search_params(index, config):
+    """저장된 구성의 검색 파라미터(nprobe, efSearch)를 인덱스에 적용"""
+    params = faiss.ParameterSpace()
+    if "nprobe" in config:
+        params.set_index_parameter(index, "nprobe", config["nprobe"])
+    if "ef_search" in config:
+        params.set_index_parameter(index, "efSearch", config["ef_search"])
+    return index
+
+
+def create_index(config):
+    """구성에 맞는 빈 인덱스 생성"""
+    dim = config["dim"]
+    precision = config.get("precision", "float32")
+    if config["type"] == "hnsw":
+        if precision == "float32":
+            index = faiss.IndexHNSWFlat(dim, config["hnsw_m"], faiss.METRIC_L2)
+        else:
+            qtype = faiss.ScalarQuantizer.QT_fp16 if precision == "float16" else faiss.ScalarQuantizer.QT_8bit
+            index = faiss.IndexHNSWSQ(dim, qtype, config["hnsw_m"], faiss.METRIC_L2)
+        index.hnsw.efConstruction = config["ef_construction"]
+        return index
+    return faiss.index_factory(dim, factory_string(config), faiss.METRIC_L2)
+
+
+def build_index(vectors, ids=None, config=None, updatable=False):
+    """
+    벡터로 인덱스를 만들고 (필요하면 학습 후) 추가. (인덱스, 구성) 반환.
+    ids를 주면 인덱스 검색 결과가 해당 ID로 반환됨
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n_vectors, dim = vectors.shape
+    config = dict(config or choose_index_config(n_vectors, dim, updatable=updatable))
+    config["id_mapped"] = ids is not None
+
+    with span("index_build"):
+        index = create_index(config)
+        if not index.is_trained:
+            # 클러스터당 최대 256개까지만 샘플링하여 학습 (스칼라 양자화만 있으면 최대 65536개)
+            sample_size = min(n_vectors, config.get("nlist", 256) * MAX_POINTS_PER_CENTROID)
+            sample = vectors[np.random.default_rng(0).choice(n_vectors, sample_size, replace=False)]
+            index.train(sample)
+
+        if ids is not None and not uses_native_ids(config):
+            index = faiss.IndexIDMap2(index)
+        if ids is None:
+            index.add(vectors)
+        else:
+            index.add_with_ids(vectors, np.asarray(ids, dtype=np.int64))
+        apply_search_params(index, config)
+    print(f"Built {factory_string(config)} index for {n_vectors} vectors: {config}")
+    return index, config
+
+
+def save_index_config(directory, config):
+    with open(os.path.join(directory, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+
+def load_index_config(directory):
+    path = os.path.join(directory, CONFIG_FILE)
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,165 @@
+# app/services/index_registry.py
+"""
+프로젝트별 벡터 스토어(storage/<repo>/vectorstore)를 처음 사용할 때 로드하고,
+메모리 예산(INDEX_CACHE_MEMORY_MB) 안에서 최근에 사용한 프로젝트만 유지하는 레지스트리.
+프로젝트를 지정하지 않으면 settings.VECTORSTORE_DIR의 기본 벡터 스토어를 사용한다.
+새 버전이 공개되면(index_versions) 백그라운드에서 로드한 뒤 교체하며, 그동안 요청은 이전 버전으로 처리한다.
+교체된 이전 버전은 진행 중인 검색이 참조를 놓으면 해제된다.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from config import settings
+from services.index_versions import current_version, version_dir
+from services.vectorstore import VectorStoreService
+
+BASE_DIRECTORY = Path(os.path.abspath(os.path.join(os.path.dirname(__file__), "../storage")))
+DEFAULT_PROJECT = None
+
+
+def project_vectorstore_dir(project):
+    """프로젝트 이름 → 벡터 스토어 디렉토리. storage 밖을 가리키는 이름은 거부"""
+    if project is DEFAULT_PROJECT:
+        return Path(settings.VECTORSTORE_DIR)
+    project_dir = (BASE_DIRECTORY / project).resolve()
+    if project_dir.parent != BASE_DIRECTORY.resolve():
+        raise ValueError(f"Invalid project name: {project}")
+    return project_dir / "vectorstore"
+
+
+class IndexRegistry:
+    def __init__(self, memory_budget_mb=None):
+        self.memory_budget = (memory_budget_mb or settings.INDEX_CACHE_MEMORY_MB) * 1024 * 1024
+        self.entries = OrderedDict()  # project → (서비스, 추정 바이트, 버전), 오래 사용하지 않은 순서
+        self.counters = {"hits": 0, "loads": 0, "evictions": 0, "load_failures": 0, "reloads": 0}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._checked_at = {}  # project → 마지막으로 CURRENT를 확인한 시각
+        self._reloading = set()
+
+    def get(self, project=DEFAULT_PROJECT):
+        """
+        프로젝트의 VectorStoreService 반환. 처음 요청되면 로드하며,
+        같은 프로젝트를 동시에 요청해도 한 번만 로드함.
+        이미 로드된 프로젝트는 새 버전이 있는지 확인만 하고 기존 서비스를 바로 반환
+        """
+        service = self._hit(project)
+        if service is not None:
+            return service
+        with self._lock:
+            load_lock = self._load_locks.setdefault(project, threading.Lock())
+
+        with load_lock:
+            service = self._hit(project)
+            if service is not None:
+                return service
+            service, version = self._load(project)
+            with self._lock:
+                self.entries[project] = (service, service.estimated_bytes(), version)
+                self._checked_at[project] = time.monotonic()
+                self.counters["loads"] += 1
+                self._evict()
+        return service
+
+    def _hit(self, project):
+        with self._lock:
+            if project not in self.entries:
+                return None
+            self.entries.move_to_end(project)
+            self.counters["hits"] += 1
+            service, _, version = self.entries[project]
+        self._check_version(project, version)
+        return service
+
+    def _load(self, project):
+        """현재 버전의 벡터 스토어 로드. (서비스, 버전) 반환"""
+        root = project_vectorstore_dir(project)
+        version = current_version(root)
+        path = version_dir(root, version)
+        if not (path / "index.faiss").is_file():
+            raise FileNotFoundError(f"Vector store not found for project: {project}")
+        try:
+            # 쿼리 임베딩 모델과 인코더(캐시/배치)는 모든 프로젝트가 공유
+            return VectorStoreService(path, project=project, version=version), version
+        except Exception:
+            with self._lock:
+                self.counters["load_failures"] += 1
+            raise
+
+    def _check_version(self, project, version):
+        """
+        INDEX_RELOAD_CHECK_SECONDS마다 CURRENT를 확인해 버전이 바뀌었으면 백그라운드 로드 시작
+        """
+        now = time.monotonic()
+        with self._lock:
+            if project in self._reloading or now - self._checked_at.get(project, 0) < settings.INDEX_RELOAD_CHECK_SECONDS:
+                return
+            self._checked_at[project] = now
+        if current_version(project_vectorstore_dir(project)) != version:
+            self.reload(project)
+
+    def reload(self, project):
+        """
+        로드된 프로젝트의 현재 버전을 백그라운드 스레드에서 로드해 교체 (로드되지 않았으면 무시).
+        로드가 끝날 때까지 요청은 기존 버전으로 처리됨
+        """
+        with self._lock:
+            if project not in self.entries or project in self._reloading:
+                return
+            self._reloading.add(project)
+        threading.Thread(target=self._reload, args=(project,), daemon=True).start()
+
+    def _reload(self, project):
+        try:
+            service, version = self._load(project)
+            with self._lock:
+                # 로드하는 동안 제거된 프로젝트는 다시 올리지 않음
+                if project in self.entries:
+                    self.entries[project] = (service, service.estimated_bytes(), version)
+                    self.entries.move_to_end(project)
+                    self.counters["reloads"] += 1
+                    self._evict()
+            print(f"Reloaded vector store for project: {project or 'default'} (version {version})")
+        except Exception as e:
+            print(f"Failed to reload vector store for project {project or 'default'}: {e}")
+        finally:
+            with self._lock:
+                self._reloading.discard(project)
+
+    def _evict(self):
+        """예산을 넘으면 가장 오래 사용하지 않은 프로젝트부터 제거 (방금 로드한 프로젝트는 유지).
+        제거된 서비스는 진행 중인 검색이 끝나고 참조가 사라지면 해제됨"""
+        while len(self.entries) > 1 and self.resident_bytes() > self.memory_budget:
+            project, _ = self.entries.popitem(last=False)
+            self.counters["evictions"] += 1
+            print(f"Evicted vector store for project: {project}")
+
+    def resident_bytes(self):
+        return sum(size for _, size, _ in self.entries.values())
+
+    def invalidate(self, project):
+        """프로젝트를 메모리에서 내림 (다음 요청 때 다시 로드)"""
+        with self._lock:
+            self.entries.pop(project, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["loads"]
+            return {
+                **self.counters,
+                "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+                "resident_projects": [
+                    {"project": project or "default", "bytes": size, "version": version}
+                    for project, (_, size, version) in self.entries.items()
+                ],
+                "reloading": [project or "default" for project in self._reloading],
+                "resident_bytes": self.resident_bytes(),
+                "memory_budget_bytes": self.memory_budget,
+            }
+
+
+# 라우트들이 함께 사용하는 레지스트리
+INDEX_REGISTRY = IndexRegistry()
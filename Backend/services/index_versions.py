@@ -0,0 +1,83 @@
+# app/services/index_versions.py
+"""
+버전별 벡터 스토어 디렉토리 관리.
+새 인덱스는 <root>/versions/<버전>/ 에 모두 기록한 뒤 <root>/CURRENT 파일을 원자적으로 교체해 공개하므로,
+읽는 쪽은 항상 완성된 한 버전만 보게 되고 이전 버전을 읽는 중인 검색도 깨지지 않는다.
+CURRENT가 없으면 <root>에 바로 저장된 이전 형식으로 취급한다.
+"""
+import os
+import shutil
+import time
+from pathlib import Path
+
+from config import settings
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+
+def current_version(root):
+    """현재 공개된 버전 이름. 이전 형식(버전 없음)이면 None"""
+    try:
+        return (Path(root) / CURRENT_FILE).read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def version_dir(root, version):
+    return Path(root) if version is None else Path(root) / VERSIONS_DIR / version
+
+
+def current_version_dir(root):
+    """현재 버전의 파일이 있는 디렉토리"""
+    return version_dir(root, current_version(root))
+
+
+def new_version_dir(root):
+    """새 버전을 기록할 빈 디렉토리 (이름은 생성 시각, 정렬 순서 = 생성 순서)"""
+    versions = Path(root) / VERSIONS_DIR
+    versions.mkdir(parents=True, exist_ok=True)
+    version = f"{time.time_ns():020d}"
+    path = versions / version
+    path.mkdir()
+    return path
+
+
+def publish_version(root, path, keep=None):
+    """
+    path(new_version_dir로 만든 디렉토리)를 현재 버전으로 공개.
+    CURRENT는 임시 파일을 쓴 뒤 os.replace로 교체하여 중간 상태가 보이지 않도록 함
+    """
+    root = Path(root)
+    tmp = root / f"{CURRENT_FILE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(Path(path).name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, root / CURRENT_FILE)
+    _remove_legacy_files(root)
+    prune_versions(root, keep)
+
+
+def _remove_legacy_files(root):
+    """버전 디렉토리로 옮긴 뒤 root에 남은 이전 형식 파일 정리"""
+    for entry in Path(root).iterdir():
+        if entry.is_file() and entry.name != CURRENT_FILE:
+            entry.unlink()
+
+
+def prune_versions(root, keep=None):
+    """
+    최근 keep개(현재 버전 포함)만 남기고 이전 버전 삭제.
+    바로 이전 버전은 아직 교체하지 않은 서버가 읽고 있을 수 있으므로 keep은 2 이상 권장
+    (메모리 매핑된 파일은 삭제되어도 매핑이 해제될 때까지 읽을 수 있음)
+    """
+    keep = max(1, keep or settings.INDEX_VERSIONS_KEEP)
+    versions = Path(root) / VERSIONS_DIR
+    if not versions.is_dir():
+        return
+    current = current_version(root)
+    names = sorted((entry.name for entry in versions.iterdir() if entry.is_dir()), reverse=True)
+    for name in names[keep:]:
+        if name != current:
+            shutil.rmtree(versions / name, ignore_errors=True)
@@ -0,0 +1,158 @@
+# app/services/job_manager.py
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Job:
+    """
+    백그라운드 작업 하나의 상태와 진행 이벤트.
+    여러 구독자(SSE 연결)가 같은 작업의 진행 상황을 함께 받을 수 있음
+    """
+
+    def __init__(self, key, info=None, resource=None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.resource = resource
+        self.info = info or {}
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.last_event = {"stage": "start", "status": "Queued"}
+        self.result = None
+        self.error = None
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self.status in ("completed", "failed")
+
+    def publish(self, event):
+        """작업 스레드에서 호출. 모든 구독자의 이벤트 루프로 이벤트 전달"""
+        with self._lock:
+            if event is not None:
+                self.last_event = event
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def finish(self, status, final_event):
+        """최종 상태를 기록하고 구독자에게 마지막 이벤트와 종료 신호(None) 전달"""
+        with self._lock:
+            self.last_event = final_event
+            self.status = status
+            self.finished_at = time.time()
+            subscribers, self._subscribers = self._subscribers, []
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, final_event)
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    def subscribe(self, loop):
+        """구독 큐 반환. 현재 진행 상태를 먼저 넣어 늦게 붙은 구독자도 바로 따라잡도록 함"""
+        queue = asyncio.Queue()
+        with self._lock:
+            queue.put_nowait(self.last_event)
+            if self.done:
+                queue.put_nowait(None)
+            else:
+                self._subscribers.append((loop, queue))
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers = [(l, q) for l, q in self._subscribers if q is not queue]
+
+    def snapshot(self):
+        return {
+            "job_id": self.id,
+            "key": self.key,
+            "resource": self.resource,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "last_event": self.last_event,
+            "result": self.result,
+            "error": self.error,
+            "subscribers": len(self._subscribers),
+            **self.info,
+        }
+
+
+class JobManager:
+    """
+    제한된 워커 풀에서 작업을 실행하고, 같은 키(저장소)에 대해서는 진행 중인 작업을 하나만 유지.
+    이미 진행 중인 키로 요청하면 새 작업 대신 기존 작업을 반환.
+    키가 달라도 같은 자원(저장 디렉토리)을 쓰는 작업은 동시에 실행하지 않고 차례로 실행
+    """
+
+    def __init__(self, max_workers=2, max_finished_jobs=200):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="build-job")
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs = {}
+        self.active = {}
+        self._resource_locks = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, work, resource=None, **info):
+        """
+        work(progress)를 백그라운드에서 실행. (job, 새로 만들었는지 여부) 반환.
+        work의 반환값(dict)은 완료 이벤트와 job.result에 담김.
+        resource가 같은 작업이 실행 중이면 끝날 때까지 기다렸다가 실행
+        """
+        with self._lock:
+            job = self.active.get(key)
+            if job is not None:
+                return job, False
+            job = Job(key, info, resource)
+            self.jobs[job.id] = job
+            self.active[key] = job
+            self._prune()
+        self.executor.submit(self._run, job, work)
+        return job, True
+
+    def _resource_lock(self, resource):
+        if resource is None:
+            return threading.Lock()
+        with self._lock:
+            return self._resource_locks.setdefault(resource, threading.Lock())
+
+    def _run(self, job, work):
+        resource_lock = self._resource_lock(job.resource)
+        if not resource_lock.acquire(blocking=False):
+            job.publish({"stage": "start", "status": f"Waiting for another job on {job.resource}"})
+            resource_lock.acquire()
+        try:
+            job.status = "running"
+            job.started_at = time.time()
+            job.publish({"stage": "start", "status": "Started"})
+            job.result = work(job.publish)
+            status = "completed"
+            final_event = {"stage": "complete", "status": "Process complete", **(job.result or {})}
+        except Exception as e:
+            # HTTPException은 detail에 메시지가 있음
+            job.error = str(getattr(e, "detail", e))
+            status = "failed"
+            final_event = {"stage": "error", "status": "Error", "message": job.error}
+        finally:
+            resource_lock.release()
+        with self._lock:
+            if self.active.get(job.key) is job:
+                del self.active[job.key]
+        job.finish(status, final_event)
+
+    def _prune(self):
+        """완료된 작업 기록이 너무 많으면 오래된 것부터 삭제"""
+        finished = [job for job in self.jobs.values() if job.done]
+        for job in sorted(finished, key=lambda j: j.finished_at)[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job.id]
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list(self):
+        return [job.snapshot() for job in sorted(self.jobs.values(), key=lambda j: j.created_at, reverse=True)]
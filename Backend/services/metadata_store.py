@@ -0,0 +1,123 @@
+# app/services/metadata_store.py
+"""
+문서 메타데이터를 SQLite 파일(metadata.sqlite)에 저장하는 모듈.
+FAISS ID(label)와 문서 키로 조회하고, type/state/author/날짜 컬럼에 인덱스를 두어
+검색 결과 상위 k개의 메타데이터를 한 번의 쿼리로 가져오거나 조건에 맞는 ID를 뽑을 수 있다.
+원본 행(original_data)은 JSON 문자열로 함께 저장한다.
+"""
+import json
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+from services.document_builder import metadata_frame, text_column
+
+METADATA_FILE = "metadata.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    label INTEGER PRIMARY KEY,
+    doc_key TEXT NOT NULL UNIQUE,
+    doc_id TEXT,
+    type TEXT,
+    state TEXT,
+    author TEXT,
+    date TEXT,
+    closed_at TEXT,
+    merged_at TEXT,
+    project TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_documents_doc_id ON documents (doc_id);
+CREATE INDEX IF NOT EXISTS idx_documents_type ON documents (type, date);
+CREATE INDEX IF NOT EXISTS idx_documents_state ON documents (state);
+CREATE INDEX IF NOT EXISTS idx_documents_author ON documents (author, date);
+CREATE INDEX IF NOT EXISTS idx_documents_date ON documents (date);
+"""
+
+# 인덱스 컬럼 → 원본 컬럼 후보 (앞의 것이 우선). date는 커밋 날짜 또는 생성 시각
+FIELD_SOURCES = {
+    "state": ["State", "state"],
+    "author": ["Author", "author"],
+    "date": ["Date", "Created At", "date", "created_at"],
+    "closed_at": ["Closed At", "closed_at"],
+    "merged_at": ["Merged At", "merged_at"],
+}
+COLUMNS = ["label", "doc_key", "doc_id", "type", *FIELD_SOURCES, "project", "data"]
+# SQLite 변수 개수 제한 안에서 IN 조회
+QUERY_CHUNK = 900
+
+
+def _field_column(frame, candidates):
+    """후보 중 처음 있는 컬럼을 문자열(타임스탬프는 ISO 8601) 목록으로, 결측값은 None"""
+    for name in candidates:
+        if name in frame.columns:
+            return [None if pd.isna(value) else value for value in text_column(frame[name], None)]
+    return [None] * len(frame)
+
+
+class MetadataStore:
+    def __init__(self, path, read_only=False):
+        self.path = str(path)
+        if read_only:
+            self.conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def add_frame(self, frame, labels, project=None):
+        """
+        build_documents 결과(key 컬럼 포함)를 FAISS ID(labels)와 함께 저장.
+        같은 ID/키가 있으면 교체
+        """
+        if not len(frame):
+            return
+        keys = frame["key"] if "key" in frame.columns else frame["type"] + ":" + frame["doc_id"]
+        # 원본 행은 DataFrame 단위로 한 번에 JSON 직렬화
+        data = metadata_frame(frame.drop(columns="key", errors="ignore")).to_json(
+            orient="records", lines=True, date_format="iso", force_ascii=False,
+        ).splitlines()
+        columns = [
+            np.asarray(labels, dtype=np.int64).tolist(), keys.tolist(), frame["doc_id"].tolist(), frame["type"].tolist(),
+            *(_field_column(frame, sources) for sources in FIELD_SOURCES.values()),
+            [project] * len(frame), data,
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO documents ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                zip(*columns),
+            )
+
+    def get_many(self, labels):
+        """FAISS ID 목록의 메타데이터를 {label: dict}로 반환 (ID 수가 적으면 한 번의 쿼리)"""
+        labels = [int(label) for label in labels]
+        result = {}
+        with self._lock:
+            for start in range(0, len(labels), QUERY_CHUNK):
+                chunk = labels[start:start + QUERY_CHUNK]
+                rows = self.conn.execute(
+                    f"SELECT {', '.join(COLUMNS)} FROM documents WHERE label IN ({', '.join('?' * len(chunk))})", chunk,
+                ).fetchall()
+                for row in rows:
+                    record = dict(zip(COLUMNS, row))
+                    record["original_data"] = json.loads(record.pop("data") or "{}")
+                    result[record.pop("label")] = record
+        return result
+
+    def filter_columns(self):
+        """필터 사전 계산용 (label 배열, {type/state/author/date: 값 목록}) 한 번에 읽기"""
+        with self._lock:
+            rows = self.conn.execute("SELECT label, type, state, author, date FROM documents ORDER BY label").fetchall()
+        labels = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        columns = {name: [row[i] for row in rows] for i, name in enumerate(("type", "state", "author", "date"), 1)}
+        return labels, columns
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,166 @@
+# app/services/metrics.py
+"""
+가벼운 계측 모듈: 카운터, 히스토그램, 단계별 시간 측정(span)과 Prometheus 텍스트 형식 출력.
+span으로 잰 시간은 chatbot_stage_seconds{stage=...} 히스토그램에 쌓이고,
+요청마다 start_timings()를 호출해 두면 같은 컨텍스트(asyncio.to_thread 포함)의 단계별 시간도 모은다.
+각 서비스의 통계 dict(metrics()/stats())는 collector로 등록하면 숫자 값이 게이지로 함께 출력된다.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# 초 단위 히스토그램 구간 (쿼리 임베딩 ~ LLM 호출, 인덱스 구축까지)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value=1, **labels):
+        key = tuple((name, labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.values = {}  # 레이블 → [구간별 개수, 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple((name, labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            counts, _, _ = entry = self.values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self.values.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{_format_labels(key + (('le', repr(bound)),))} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+def flatten_gauges(prefix, stats):
+    """통계 dict의 숫자 값을 (게이지 이름, 값) 목록으로 (중첩 dict는 이름을 이어 붙임, 문자열/목록은 제외)"""
+    gauges = []
+    for name, value in stats.items():
+        metric = f"{prefix}_{name}".replace("-", "_").replace(".", "_").replace("/", "_")
+        if isinstance(value, dict):
+            gauges.extend(flatten_gauges(metric, value))
+        elif isinstance(value, bool):
+            gauges.append((metric, int(value)))
+        elif isinstance(value, (int, float)):
+            gauges.append((metric, value))
+    return gauges
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def collector(self, prefix, stats_fn):
+        """stats_fn()이 반환하는 dict의 숫자 값을 /metrics 출력 때마다 게이지로 내보냄"""
+        with self._lock:
+            self.collectors.append((prefix, stats_fn))
+
+    def render(self):
+        """Prometheus 텍스트 형식 (version 0.0.4)"""
+        with self._lock:
+            metrics, collectors = list(self.metrics.values()), list(self.collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for prefix, stats_fn in collectors:
+            try:
+                gauges = flatten_gauges(prefix, stats_fn())
+            except Exception as e:
+                print(f"Error collecting metrics for {prefix}: {e}")
+                continue
+            for name, value in gauges:
+                lines.extend([f"# TYPE {name} gauge", f"{name} {_format_value(value)}"])
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+STAGE_SECONDS = REGISTRY.histogram(
+    "chatbot_stage_seconds", "Time spent in each pipeline stage", ("stage",),
+)
+
+
+def record(stage, seconds):
+    """단계 시간을 히스토그램과 현재 요청의 단계별 시간에 기록"""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def span(stage):
+    """with span("faiss_search"): ... 블록의 실행 시간을 stage로 기록"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def start_timings():
+    """현재 컨텍스트(요청)의 단계별 시간 수집 시작. 수집용 dict 반환"""
+    timings = {}
+    _timings.set(timings)
+    return timings
+
+
+def timings_ms(timings):
+    return {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()}
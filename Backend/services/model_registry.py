@@ -0,0 +1,101 @@
+# app/services/model_registry.py
+"""
+프로세스 전체에서 임베딩 모델을 공유하는 레지스트리.
+모델 이름마다 하나의 SharedEmbeddings를 돌려주며, 실제 모델은 처음 임베딩할 때 한 번만 로드한다.
+검색(쿼리 임베딩)과 구축(문서 임베딩) 경로가 같은 모델을 쓰고, 추론은 잠금으로 직렬화한다
+(HuggingFace 토크나이저는 여러 스레드에서 동시에 호출하면 오류가 날 수 있음).
+"""
+import os
+import threading
+import time
+
+from langchain_core.embeddings import Embeddings
+from config import settings
+
+_models = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+def _load_model(model_name):
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+
+class SharedEmbeddings(Embeddings):
+    """LangChain Embeddings 인터페이스를 유지하면서 모델 로드를 미루고 추론을 잠금으로 보호"""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        # 호출하는 쪽에서 self._lock을 잡고 있음
+        if self._model is None:
+            start = time.perf_counter()
+            self._model = _load_model(self.model_name)
+            with _lock:
+                stats = _stats[self.model_name]
+                stats["loads"] += 1
+                stats["load_seconds"] = round(time.perf_counter() - start, 3)
+                loads = stats["loads"]
+            print(f"Loaded embedding model {self.model_name} in {stats['load_seconds']}s (pid {os.getpid()})")
+            if loads > 1:
+                print(f"Warning: embedding model {self.model_name} loaded {loads} times in pid {os.getpid()}")
+        return self._model
+
+    def _count(self, kind, n):
+        with _lock:
+            _stats[self.model_name][kind] += n
+
+    def embed_documents(self, texts):
+        with self._lock:
+            vectors = self._get_model().embed_documents(texts)
+        self._count("documents", len(texts))
+        return vectors
+
+    def embed_query(self, text):
+        with self._lock:
+            vector = self._get_model().embed_query(text)
+        self._count("queries", 1)
+        return vector
+
+    def embed_queries(self, texts):
+        """
+        여러 쿼리를 한 번의 모델 호출로 임베딩 (query_encoder의 배치용).
+        HuggingFaceEmbeddings는 쿼리/문서에 같은 인코딩 옵션을 쓰므로 embed_query와 결과가 같음
+        """
+        with self._lock:
+            vectors = self._get_model().embed_documents(texts)
+        self._count("queries", len(texts))
+        return vectors
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+
+def get_embeddings(model_name=None):
+    """model_name(기본 settings.MODEL_NAME)의 공유 임베딩 객체. 모델은 처음 사용할 때 로드"""
+    model_name = model_name or settings.MODEL_NAME
+    with _lock:
+        if model_name not in _models:
+            _models[model_name] = SharedEmbeddings(model_name)
+            _stats[model_name] = {"requests": 0, "loads": 0, "load_seconds": None, "documents": 0, "queries": 0}
+        _stats[model_name]["requests"] += 1
+        return _models[model_name]
+
+
+def model_stats():
+    """
+    모델별 로드 횟수와 사용량. loads가 1보다 크면 같은 프로세스에서 모델을 다시 로드한 것
+    """
+    with _lock:
+        return {
+            "pid": os.getpid(),
+            "models": {
+                name: {**stats, "loaded": _models[name].loaded, "duplicate_loads": max(0, stats["loads"] - 1)}
+                for name, stats in _stats.items()
+            },
+        }
@@ -1,24 +1,63 @@
 # app/services/openai_service.py
 import os
+import threading
 import openai
 from config import settings
 
+SYSTEM_PROMPT = "You are a helpful assistant. Provide answers based on given context."
+ERROR_MESSAGE = "죄송합니다. 응답 생성 중 오류가 발생했습니다."
+
+
+def build_messages(prompt: str):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
 class OpenAIService:
     def __init__(self):
         openai.api_key = settings.OPENAI_API_KEY
+        self._async_client = None
+        self._lock = threading.Lock()
+
+    @property
+    def async_client(self):
+        """
+        비동기 클라이언트 (요청을 기다리는 동안 이벤트 루프를 막지 않음).
+        처음 사용할 때 생성하므로 OPENAI_API_KEY가 없어도 앱은 시작되고 /chat 요청만 실패함
+        """
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    self._async_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        return self._async_client
 
     def query_openai(self, prompt: str, model_name: str = "gpt-4o-mini", temperature: float = 0.1, top_p: float = 1.0) -> str:
         try:
             response = openai.chat.completions.create(
                 model=model_name,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant. Provide answers based on given context."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=build_messages(prompt),
                 temperature=temperature,
                 top_p=top_p
             )
             return response.choices[0].message.content.strip()
         except Exception as e:
             print(f"Error querying OpenAI: {e}")
-            return "죄송합니다. 응답 생성 중 오류가 발생했습니다."
+            return ERROR_MESSAGE
+
+    async def stream_openai(self, prompt: str, model_name: str = "gpt-4o-mini", temperature: float = 0.1, top_p: float = 1.0):
+        """
+        생성되는 토큰(텍스트 조각)을 순서대로 반환하는 비동기 제너레이터.
+        오류는 호출하는 쪽에서 처리하도록 그대로 전달
+        """
+        stream = await self.async_client.chat.completions.create(
+            model=model_name,
+            messages=build_messages(prompt),
+            temperature=temperature,
+            top_p=top_p,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
@@ -0,0 +1,72 @@
+# app/services/page_spool.py
+import csv
+import json
+import os
+import shutil
+from pathlib import Path
+from services.metrics import span
+from services.project_store import write_rows
+
+
+class PageSpool:
+    """
+    API 페이지 단위로 받은 행을 조각 파일(.parts/<table>/000001.csv)에 바로 기록하여
+    메모리 사용량을 페이지 크기로 제한하고, 중단된 수집은 완료된 페이지부터 이어서 진행.
+    모든 페이지가 끝나면 페이지 순서대로 하나의 테이블 파일(Parquet/CSV)로 합침
+    """
+
+    def __init__(self, parts_dir, table, columns):
+        self.parts_dir = Path(parts_dir)
+        self.table = table
+        self.columns = columns
+        self.parts_dir.mkdir(parents=True, exist_ok=True)
+
+    def _part_path(self, page):
+        return self.parts_dir / f"{page:06d}.csv"
+
+    def _meta_path(self, page):
+        return self.parts_dir / f"{page:06d}.json"
+
+    def completed_pages(self):
+        """이전 실행에서 기록이 끝난 페이지 번호 (재개용)"""
+        return {int(p.stem) for p in self.parts_dir.glob("*.csv")}
+
+    def write_page(self, page, rows, meta=None):
+        """한 페이지를 임시 파일에 쓴 뒤 rename하여, 완료된 페이지만 조각 파일로 남도록 기록"""
+        with span("page_write"):
+            if meta is not None:
+                with open(self._meta_path(page), "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+            tmp_path = self.parts_dir / f"{page:06d}.tmp"
+            with open(tmp_path, "w", newline="", encoding="utf-8") as file:
+                csv.writer(file).writerows(rows)
+            os.replace(tmp_path, self._part_path(page))
+
+    def page_meta(self):
+        """완료된 페이지들의 메타데이터 목록"""
+        metas = []
+        for page in sorted(self.completed_pages()):
+            meta_path = self._meta_path(page)
+            if meta_path.exists():
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    metas.append(json.load(f))
+        return metas
+
+    def iter_rows(self):
+        """페이지 순서대로 행을 읽되, 페이지 사이에 밀려서 중복된 ID는 건너뛰기"""
+        seen_ids = set()
+        for page in sorted(self.completed_pages()):
+            with open(self._part_path(page), newline="", encoding="utf-8") as file:
+                for row in csv.reader(file):
+                    if row and row[0] not in seen_ids:
+                        seen_ids.add(row[0])
+                        yield row
+
+    def finalize(self, dest_path):
+        """조각 파일을 하나의 테이블 파일로 합쳐 원자적으로 교체하고 조각 디렉토리 삭제. 기록한 행 수 반환"""
+        count = write_rows(dest_path, self.table, self.columns, self.iter_rows())
+        self.discard()
+        return count
+
+    def discard(self):
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
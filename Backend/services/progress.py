@@ -0,0 +1,41 @@
+# app/services/progress.py
+"""
+다운로드/인덱스 구축 단계에서 발생하는 진행 이벤트.
+이벤트는 dict이며 stage(download, write, embed, index, complete)와 status 메시지,
+단계별 카운터(pages_done/pages_total, rows, batches_done/batches_total)를 담는다.
+"""
+import json
+
+# 단계별 전체 진행률(0~100) 구간
+STAGE_RANGES = {
+    "start": (0, 0),
+    "download": (0, 30),
+    "write": (30, 32),
+    "embed": (32, 95),
+    "index": (95, 99),
+    "complete": (100, 100),
+}
+
+
+def emit(progress, stage, status, **fields):
+    """progress 콜백이 있으면 이벤트 전달"""
+    if progress is not None:
+        progress({"stage": stage, "status": status, **fields})
+
+
+def to_percent(event):
+    """이벤트의 단계와 카운터로 전체 진행률 계산"""
+    low, high = STAGE_RANGES.get(event.get("stage"), (0, 0))
+    if event.get("stage") == "download":
+        done, total = event.get("pages_done", 0), event.get("pages_total", 0)
+    elif event.get("stage") == "embed":
+        done, total = event.get("batches_done", 0), event.get("batches_total", 0)
+    else:
+        done, total = 1, 1
+    fraction = min(done / total, 1.0) if total else 0.0
+    return int(low + (high - low) * fraction)
+
+
+def sse(event):
+    """이벤트를 Server-Sent Events 한 건으로 직렬화"""
+    return f"data: {json.dumps(event)}\n\n"
@@ -0,0 +1,210 @@
+# app/services/project_store.py
+"""
+프로젝트 데이터(info/commits/pull_requests/issues) 저장소.
+기본 형식은 타입이 지정된 컬럼(타임스탬프, 정수)과 zstd 압축을 쓰는 Parquet이며,
+필요한 컬럼만 읽을 수 있다. 기존 CSV 디렉토리도 그대로 읽을 수 있고 migrate로 변환 가능.
+
+레이아웃: storage/<repo>/parquet/<repo>_<table>.parquet (CSV는 storage/<repo>/csv/<repo>_<table>.csv)
+Github_dataset처럼 <dir>/<name>_<table>.csv 로 평면 저장된 경우도 지원.
+"""
+import csv
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from config import settings
+from services.metrics import span
+
+FORMATS = ("parquet", "csv")
+
+# 컬럼 이름 기준 타입 (그 외 컬럼은 문자열)
+TIMESTAMP_COLUMNS = {"Date", "Created At", "Merged At", "Closed At", "Last Updated"}
+INTEGER_COLUMNS = {"Project ID", "Stars", "Forks", "Commit Count"}
+# 커밋 ID는 SHA 문자열, 나머지 테이블의 ID는 정수
+STRING_ID_TABLES = {"commits"}
+
+WRITE_BATCH_ROWS = 50_000
+
+
+def column_type(table, column):
+    if column in TIMESTAMP_COLUMNS:
+        return pa.timestamp("us", tz="UTC")
+    if column in INTEGER_COLUMNS or (column == "ID" and table not in STRING_ID_TABLES):
+        return pa.int64()
+    return pa.string()
+
+
+def table_schema(table, columns):
+    return pa.schema([(column, column_type(table, column)) for column in columns])
+
+
+def to_typed_frame(df, table):
+    """문자열 위주의 DataFrame을 저장 스키마에 맞는 타입으로 변환"""
+    df = df.copy()
+    for column in df.columns:
+        kind = column_type(table, column)
+        # 빈 문자열은 coerce에 의해 NaT/NA가 됨
+        if pa.types.is_timestamp(kind):
+            df[column] = pd.to_datetime(df[column], utc=True, errors="coerce", format="ISO8601")
+        elif pa.types.is_integer(kind):
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("Int64")
+        else:
+            df[column] = df[column].map(lambda v: None if pd.isna(v) else str(v))
+    return df
+
+
+def table_path(project_dir, repo_name, table, fmt=None):
+    """백엔드 storage 레이아웃에서 새로 쓸 테이블 파일 경로"""
+    fmt = fmt or settings.STORAGE_FORMAT
+    return Path(project_dir) / fmt / f"{repo_name}_{table}.{fmt}"
+
+
+def locate_table(project_dir, repo_name, table):
+    """Parquet 우선, 없으면 CSV 경로 반환 (없으면 None)"""
+    project_dir = Path(project_dir)
+    for fmt in FORMATS:
+        for directory in (project_dir / fmt, project_dir):
+            path = directory / f"{repo_name}_{table}.{fmt}"
+            if path.exists():
+                return path
+    return None
+
+
+def read_table(project_dir, repo_name, table, columns=None):
+    """테이블을 DataFrame으로 읽기. columns를 주면 해당 컬럼만 읽음"""
+    path = locate_table(project_dir, repo_name, table)
+    if path is None:
+        raise FileNotFoundError(f"{table} data not found for {repo_name} in {project_dir}")
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def _write_csv(tmp_path, columns, rows):
+    count = 0
+    with open(tmp_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _write_parquet(tmp_path, table, columns, rows):
+    schema = table_schema(table, columns)
+    count = 0
+    with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+        for batch in _batches(rows, WRITE_BATCH_ROWS):
+            df = to_typed_frame(pd.DataFrame(batch, columns=columns), table)
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+            count += len(batch)
+        if count == 0:
+            writer.write_table(schema.empty_table())
+    return count
+
+
+def write_rows(path, table, columns, rows):
+    """
+    행(컬럼 순서의 리스트) 이터러블을 배치 단위로 기록. 형식은 확장자로 결정하며,
+    임시 파일에 쓴 뒤 교체하므로 실패해도 기존 파일은 유지. 기록한 행 수 반환
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with span("table_write"):
+        if path.suffix == ".parquet":
+            count = _write_parquet(tmp_path, table, columns, rows)
+        else:
+            count = _write_csv(tmp_path, columns, rows)
+        os.replace(tmp_path, path)
+    return count
+
+
+def _format_value(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return value
+
+
+def iter_rows(path):
+    """저장된 테이블을 CSV와 같은 형태(ISO 8601 문자열 날짜)의 행으로 배치 단위 순회"""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=WRITE_BATCH_ROWS):
+            df = batch.to_pandas()
+            for row in df.itertuples(index=False, name=None):
+                yield [_format_value(value) for value in row]
+    else:
+        with open(path, newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            yield from (row for row in reader if row)
+
+
+def merge_rows(path, table, columns, new_rows, source_path=None):
+    """
+    새 행을 ID 기준으로 기존 테이블(source_path, 기본은 path)에 병합하여 path에 기록
+    (같은 ID는 새 행으로 교체, 새 행이 앞쪽)
+    """
+    path = Path(path)
+    source_path = Path(source_path) if source_path else path
+    new_rows = list(new_rows)
+    new_ids = {str(row[0]) for row in new_rows}
+
+    def merged_rows():
+        yield from new_rows
+        if source_path.exists():
+            yield from (row for row in iter_rows(source_path) if str(row[0]) not in new_ids)
+
+    return write_rows(path, table, columns, merged_rows())
+
+
+def migrate_csv_dir(project_dir, repo_name, remove_csv=False):
+    """프로젝트의 CSV 테이블을 Parquet으로 변환 (이미 Parquet이 있으면 건너뜀)"""
+    project_dir = Path(project_dir)
+    migrated = []
+    for csv_path in sorted(project_dir.glob(f"csv/{repo_name}_*.csv")) + sorted(project_dir.glob(f"{repo_name}_*.csv")):
+        table = csv_path.stem[len(repo_name) + 1:]
+        parquet_path = csv_path.parent / f"{csv_path.stem}.parquet"
+        if csv_path.parent.name == "csv":
+            parquet_path = table_path(project_dir, repo_name, table, "parquet")
+        if parquet_path.exists():
+            continue
+        columns = list(pd.read_csv(csv_path, nrows=0).columns)
+        write_rows(parquet_path, table, columns, iter_rows(csv_path))
+        migrated.append(parquet_path)
+        if remove_csv:
+            csv_path.unlink()
+    return migrated
+
+
+def migrate_storage(base_dir, remove_csv=False):
+    """base_dir 아래 모든 프로젝트 디렉토리의 CSV를 Parquet으로 변환"""
+    for project_dir in sorted(Path(base_dir).iterdir()):
+        if project_dir.is_dir():
+            for path in migrate_csv_dir(project_dir, project_dir.name, remove_csv=remove_csv):
+                print(f"Migrated {path}")
+
+
+if __name__ == "__main__":
+    # 사용법: Backend 디렉토리에서 python -m services.project_store <storage 디렉토리> [--remove-csv]
+    base = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "../storage")
+    migrate_storage(base, remove_csv="--remove-csv" in sys.argv)
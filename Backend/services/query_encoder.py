@@ -0,0 +1,150 @@
+# app/services/query_encoder.py
+"""
+검색 쿼리 임베딩 서비스.
+정규화한 쿼리 텍스트를 키로 하는 메모리 LRU 캐시를 두고, 캐시에 없는 쿼리는
+짧은 시간(QUERY_BATCH_WAIT_MS) 동안 함께 들어온 쿼리와 묶어 한 번의 모델 호출로 임베딩한다.
+같은 쿼리가 임베딩 중이면 새로 요청하지 않고 그 결과를 기다린다.
+"""
+import queue
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+from config import settings
+from services.model_registry import get_embeddings
+
+
+def normalize_query(text):
+    """유니코드 정규화(NFKC) 후 앞뒤 공백 제거, 연속 공백을 하나로"""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class QueryEncoder:
+    def __init__(self, embeddings, cache_size=None, max_batch=None, max_wait_ms=None):
+        self.embeddings = embeddings
+        self.cache_size = settings.QUERY_CACHE_SIZE if cache_size is None else cache_size
+        self.max_batch = max(1, max_batch or settings.QUERY_BATCH_MAX)
+        self.max_wait = (settings.QUERY_BATCH_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000
+        self.cache = OrderedDict()
+        self.pending = {}  # 임베딩 중인 쿼리 → Future
+        self.stats = {
+            "requests": 0, "cache_hits": 0, "coalesced": 0, "batches": 0, "batched_queries": 0,
+            "max_batch_size": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0, "errors": 0,
+        }
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def encode(self, text):
+        """쿼리 벡터 (d,) float32 반환. 반환된 배열은 캐시와 공유되므로 읽기 전용"""
+        return self.encode_async(text).result()
+
+    def encode_async(self, text):
+        """쿼리 벡터를 결과로 갖는 concurrent.futures.Future 반환 (asyncio에서는 asyncio.wrap_future로 대기)"""
+        key = normalize_query(text)
+        with self._lock:
+            self.stats["requests"] += 1
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                future = Future()
+                future.set_result(self.cache[key])
+                return future
+            if key in self.pending:
+                self.stats["coalesced"] += 1
+                return self.pending[key]
+            future = Future()
+            self.pending[key] = future
+            self._ensure_worker()
+        self._queue.put((key, future, time.perf_counter()))
+        return future
+
+    def _ensure_worker(self):
+        # self._lock 안에서 호출
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="query-encoder", daemon=True)
+            self._worker.start()
+
+    def _collect(self):
+        """첫 쿼리가 들어온 뒤 max_wait 동안 또는 max_batch개가 찰 때까지 모음"""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                # 이전 배치를 임베딩하는 동안 쌓인 쿼리는 기다리지 않고 바로 가져옴
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            waits = [started - enqueued for _, _, enqueued in batch]
+            try:
+                vectors = np.asarray(self.embeddings.embed_queries([key for key, _, _ in batch]), dtype=np.float32)
+                vectors.setflags(write=False)
+                error = None
+            except Exception as e:
+                vectors, error = None, e
+
+            with self._lock:
+                self.stats["batches"] += 1
+                self.stats["batched_queries"] += len(batch)
+                self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(batch))
+                self.stats["wait_seconds"] += sum(waits)
+                self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], max(waits))
+                for i, (key, _, _) in enumerate(batch):
+                    self.pending.pop(key, None)
+                    if error is None and self.cache_size > 0:
+                        self.cache[key] = vectors[i]
+                        self.cache.move_to_end(key)
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+                if error is not None:
+                    self.stats["errors"] += 1
+
+            for i, (_, future, _) in enumerate(batch):
+                if error is None:
+                    future.set_result(vectors[i])
+                else:
+                    future.set_exception(error)
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self.stats)
+            cache_size = len(self.cache)
+        requests, batches = stats["requests"], stats["batches"]
+        return {
+            **{k: v for k, v in stats.items() if k not in ("wait_seconds", "max_wait_seconds")},
+            "cache_entries": cache_size,
+            "cache_hit_rate": round(stats["cache_hits"] / requests, 4) if requests else 0.0,
+            "avg_batch_size": round(stats["batched_queries"] / batches, 2) if batches else 0.0,
+            "avg_wait_ms": round(stats["wait_seconds"] * 1000 / stats["batched_queries"], 3) if batches else 0.0,
+            "max_wait_ms": round(stats["max_wait_seconds"] * 1000, 3),
+        }
+
+
+_encoders = {}
+_encoders_lock = threading.Lock()
+
+
+def get_query_encoder(model_name=None):
+    """모델별로 프로세스 안에서 하나의 쿼리 인코더를 공유 (모든 프로젝트가 캐시와 배치를 함께 사용)"""
+    model_name = model_name or settings.MODEL_NAME
+    with _encoders_lock:
+        if model_name not in _encoders:
+            _encoders[model_name] = QueryEncoder(get_embeddings(model_name))
+        return _encoders[model_name]
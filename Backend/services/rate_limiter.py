@@ -0,0 +1,141 @@
+# app/services/rate_limiter.py
+import random
+import threading
+import time
+
+
+class GitHubAPIError(Exception):
+    """재시도 후에도 성공하지 못한 GitHub API 요청"""
+
+    def __init__(self, status_code, url, message=""):
+        super().__init__(f"GitHub API error {status_code} for {url} {message}".strip())
+        self.status_code = status_code
+        self.url = url
+
+
+class TokenBudget:
+    """토큰 하나의 리소스(core/search 등)별 남은 요청 수와 리셋 시각"""
+
+    def __init__(self, token):
+        self.token = token
+        self.limit = {}
+        self.remaining = {}
+        self.reset_at = {}
+        self.requests = 0
+
+    def available(self, resource, now):
+        reset_at = self.reset_at.get(resource, 0)
+        if now >= reset_at:
+            # 리셋 시각이 지났거나 아직 응답을 받은 적이 없음
+            return self.limit.get(resource, 1) if reset_at else 1
+        return self.remaining.get(resource, 1)
+
+
+class RateLimitScheduler:
+    """
+    여러 GitHub 토큰의 남은 한도(X-RateLimit-*)를 추적하여 가장 여유 있는 토큰을 선택하고,
+    모두 소진되면 리셋 시각까지 대기, 2차 제한(Retry-After)은 백오프로 재시도
+    """
+
+    def __init__(self, tokens=None, max_retries=6, base_backoff=1.0, max_backoff=120.0):
+        tokens = [t for t in (tokens or []) if t] or [None]
+        self.budgets = [TokenBudget(token) for token in tokens]
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        self._stats = {"requests": 0, "retries": 0, "throttled": 0, "wait_seconds": 0.0, "errors": 0}
+
+    def acquire(self, resource="core"):
+        """사용할 토큰 예산과 요청 전 대기 시간(초) 반환. 남은 한도는 미리 1 차감"""
+        with self._lock:
+            now = time.time()
+            budget = max(self.budgets, key=lambda b: b.available(resource, now))
+            if budget.available(resource, now) > 0:
+                if budget.reset_at.get(resource, 0) > now:
+                    budget.remaining[resource] -= 1
+                else:
+                    budget.reset_at.pop(resource, None)
+                return budget, 0.0
+
+            # 모든 토큰이 소진됨 → 가장 빠른 리셋 시각까지 대기
+            budget = min(self.budgets, key=lambda b: b.reset_at.get(resource, now))
+            wait = max(0.0, budget.reset_at.get(resource, now) - now) + 1.0
+            self._stats["throttled"] += 1
+            return budget, wait
+
+    def headers_for(self, budget):
+        return {"Authorization": f"token {budget.token}"} if budget.token else {}
+
+    def record(self, budget, status_code, headers, attempt, body=""):
+        """
+        응답 헤더로 예산 갱신. 재시도가 필요하면 대기 시간(초)을, 아니면 None 반환
+        """
+        resource = headers.get("X-RateLimit-Resource", "core")
+        with self._lock:
+            self._stats["requests"] += 1
+            budget.requests += 1
+            if "X-RateLimit-Remaining" in headers:
+                budget.remaining[resource] = int(headers["X-RateLimit-Remaining"])
+                budget.limit[resource] = int(headers.get("X-RateLimit-Limit", budget.remaining[resource]))
+                budget.reset_at[resource] = float(headers.get("X-RateLimit-Reset", time.time() + 60))
+
+            if status_code not in (403, 429) and status_code < 500:
+                return None
+
+            self._stats["retries"] += 1
+            if attempt >= self.max_retries:
+                self._stats["errors"] += 1
+                return None
+
+            if "Retry-After" in headers:
+                # 2차 제한: 서버가 지정한 시간만큼 대기
+                delay = float(headers["Retry-After"])
+            elif status_code in (403, 429) and headers.get("X-RateLimit-Remaining") == "0":
+                # 1차 제한 소진: 다른 토큰이 있으면 즉시, 없으면 acquire()에서 리셋까지 대기
+                delay = 0.0
+            elif status_code in (403, 429) and "rate limit" not in body.lower():
+                # 권한 문제 등 재시도해도 소용없는 403
+                return None
+            else:
+                delay = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+                delay += random.uniform(0, delay / 2)
+            return delay
+
+    def add_wait(self, seconds):
+        with self._lock:
+            self._stats["wait_seconds"] += seconds
+
+    def request(self, session, url, params=None, resource="core", **kwargs):
+        """requests.Session 기반 동기 요청 (Github_dataset 스크립트용)"""
+        for attempt in range(self.max_retries + 1):
+            budget, wait = self.acquire(resource)
+            if wait:
+                self.add_wait(wait)
+                time.sleep(wait)
+            response = session.get(url, params=params, headers=self.headers_for(budget), **kwargs)
+            delay = self.record(budget, response.status_code, response.headers, attempt, response.text)
+            if delay is None:
+                return response
+            self.add_wait(delay)
+            time.sleep(delay)
+        return response
+
+    def metrics(self):
+        """처리량과 토큰별 예산 현황"""
+        with self._lock:
+            elapsed = max(time.time() - self._started_at, 1e-9)
+            stats = dict(self._stats)
+            stats["requests_per_second"] = stats["requests"] / elapsed
+            stats["tokens"] = [
+                {
+                    "token": f"...{b.token[-4:]}" if b.token else None,
+                    "requests": b.requests,
+                    "remaining": dict(b.remaining),
+                    "limit": dict(b.limit),
+                    "reset_at": dict(b.reset_at),
+                }
+                for b in self.budgets
+            ]
+            return stats
@@ -0,0 +1,135 @@
+# app/services/search_filters.py
+"""
+타입/상태/작성자/날짜 조건으로 FAISS 검색 대상을 제한하는 모듈.
+로드 시 메타데이터 저장소에서 속성 값별 FAISS ID 목록과 날짜순 ID 배열을 미리 만들어 두고,
+검색마다 조건에 맞는 ID 집합을 교집합으로 구해 IDSelector로 FAISS 검색 안에서 적용한다.
+(상위 결과를 많이 가져온 뒤 거르는 방식이 아니므로 필터가 좁아도 k개를 채움)
+"""
+import math
+import re
+
+import faiss
+import numpy as np
+
+# ID 수가 이보다 많으면 비트맵, 적으면 ID 목록(해시 집합) 선택자 사용
+BITMAP_MIN_IDS = 4096
+# 필터가 좁을 때 늘릴 수 있는 HNSW efSearch 상한
+MAX_EF_SEARCH = 1024
+_DATE_ONLY = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def normalize_filters(types=None, states=None, authors=None, date_from=None, date_to=None):
+    """
+    API 파라미터를 필터 dict로 정리. 조건이 없으면 None.
+    date_from은 포함, date_to는 제외. 단 날짜만 준 date_to(2024-01-31)는 그날 전체를 포함
+    """
+    filters = {
+        "type": [t.lower() for t in types or [] if t],
+        "state": [s.lower() for s in states or [] if s],
+        "author": [a.lower() for a in authors or [] if a],
+        "date_from": date_from or None,
+        "date_to": date_to or None,
+    }
+    return filters if any(filters.values()) else None
+
+
+def date_upper_bound(date_to):
+    """
+    date_to의 검색 상한 (이 값보다 작은 날짜만 포함). 날짜만 주면 그날의 모든 시각
+    (2024-01-31T23:59:59Z 등)이 포함되도록 그 날짜로 시작하는 모든 문자열보다 큰 값 사용
+    """
+    return date_to + "\uffff" if _DATE_ONLY.fullmatch(date_to) else date_to
+
+
+class FilterIndex:
+    """속성 값 → 정렬된 FAISS ID 배열, 날짜순 (날짜, ID) 배열을 미리 계산해 둔 필터 인덱스"""
+
+    def __init__(self, metadata_store):
+        labels, columns = metadata_store.filter_columns()
+        self.total = len(labels)
+        self.max_label = int(labels.max()) if len(labels) else -1
+        self.postings = {}
+        for field in ("type", "state", "author"):
+            values = np.array([(v or "").lower() for v in columns[field]], dtype=object)
+            self.postings[field] = {
+                value: np.sort(labels[values == value]) for value in set(values.tolist()) if value
+            }
+        dates = np.array(columns["date"], dtype=object)
+        has_date = np.array([d is not None for d in columns["date"]], dtype=bool)
+        order = np.argsort(dates[has_date].astype(str), kind="stable")
+        self.date_values = dates[has_date].astype(str)[order]
+        self.date_labels = labels[has_date][order]
+
+    def nbytes(self):
+        postings = sum(ids.nbytes for values in self.postings.values() for ids in values.values())
+        return postings + self.date_labels.nbytes + self.date_values.nbytes
+
+    def values(self, field):
+        """필드(type/state/author)에 있는 값 목록 (소문자, 정렬). 필터 값 검증에 사용"""
+        return sorted(self.postings.get(field, {}))
+
+    def labels_for(self, filters):
+        """조건을 모두 만족하는 FAISS ID 배열 (오름차순). 조건이 없으면 None"""
+        if not filters:
+            return None
+        result = None
+        for field in ("type", "state", "author"):
+            if filters.get(field):
+                postings = self.postings[field]
+                ids = np.unique(np.concatenate(
+                    [postings.get(value, np.empty(0, np.int64)) for value in filters[field]]
+                ))
+                result = ids if result is None else np.intersect1d(result, ids, assume_unique=True)
+        if filters.get("date_from") or filters.get("date_to"):
+            # 날짜순 배열에서 구간만 잘라냄 (ISO 8601 문자열은 사전순 = 시간순)
+            start = np.searchsorted(self.date_values, filters["date_from"]) if filters.get("date_from") else 0
+            end = len(self.date_values)
+            if filters.get("date_to"):
+                end = np.searchsorted(self.date_values, date_upper_bound(filters["date_to"]))
+            ids = np.sort(self.date_labels[start:end])
+            result = ids if result is None else np.intersect1d(result, ids, assume_unique=True)
+        return result
+
+    def selector(self, labels):
+        """
+        ID 배열로 FAISS IDSelector 생성. (선택자, 선택자가 참조하는 배열) 반환 —
+        검색이 끝날 때까지 두 번째 값을 유지해야 함
+        """
+        labels = np.ascontiguousarray(labels, dtype=np.int64)
+        if len(labels) >= BITMAP_MIN_IDS and self.max_label >= 0:
+            mask = np.zeros(self.max_label + 1, dtype=bool)
+            mask[labels] = True
+            bitmap = np.packbits(mask, bitorder="little")
+            return faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bitmap)), bitmap
+        return faiss.IDSelectorBatch(len(labels), faiss.swig_ptr(labels)), labels
+
+
+def search_parameters(index, selector, selectivity=1.0):
+    """
+    선택자를 담은 검색 파라미터. 필터가 좁을수록(selectivity가 작을수록)
+    IVF는 nprobe, HNSW는 efSearch를 늘려 k개를 채울 수 있도록 함
+    """
+    base = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    boost = 1 / max(selectivity, 1e-6)
+    ivf = faiss.try_extract_index_ivf(base)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=int(min(ivf.nlist, math.ceil(ivf.nprobe * boost))))
+    if hasattr(base, "hnsw"):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=int(min(MAX_EF_SEARCH, base.hnsw.efSearch * boost)))
+    return faiss.SearchParameters(sel=selector)
+
+
+def filtered_search(index, filter_index, query_vectors, k, filters):
+    """
+    필터를 적용한 FAISS 검색. (거리, ID) 반환.
+    필터에 맞는 문서가 없으면 빈 결과, 필터가 없으면 일반 검색
+    """
+    labels = filter_index.labels_for(filters) if filter_index is not None else None
+    if labels is None:
+        return index.search(query_vectors, k)
+    if len(labels) == 0:
+        empty = np.empty((len(query_vectors), 0))
+        return empty.astype(np.float32), empty.astype(np.int64)
+    selector, _keepalive = filter_index.selector(labels)
+    params = search_parameters(index, selector, len(labels) / max(filter_index.total, 1))
+    return index.search(query_vectors, min(k, len(labels)), params=params)
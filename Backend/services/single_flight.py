@@ -0,0 +1,87 @@
+# app/services/single_flight.py
+"""
+같은 키의 요청이 동시에 들어오면 작업을 한 번만 실행하고 결과 이벤트를 모든 요청에 나눠 주는 모듈.
+작업은 이벤트(dict)를 내보내는 비동기 제너레이터이며, 나중에 합류한 요청도 이미 나온 이벤트부터
+순서대로 받는다. 작업은 요청과 별도의 태스크에서 실행되므로 한 클라이언트가 연결을 끊어도
+다른 구독자의 스트림은 계속된다. 작업이 끝나면 키가 비워져 다음 요청은 새로 실행한다.
+"""
+import asyncio
+
+
+class Flight:
+    def __init__(self):
+        self.events = []
+        self.subscribers = []
+        self.done = False
+        self.task = None
+
+    def publish(self, event):
+        self.events.append(event)
+        for subscriber in self.subscribers:
+            subscriber.put_nowait(event)
+
+    def finish(self):
+        self.done = True
+        for subscriber in self.subscribers:
+            subscriber.put_nowait(None)
+        self.subscribers.clear()
+
+    async def subscribe(self):
+        """지금까지의 이벤트부터 작업이 끝날 때까지의 이벤트를 순서대로 반환"""
+        queue = asyncio.Queue()
+        for event in self.events:
+            queue.put_nowait(event)
+        if self.done:
+            queue.put_nowait(None)
+        else:
+            self.subscribers.append(queue)
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+        finally:
+            if queue in self.subscribers:
+                self.subscribers.remove(queue)
+
+
+class SingleFlight:
+    def __init__(self, error_event=None):
+        # 작업에서 처리하지 못한 예외를 구독자에게 알릴 이벤트
+        self.error_event = error_event or {"type": "error", "error": "internal error"}
+        self.flights = {}
+        self.stats = {"started": 0, "coalesced": 0}
+
+    def join(self, key, make_events):
+        """
+        key의 작업에 합류. 진행 중인 작업이 없으면 make_events()로 새 작업 시작.
+        (Flight, 새로 시작했는지) 반환. 이벤트 루프 스레드에서만 호출
+        """
+        flight = self.flights.get(key)
+        if flight is not None:
+            self.stats["coalesced"] += 1
+            return flight, False
+        flight = Flight()
+        self.flights[key] = flight
+        self.stats["started"] += 1
+        # 태스크 참조를 유지해야 실행 중에 정리되지 않음
+        flight.task = asyncio.get_running_loop().create_task(self._run(key, flight, make_events()))
+        return flight, True
+
+    async def _run(self, key, flight, events):
+        try:
+            async for event in events:
+                flight.publish(event)
+        except Exception as e:
+            print(f"Error in coalesced request: {e}")
+            flight.publish(self.error_event)
+        finally:
+            if self.flights.get(key) is flight:
+                del self.flights[key]
+            flight.finish()
+
+    def metrics(self):
+        requests = self.stats["started"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "in_flight": len(self.flights),
+            "coalesced_rate": round(self.stats["coalesced"] / requests, 4) if requests else 0.0,
+        }
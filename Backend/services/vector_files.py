@@ -0,0 +1,125 @@
+# app/services/vector_files.py
+"""
+인덱스/임베딩 파일의 디스크 형식과 로더.
+- FAISS 인덱스는 가능하면 메모리 매핑으로 읽어 시작 시간을 줄이고, 같은 호스트의 여러 프로세스가
+  페이지 캐시를 공유하도록 함
+- 임베딩 배열(embeddings.npy)은 float32/float16/int8(차원별 스칼라 양자화)로 저장하고
+  np.load(mmap_mode="r")로 필요한 행만 읽음. int8은 <이름>.quant.npy에 (offset, scale) 저장
+"""
+import os
+import time
+
+import faiss
+import numpy as np
+from config import settings
+
+PRECISIONS = ("float32", "float16", "int8")
+
+
+def quant_path(path):
+    root, _ = os.path.splitext(path)
+    return f"{root}.quant.npy"
+
+
+def save_vectors(path, vectors, precision=None):
+    """벡터 배열을 지정한 정밀도로 저장 (임시 파일에 쓴 뒤 교체)"""
+    precision = precision or settings.VECTOR_PRECISION
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown vector precision: {precision}")
+    vectors = np.asarray(vectors, dtype=np.float32)
+
+    if precision == "int8":
+        # 차원별 최소/최대를 -128~127 구간에 대응
+        offset = vectors.min(axis=0) if len(vectors) else np.zeros(vectors.shape[1], dtype=np.float32)
+        span = (vectors.max(axis=0) - offset) if len(vectors) else np.ones(vectors.shape[1], dtype=np.float32)
+        scale = np.where(span > 0, span / 255.0, 1.0).astype(np.float32)
+        codes = np.clip(np.rint((vectors - offset) / scale) - 128, -128, 127).astype(np.int8)
+        _atomic_save(quant_path(path), np.stack([offset, scale]))
+        _atomic_save(path, codes)
+    else:
+        _atomic_save(path, vectors.astype(precision))
+
+
+def _atomic_save(path, array):
+    tmp_path = f"{path}.tmp.npy"
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+
+class VectorFile:
+    """저장된 벡터 배열. mmap이면 파일을 매핑만 하고 get()으로 읽는 행만 float32로 복원"""
+
+    def __init__(self, path, mmap=True):
+        self.path = path
+        self.array = np.load(path, mmap_mode="r" if mmap else None)
+        self.quant = np.load(quant_path(path)) if self.array.dtype == np.int8 else None
+
+    @property
+    def precision(self):
+        return str(self.array.dtype)
+
+    @property
+    def shape(self):
+        return self.array.shape
+
+    def __len__(self):
+        return len(self.array)
+
+    def get(self, rows=None):
+        """rows(인덱스 배열/슬라이스, 기본은 전체)의 벡터를 float32로 반환"""
+        codes = self.array if rows is None else self.array[rows]
+        if self.quant is None:
+            return np.asarray(codes, dtype=np.float32)
+        offset, scale = self.quant
+        return (codes.astype(np.float32) + 128) * scale + offset
+
+
+def load_vectors(path, mmap=True):
+    return VectorFile(path, mmap=mmap)
+
+
+def read_index(path, mmap=None):
+    """
+    FAISS 인덱스 읽기. mmap이면 IVF 역색인(및 지원하는 FAISS 버전에서는 Flat 코드)을
+    메모리 매핑하고, 지원하지 않는 인덱스는 일반 읽기로 대체
+    """
+    mmap = settings.INDEX_MMAP if mmap is None else mmap
+    if mmap:
+        io_flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        io_flags |= getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+        try:
+            return faiss.read_index(path, io_flags)
+        except RuntimeError as e:
+            print(f"Memory-mapped read not supported for {path}, reading into memory: {e}")
+    return faiss.read_index(path)
+
+
+def process_rss_mb():
+    """현재 프로세스의 상주 메모리(MB). 측정할 수 없으면 None"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class LoadTimer:
+    """생성 시점부터 stop()까지 걸린 시간과 RSS 증가량 측정"""
+
+    def __init__(self):
+        self.rss_before = process_rss_mb()
+        self.start = time.perf_counter()
+
+    def stop(self):
+        seconds = time.perf_counter() - self.start
+        rss_after = process_rss_mb()
+        return {
+            "seconds": round(seconds, 3),
+            "rss_mb": round(rss_after, 1) if rss_after is not None else None,
+            "rss_delta_mb": round(rss_after - self.rss_before, 1) if None not in (rss_after, self.rss_before) else None,
+        }
@@ -1,87 +1,242 @@
 import os
-import json
-import numpy as np
-import pandas as pd
+import shutil
 import faiss
+import numpy as np
 from pathlib import Path
-from langchain.schema import Document
-from langchain_community.docstore.in_memory import InMemoryDocstore
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+from config import settings
+from services.progress import emit
+from services.document_builder import BACKEND_TEMPLATES, build_documents, combine
+from services.embedding_cache import get_embedding_cache
+from services.embedding_executor import EmbeddingExecutor
+from services.model_registry import get_embeddings
+from services.compact_docstore import (
+    CompactDocstore, has_compact_docstore, patch_compact_docstore, write_compact_docstore,
+)
+from services.index_changes import claim_changes, finish_changes
+from services.index_versions import current_version_dir, new_version_dir, publish_version
+from services.metrics import span
+from services.metadata_store import METADATA_FILE, MetadataStore
+from services.index_factory import build_index, load_index_config, save_index_config, should_rebuild, supports_removal
+from services.project_store import locate_table, read_table
+from services.vector_files import read_index
 
 BASE_DIRECTORY = Path(os.path.abspath(os.path.join(os.path.dirname(__file__), "../storage")))
-MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+MODEL_NAME = settings.MODEL_NAME
+
+# 검색 API(VectorStoreService)와 같은 공유 모델 (처음 임베딩할 때 로드)
+embeddings = get_embeddings(MODEL_NAME)
+# 워커가 1개이면 위 모델을 그대로 사용
+executor = EmbeddingExecutor(MODEL_NAME, local_embeddings=embeddings)
+
+
+def document_frames(project_path, repo_name, ids_by_table=None):
+    """
+    테이블별 문서 DataFrame 목록. ids_by_table({table: [ID]})를 주면 해당 행만 포함.
+    각 문서에는 고정 키(key) 컬럼이 추가됨
+    """
+    frames = []
+    for table, (doc_type, template) in BACKEND_TEMPLATES.items():
+        df = read_table(project_path, repo_name, table)
+        if ids_by_table is not None:
+            ids = set(ids_by_table.get(table, []))
+            if not ids:
+                continue
+            df = df[df["ID"].astype(str).isin(ids)]
+        frame = build_documents(df, doc_type, template).drop_duplicates("doc_id").reset_index(drop=True)
+        frame.insert(0, "key", frame["type"] + ":" + frame["doc_id"])
+        frames.append(frame)
+    return frames
+
+
+def embed_texts(texts, progress=None):
+    """캐시에 없는 텍스트만 임베딩. (벡터, 캐시 통계) 반환"""
+    cache = get_embedding_cache(MODEL_NAME)
+    vectors = cache.embed(texts, lambda missing: executor.embed(missing, progress))
+    cache.save()
+    cache_summary = cache.summary()
+    print(f"Embedding cache: {cache_summary}")
+    return vectors, cache_summary
+
+
+def load_index(source_dir):
+    """
+    버전 디렉토리의 고정 ID 인덱스와 구성을 수정할 수 있도록 메모리로 읽기.
+    docstore와 메타데이터는 읽지 않음 (변경분만 새 버전에 반영). 없거나 이전 형식이면 (None, None)
+    """
+    index_config = load_index_config(source_dir)
+    if (
+        index_config is None or not index_config.get("id_mapped")
+        or not (source_dir / METADATA_FILE).exists() or not has_compact_docstore(source_dir)
+    ):
+        return None, None
+    with span("index_load"):
+        index = read_index(str(source_dir / "index.faiss"), mmap=False)
+    return index, index_config
+
+
+def version_update(reset=False):
+    """
+    새 버전에 기록할 변경분: docstore에 넣을 문서(키, 텍스트, FAISS ID)와
+    메타데이터 저장소에 넣을 (문서 DataFrame, FAISS ID). reset이면 이전 버전 없이 새로 기록
+    """
+    return {"reset": reset, "keys": [], "texts": [], "labels": [], "frames": []}
+
+
+def add_documents(update, frames, texts, labels):
+    update["keys"].extend(key for frame in frames for key in frame["key"].tolist())
+    update["texts"].extend(texts)
+    update["labels"].extend(np.asarray(labels, dtype=np.int64).tolist())
+    start = 0
+    for frame in frames:
+        update["frames"].append((frame, labels[start:start + len(frame)]))
+        start += len(frame)
+
+
+def write_metadata(source_dir, target_dir, update):
+    """
+    현재 버전의 metadata.sqlite를 새 버전 디렉토리로 복사한 뒤 변경분만 반영 (reset이면 새로 생성).
+    현재 버전의 파일은 그대로 유지됨
+    """
+    if not update["reset"] and (source_dir / METADATA_FILE).exists():
+        shutil.copy2(source_dir / METADATA_FILE, target_dir / METADATA_FILE)
+    store = MetadataStore(target_dir / METADATA_FILE)
+    try:
+        for frame, labels in update["frames"]:
+            store.add_frame(frame, labels)
+    finally:
+        store.close()
+
+
+def save_vectorstore(index, index_config, update, vectorstore_dir, source_dir):
+    """
+    새 버전 디렉토리에 인덱스를 기록하고 docstore/메타데이터는 source_dir 버전에 변경분만 반영한 뒤
+    CURRENT를 교체하여 공개. 실행 중인 API는 이전 버전으로 검색을 계속하다가
+    새 버전을 로드한 뒤 교체함 (index_registry)
+    """
+    target_dir = new_version_dir(vectorstore_dir)
+    try:
+        # FAISS 인덱스는 하나의 파일로만 직렬화되므로 전체를 기록
+        faiss.write_index(index, str(target_dir / "index.faiss"))
+        save_index_config(target_dir, index_config)
+        if update["reset"]:
+            write_compact_docstore(str(target_dir), update["keys"], update["texts"], labels=update["labels"])
+        else:
+            patch_compact_docstore(str(source_dir), str(target_dir), update["keys"], update["texts"], update["labels"])
+        write_metadata(source_dir, target_dir, update)
+    except Exception:
+        shutil.rmtree(target_dir, ignore_errors=True)
+        raise
+    publish_version(vectorstore_dir, target_dir)
+    return target_dir.name
+
+
+def rebuild_vectorstore(project_path, repo_name, progress=None):
+    """
+    모든 문서를 임베딩해 인덱스를 새로 구축 (종류는 index_factory가 벡터 수로 선택).
+    (인덱스, 인덱스 구성, 새 버전 변경분, 통계) 반환
+    """
+    frames = document_frames(project_path, repo_name)
+    all_texts, _, _ = combine(frames)
+
+    embedding_vectors, cache_summary = embed_texts(all_texts, progress)
+
+    emit(progress, "index", "Building FAISS index")
+    labels = np.arange(len(all_texts), dtype=np.int64)
+    index, index_config = build_index(embedding_vectors, ids=labels, updatable=True)
+
+    update = version_update(reset=True)
+    add_documents(update, frames, all_texts, labels)
+    stats = {"mode": "rebuild", "documents": len(all_texts), "index": index_config, "embedding_cache": cache_summary}
+    return index, index_config, update, stats
+
+
+def apply_changes(index, index_config, source_dir, project_path, repo_name, changes, progress=None):
+    """
+    기록된 변경분만 기존 인덱스에 반영: 수정된 문서의 벡터를 제거하고
+    추가/수정된 문서는 같은 FAISS ID(새 문서는 새 ID)로 다시 추가.
+    기존 문서의 FAISS ID는 source_dir의 압축 docstore에서 바뀐 키만 찾음.
+    삭제된 문서는 기록되지 않으므로 다시 구축할 때까지 인덱스에 남음 (index_changes).
+    (통계, 새 버전 변경분) 반환. 인덱스가 삭제를 지원하지 않거나
+    벡터 수에 맞는 인덱스 종류가 달라지면 (None, None) (다시 구축)
+    """
+    frames = document_frames(project_path, repo_name, ids_by_table=changes["upserted"])
+    texts, _, _ = combine(frames)
+    upserted_keys = [key for frame in frames for key in frame["key"].tolist()]
+
+    docstore = CompactDocstore(str(source_dir))
+    labels = np.arange(len(docstore), dtype=np.int64) if docstore.labels is None else docstore.labels
+    rows = [docstore.row_for_key(key) for key in upserted_keys]
+    stale_ids = [int(labels[row]) for row in rows if row is not None]
+    n_after = index.ntotal - len(stale_ids) + len(upserted_keys)
+    if (stale_ids and not supports_removal(index_config)) or should_rebuild(index_config, n_after, updatable=True):
+        return None, None
+
+    update = version_update()
+    cache_summary = None
+    if upserted_keys:
+        embedding_vectors, cache_summary = embed_texts(texts, progress)
+        emit(progress, "index", f"Updating FAISS index with {len(upserted_keys)} documents")
+        # 수정된 문서는 FAISS ID를 유지하고, 새 문서는 마지막 ID 다음부터 사용
+        next_id = int(labels[-1]) + 1 if len(labels) else 0
+        ids = np.empty(len(rows), dtype=np.int64)
+        for i, row in enumerate(rows):
+            if row is None:
+                ids[i], next_id = next_id, next_id + 1
+            else:
+                ids[i] = labels[row]
+        if stale_ids:
+            index.remove_ids(np.array(stale_ids, dtype=np.int64))
+        index.add_with_ids(embedding_vectors, ids)
+        add_documents(update, frames, texts, ids)
+
+    stats = {
+        "mode": "incremental",
+        "documents": index.ntotal,
+        "upserted": len(upserted_keys),
+        "index": index_config,
+        "embedding_cache": cache_summary,
+    }
+    return stats, update
 
-embeddings = HuggingFaceEmbeddings(model_name=MODEL_NAME)
 
-def build_vector_database(repo_name: str):
-    """CSV 데이터를 기반으로 벡터 데이터베이스 구축"""
-    project_path = BASE_DIRECTORY / repo_name / "csv"
+def build_vector_database(repo_name: str, progress=None):
+    """
+    저장된 프로젝트 데이터(Parquet/CSV)를 기반으로 벡터 데이터베이스 구축.
+    기존 인덱스가 있으면 동기화에서 기록한 변경분만 반영하고, 없거나 전체 다운로드 후에는 새로 구축.
+    progress 콜백에는 임베딩 배치와 인덱스 구축 단계 이벤트가 전달됨
+    """
+    project_path = BASE_DIRECTORY / repo_name
     print(f"Building vector database for {repo_name}...")
     if not project_path.exists():
-        raise ValueError(f"CSV directory not found for {repo_name}")
-
-    issues_path = project_path / f"{repo_name}_issues.csv"
-    prs_path = project_path / f"{repo_name}_pull_requests.csv"
-    commits_path = project_path / f"{repo_name}_commits.csv"
-
-    if not issues_path.exists() or not prs_path.exists() or not commits_path.exists():
-        raise ValueError("One or more CSV files are missing")
-
-    issues_df = pd.read_csv(issues_path)
-    prs_df = pd.read_csv(prs_path)
-    commits_df = pd.read_csv(commits_path)
-
-    all_texts, metadata, doc_ids = [], [], []
-
-    for _, row in issues_df.iterrows():
-        text = f"Issue: {row['Title']}, State: {row['State']}"
-        all_texts.append(text)
-        metadata.append({"type": "issue", "original_data": row.to_dict()})
-        doc_ids.append(str(row["ID"]))
+        raise ValueError(f"Project directory not found for {repo_name}")
 
-    for _, row in prs_df.iterrows():
-        text = f"PR: {row['Title']}, State: {row['State']}"
-        all_texts.append(text)
-        metadata.append({"type": "pull_request", "original_data": row.to_dict()})
-        doc_ids.append(str(row["ID"]))
-
-    for _, row in commits_df.iterrows():
-        text = f"Commit: {row['Message']}, Author: {row['Author']}"
-        all_texts.append(text)
-        metadata.append({"type": "commit", "original_data": row.to_dict()})
-        doc_ids.append(str(row["ID"]))
-
-    docs = [Document(page_content=text) for text in all_texts]
-
-    embedding_vectors = embeddings.embed_documents(all_texts)
-    embedding_vectors = np.array(embedding_vectors, dtype="float32")
-
-    d = embedding_vectors.shape[1]
-    index = faiss.IndexFlatL2(d)
-    index.add(embedding_vectors)
-
-    doc_dict = {doc_ids[i]: docs[i] for i in range(len(docs))}
-    docstore = InMemoryDocstore(doc_dict)
-    index_to_docstore_id = {str(i): doc_ids[i] for i in range(len(docs))}
-
-    vectorstore = FAISS(
-        embedding_function=embeddings,
-        index=index,
-        docstore=docstore,
-        index_to_docstore_id=index_to_docstore_id,
-    )
+    if any(locate_table(project_path, repo_name, table) is None for table in ("issues", "pull_requests", "commits")):
+        raise ValueError("One or more data files are missing")
 
     vectorstore_dir = BASE_DIRECTORY / repo_name / "vectorstore"
-    vectorstore_dir.mkdir(parents=True, exist_ok=True)
-    vectorstore.save_local(str(vectorstore_dir))
-
-    with open(vectorstore_dir / "metadata.json", "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    source_dir = current_version_dir(vectorstore_dir)
+    # 이 갱신이 반영할 변경분 (갱신 중에 동기화가 기록하는 변경분은 다음 갱신에서 반영)
+    changes = claim_changes(project_path)
+    index, index_config = (None, None) if changes["rebuild"] else load_index(source_dir)
+
+    stats = None
+    if index is not None:
+        stats, update = apply_changes(index, index_config, source_dir, project_path, repo_name, changes, progress)
+    if stats is None:
+        index, index_config, update, stats = rebuild_vectorstore(project_path, repo_name, progress)
+    print(f"Vector database for {repo_name}: {stats}")
+
+    if stats["mode"] == "rebuild" or stats["upserted"]:
+        emit(progress, "index", "Saving vector store")
+        with span("index_save"):
+            stats["version"] = save_vectorstore(index, index_config, update, vectorstore_dir, source_dir)
+    finish_changes(project_path)
 
     return {
         "message": "Vector database built successfully.",
-        "csv_directory": str(project_path),
+        "data_directory": str(project_path),
         "vectorstore_directory": str(vectorstore_dir),
-        "metadata_file": str(vectorstore_dir / "metadata.json")
+        "metadata_file": str(current_version_dir(vectorstore_dir) / METADATA_FILE),
+        "index_update": stats,
+        "embedding_throughput": executor.last_stats
     }
@@ -1,58 +1,116 @@
 # app/services/vectorstore.py
+import asyncio
 import os
-import json
-import faiss
-from langchain.schema import Document
-from langchain.docstore.in_memory import InMemoryDocstore
-from langchain_community.embeddings import SentenceTransformerEmbeddings
-from langchain_community.vectorstores import FAISS as LangchainFAISS
+import numpy as np
 from config import settings
+from services.compact_docstore import load_compact_docstore
+from services.index_versions import current_version_dir
+from services.metrics import span
+from services.index_factory import apply_search_params, load_index_config
+from services.metadata_store import METADATA_FILE, MetadataStore
+from services.query_encoder import get_query_encoder
+from services.search_filters import FilterIndex, filtered_search
+from services.vector_files import LoadTimer, read_index
 
 class VectorStoreService:
-    def __init__(self):
-        self.embeddings = SentenceTransformerEmbeddings(model_name=settings.MODEL_NAME)
-        self.vectorstore_dir = settings.VECTORSTORE_DIR
+    def __init__(self, vectorstore_dir=None, query_encoder=None, project=None, version=None):
+        """
+        vectorstore_dir의 인덱스/docstore/메타데이터 로드 (기본은 settings.VECTORSTORE_DIR의 현재 버전).
+        쿼리 임베딩은 기본으로 프로세스 공용 쿼리 인코더(캐시 + 마이크로 배치) 사용.
+        project/version은 index_registry가 넘겨주는 식별 정보 (응답 캐시 키 등에 사용)
+        """
+        timer = LoadTimer()
+        self.project = project
+        self.version = version
+        self.query_encoder = query_encoder or get_query_encoder(settings.MODEL_NAME)
+        self.embeddings = self.query_encoder.embeddings
+        self.vectorstore_dir = str(vectorstore_dir or current_version_dir(settings.VECTORSTORE_DIR))
 
         # FAISS 인덱스 로드
         faiss_index_path = os.path.join(self.vectorstore_dir, "index.faiss")
         if not os.path.isfile(faiss_index_path):
             raise FileNotFoundError(f"FAISS index file not found at: {faiss_index_path}")
-        self.faiss_index = faiss.read_index(faiss_index_path)
+        # 메모리 매핑으로 읽어 인덱스 전체를 메모리에 복사하지 않음 (INDEX_MMAP)
+        self.faiss_index = read_index(faiss_index_path)
+        # 저장된 인덱스 구성이 있으면 검색 파라미터(nprobe/efSearch) 복원
+        self.index_config = load_index_config(self.vectorstore_dir)
+        if self.index_config is not None:
+            apply_search_params(self.faiss_index, self.index_config)
         print("FAISS 인덱스 로드 완료")
 
-        # docstore.json 로드
-        docstore_path = os.path.join(self.vectorstore_dir, "docstore.json")
-        if not os.path.isfile(docstore_path):
-            raise FileNotFoundError(f"docstore.json 파일을 찾을 수 없습니다: {docstore_path}")
-        with open(docstore_path, "r", encoding="utf-8") as f:
-            doc_dict = json.load(f)
-
-        # Document 객체로 변환
-        reconstructed_docstore = {
-            str(k): Document(page_content=v['page_content'], metadata={"id": str(k)})
-            for k, v in doc_dict.items()
-        }
-        self.docstore = InMemoryDocstore(reconstructed_docstore)
-
-        # index_to_docstore_id.json 로드
-        mapping_path = os.path.join(self.vectorstore_dir, "index_to_docstore_id.json")
-        if not os.path.isfile(mapping_path):
-            raise FileNotFoundError(f"index_to_docstore_id.json 파일을 찾을 수 없습니다: {mapping_path}")
-        with open(mapping_path, "r", encoding="utf-8") as f:
-            index_to_docstore_id_raw = json.load(f)
-        self.index_to_docstore_id = {int(k): str(v) for k, v in index_to_docstore_id_raw.items()}
-
-        # VectorStore 생성
-        self.vectorstore = LangchainFAISS(
-            embedding_function=self.embeddings,
-            index=self.faiss_index,
-            docstore=self.docstore,
-            index_to_docstore_id=self.index_to_docstore_id
-        )
-        print("VectorStore 생성 완료")
-
-    def similarity_search(self, query: str, k: int):
-        return self.vectorstore.similarity_search(query, k=k)
+        # 압축 docstore 로드 (텍스트 파일은 메모리 매핑, docstore.json만 있으면 한 번 변환)
+        self.docstore = load_compact_docstore(self.vectorstore_dir)
+
+        # 메타데이터 저장소 (있으면 검색 결과에 메타데이터를 붙임)
+        metadata_path = os.path.join(self.vectorstore_dir, METADATA_FILE)
+        self.metadata_store = MetadataStore(metadata_path, read_only=True) if os.path.isfile(metadata_path) else None
+        # 타입/상태/작성자/날짜 필터용 ID 집합 사전 계산
+        self.filter_index = FilterIndex(self.metadata_store) if self.metadata_store is not None else None
+        self.load_stats = timer.stop()
+        print(f"VectorStore 생성 완료 ({len(self.docstore)} documents): {self.load_stats}")
+
+    def estimated_bytes(self):
+        """
+        이 벡터 스토어가 차지하는 메모리 추정치: 인덱스 파일 크기 + 필터 인덱스 배열.
+        메모리 매핑된 파일도 검색 중 페이지 캐시에 올라오므로 인덱스 크기를 그대로 계산
+        """
+        total = os.path.getsize(os.path.join(self.vectorstore_dir, "index.faiss"))
+        if self.filter_index is not None:
+            total += self.filter_index.nbytes()
+        return total
+
+    def similarity_search(self, query: str, k: int, filters=None):
+        """
+        검색 결과 상위 k개만 Document로 만들어 반환 (metadata["id"]는 docstore 키).
+        filters(search_filters.normalize_filters)는 FAISS 검색 안에서 적용되며,
+        메타데이터는 상위 k개의 FAISS ID로 한 번에 조회하여 붙임
+        """
+        self.check_filters(filters)
+        with span("query_embedding"):
+            query_vector = self.query_encoder.encode(query)
+        return self.search_by_vector(query_vector, k, filters)
+
+    async def asimilarity_search(self, query: str, k: int, filters=None, query_vector=None):
+        """
+        similarity_search의 비동기 버전. 쿼리 임베딩은 인코더의 배치를 기다리고(query_vector를 주면 생략),
+        FAISS 검색과 docstore/메타데이터 조회는 스레드에서 실행하여 이벤트 루프를 막지 않음
+        """
+        self.check_filters(filters)
+        if query_vector is None:
+            with span("query_embedding"):
+                query_vector = await asyncio.wrap_future(self.query_encoder.encode_async(query))
+        return await asyncio.to_thread(self.search_by_vector, query_vector, k, filters)
+
+    def check_filters(self, filters):
+        """
+        필터를 적용할 수 있는지 확인. 메타데이터 저장소가 없거나
+        인덱스에 없는 타입/상태 값이면 ValueError (라우트에서 400으로 응답)
+        """
+        if not filters:
+            return
+        if self.filter_index is None:
+            raise ValueError("Filtered search requires a metadata store")
+        for field in ("type", "state"):
+            known = self.filter_index.values(field)
+            unknown = sorted(set(filters.get(field) or []) - set(known))
+            if unknown:
+                raise ValueError(f"Unknown {field}: {', '.join(unknown)} (available: {', '.join(known)})")
+
+    def search_by_vector(self, query_vector, k: int, filters=None):
+        """쿼리 벡터 (d,)로 검색해 상위 k개 Document 반환 (metadata["score"]는 L2 거리, 작을수록 유사)"""
+        query_vector = np.asarray(query_vector, dtype=np.float32)[np.newaxis, :]
+        with span("faiss_search"):
+            distances, labels = filtered_search(self.faiss_index, self.filter_index, query_vector, k, filters)
+        with span("docstore_lookup"):
+            documents = self.docstore.documents_for_labels(labels[0])
+            scores = dict(zip(labels[0].tolist(), distances[0].tolist()))
+            for doc in documents:
+                doc.metadata["score"] = scores.get(doc.metadata["label"])
+            if self.metadata_store is not None and documents:
+                metadata = self.metadata_store.get_many(doc.metadata["label"] for doc in documents)
+                for doc in documents:
+                    doc.metadata.update(metadata.get(doc.metadata["label"], {}))
+        return documents
 
     def get_document_content(self, doc_id):
-        return self.docstore.get(doc_id).page_content
+        return self.docstore.get_text(str(doc_id))
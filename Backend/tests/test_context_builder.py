@@ -0,0 +1,60 @@
+"""
+context_builder의 중복 판별과 토큰 예산 테스트
+
+실행: Backend 디렉토리에서 `python -m pytest tests`
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services import context_builder  # noqa: E402
+from services.context_builder import build_context, dedup_signature  # noqa: E402
+
+
+class Doc:
+    """검색 결과 Document 대신 쓰는 최소 객체 (page_content, metadata)"""
+
+    def __init__(self, page_content, doc_id):
+        self.page_content = page_content
+        self.metadata = {"id": doc_id, "score": 0.0}
+
+
+def test_issue_numbers_are_kept():
+    assert dedup_signature("Fix bug 649") != dedup_signature("Fix bug 359")
+    assert dedup_signature("Merge pull request #649") != dedup_signature("Merge pull request #650")
+
+    context = build_context([Doc("Fix bug 649", "issue:649"), Doc("Fix bug 359", "issue:359")], "gpt-4o-mini", 1000)
+    assert [doc["id"] for doc in context["documents"]] == ["issue:649", "issue:359"]
+    assert context["duplicates"] == 0
+    assert "649" in context["context"] and "359" in context["context"]
+
+
+def test_versions_hashes_and_dates_collapse():
+    pairs = [
+        ("Bump lodash from 4.17.20 to 4.17.21", "Bump lodash from 4.17.19 to 4.17.20"),
+        ("Release v2.3.0-rc.1", "Release v2.4.0"),
+        ("Revert 3f9a2c1d0e", "Revert a1b2c3d4e5f60718293a4b5c6d7e8f9012345678"),
+        ("Nightly build 2024-03-01T02:00:00Z", "Nightly build 2024-03-02 02:00:00+09:00"),
+    ]
+    for first, second in pairs:
+        assert dedup_signature(first) == dedup_signature(second), (first, second)
+
+    docs = [Doc("Bump lodash from 4.17.20 to 4.17.21", "commit:a"), Doc("Bump lodash from 4.17.19 to 4.17.20", "commit:b")]
+    context = build_context(docs, "gpt-4o-mini", 1000)
+    assert context["documents"][0]["id"] == "commit:a"
+    assert context["documents"][0]["duplicates"] == ["commit:b"]
+
+
+def test_budget_without_tokenizer(monkeypatch):
+    # tiktoken을 쓸 수 없을 때(오프라인)는 문자 수로 추정
+    monkeypatch.setattr(context_builder, "get_encoding", lambda model_name: None)
+    docs = [Doc("a" * 400, "issue:1"), Doc("b" * 400, "issue:2"), Doc("c" * 20, "issue:3")]
+    context = build_context(docs, "gpt-4o-mini", 110)
+    assert [doc["id"] for doc in context["documents"]] == ["issue:1", "issue:3"]
+    assert context["tokens"] <= 110
+    assert context["dropped"] == 1
+
+    truncated = build_context([Doc("x" * 1000, "issue:1")], "gpt-4o-mini", 10)
+    assert truncated["tokens"] == 10
+    assert len(truncated["context"].strip()) <= 10 * context_builder.CHARS_PER_TOKEN
@@ -0,0 +1,35 @@
+"""
+search_filters의 날짜 구간 테스트
+
+실행: Backend 디렉토리에서 `python -m pytest tests`
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.search_filters import FilterIndex, normalize_filters  # noqa: E402
+
+DATES = ["2024-01-30T10:00:00Z", "2024-01-31T00:00:00Z", "2024-01-31T23:59:59Z", "2024-02-01T00:00:00Z"]
+
+
+class MetadataStub:
+    """FilterIndex가 읽는 filter_columns()만 제공"""
+
+    def filter_columns(self):
+        labels = np.arange(len(DATES), dtype=np.int64)
+        return labels, {"type": ["commit"] * len(DATES), "state": [None] * len(DATES), "author": ["a"] * len(DATES), "date": DATES}
+
+
+def test_date_only_date_to_includes_whole_day():
+    index = FilterIndex(MetadataStub())
+    assert index.labels_for(normalize_filters(date_from="2024-01-31", date_to="2024-01-31")).tolist() == [1, 2]
+    assert index.labels_for(normalize_filters(date_to="2024-01-30")).tolist() == [0]
+
+
+def test_timestamp_date_to_is_exclusive():
+    index = FilterIndex(MetadataStub())
+    assert index.labels_for(normalize_filters(date_to="2024-01-31T23:59:59Z")).tolist() == [0, 1]
+    assert index.labels_for(normalize_filters(date_from="2024-02-01T00:00:00Z")).tolist() == [3]
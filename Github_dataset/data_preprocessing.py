@@ -1,122 +1,104 @@
 import os
+import sys
 import pandas as pd
-import json
-import numpy as np
 import faiss
-from langchain.schema import Document
-from langchain.docstore.in_memory import InMemoryDocstore
-from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.vectorstores import FAISS
+import numpy as np
+
+# Backend의 공용 모듈(services.*) 사용
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Backend"))
+from services.document_builder import build_documents
+from services.embedding_cache import get_embedding_cache
+from services.compact_docstore import CompactDocstore, write_compact_docstore
+from services.index_factory import build_index, save_index_config
+from services.index_versions import new_version_dir, publish_version
+from services.metadata_store import METADATA_FILE, MetadataStore
+from services.model_registry import get_embeddings
+from services.project_store import locate_table, read_table
 
 root_dir = './data'
 all_projects_path = os.path.join(root_dir, "all_projects.csv")
 projects_df = pd.read_csv(all_projects_path)
 
-def issue_to_text(row, project_name):
-    return f"Project: {project_name}, Issue ID: {row['ID']}, Project ID: {row['Project ID']}, Title: {row['Title']}, State: {row['State']}, Created At: {row['Created At']}, Closed At: {row.get('Closed At', 'N/A')}"
-
-def pr_to_text(row, project_name):
-    return f"Project: {project_name}, Pull Request ID: {row['ID']}, Project ID: {row['Project ID']}, Title: {row['Title']}, Author: {row['Author']}, State: {row['State']}, Created At: {row['Created At']}, Merged At: {row.get('Merged At', 'N/A')}, Closed At: {row.get('Closed At', 'N/A')}"
-
-def commit_to_text(row, project_name):
-    return f"Project: {project_name}, Commit ID: {row['ID']}, Project ID: {row['Project ID']}, Author: {row['Author']}, Date: {row['Date']}, Message: {row['Message']}"
+# 테이블 → (문서 타입, 텍스트 템플릿). 자리표시자는 컬럼 이름 또는 project_name
+TEMPLATES = {
+    "issues": ("issue", "Project: {project_name}, Issue ID: {ID}, Project ID: {Project ID}, Title: {Title}, State: {State}, Created At: {Created At}, Closed At: {Closed At}"),
+    "pull_requests": ("pull_request", "Project: {project_name}, Pull Request ID: {ID}, Project ID: {Project ID}, Title: {Title}, Author: {Author}, State: {State}, Created At: {Created At}, Merged At: {Merged At}, Closed At: {Closed At}"),
+    "commits": ("commit", "Project: {project_name}, Commit ID: {ID}, Project ID: {Project ID}, Author: {Author}, Date: {Date}, Message: {Message}"),
+}
 
 all_texts = []
+# 문서 키 (docstore와 메타데이터 저장소가 같은 키 사용)
+all_keys = []
+# (프로젝트, 문서 DataFrame, FAISS ID) 목록. 메타데이터 저장소에 DataFrame 단위로 기록
 metadata = []
 
 for _, proj_row in projects_df.iterrows():
     project_name = proj_row['Name']
     project_dir = os.path.join(root_dir, project_name)
 
-    issues_path = os.path.join(project_dir, f"{project_name}_issues.csv")
-    prs_path = os.path.join(project_dir, f"{project_name}_pull_requests.csv")
-    commits_path = os.path.join(project_dir, f"{project_name}_commits.csv")
-
-    if not os.path.isfile(issues_path):
-        print(f"Warning: {issues_path} not found.")
-        continue
-    if not os.path.isfile(prs_path):
-        print(f"Warning: {prs_path} not found.")
-        continue
-    if not os.path.isfile(commits_path):
-        print(f"Warning: {commits_path} not found.")
+    # Parquet이 있으면 Parquet, 없으면 CSV에서 읽기
+    missing = [t for t in ("issues", "pull_requests", "commits") if locate_table(project_dir, project_name, t) is None]
+    if missing:
+        print(f"Warning: {', '.join(missing)} data not found in {project_dir}.")
         continue
 
-    issues_df = pd.read_csv(issues_path)
-    prs_df = pd.read_csv(prs_path)
-    commits_df = pd.read_csv(commits_path)
-
-    for _, r in issues_df.iterrows():
-        text = issue_to_text(r, project_name)
-        all_texts.append(text)
-        metadata.append({"project_name": project_name, "type": "issue", "original_data": r.to_dict()})
-
-    for _, r in prs_df.iterrows():
-        text = pr_to_text(r, project_name)
-        all_texts.append(text)
-        metadata.append({"project_name": project_name, "type": "pull_request", "original_data": r.to_dict()})
-
-    for _, r in commits_df.iterrows():
-        text = commit_to_text(r, project_name)
-        all_texts.append(text)
-        metadata.append({"project_name": project_name, "type": "commit", "original_data": r.to_dict()})
+    # 문서 텍스트/메타데이터를 컬럼 단위로 생성
+    frames = [
+        build_documents(read_table(project_dir, project_name, table), doc_type, template,
+                        constants={"project_name": project_name})
+        for table, (doc_type, template) in TEMPLATES.items()
+    ]
+    for frame in frames:
+        # 프로젝트가 달라도 키가 겹치지 않도록 프로젝트 이름을 붙임
+        frame.insert(0, "key", project_name + "/" + frame["type"] + ":" + frame["doc_id"])
+        metadata.append((project_name, frame, np.arange(len(all_texts), len(all_texts) + len(frame))))
+        all_texts.extend(frame["text"].tolist())
+        all_keys.extend(frame["key"].tolist())
 
 model_name = "sentence-transformers/all-MiniLM-L6-v2"
-embeddings = HuggingFaceEmbeddings(model_name=model_name)
-
-docs = [Document(page_content=text) for text in all_texts]
+embeddings = get_embeddings(model_name)
 
-doc_dict = {str(i): docs[i] for i in range(len(docs))}
-docstore = InMemoryDocstore(doc_dict)
-
-# 임베딩 벡터 생성
-embedding_vectors = embeddings.embed_documents(all_texts)
-embedding_vectors = np.array(embedding_vectors, dtype='float32')
+# 임베딩 벡터 생성 (캐시에 없는 텍스트만 임베딩)
+embedding_cache = get_embedding_cache(model_name)
+embedding_vectors = embedding_cache.embed(all_texts, embeddings.embed_documents)
+embedding_cache.save()
+print(f"Embedding cache: {embedding_cache.summary()}")
 
 d = embedding_vectors.shape[1]
 print(f"Embedding dimension (d): {d}")
 
-index = faiss.IndexFlatL2(d)
-index.add(embedding_vectors)
+# 벡터 수에 따라 인덱스 종류(Flat/IVF/HNSW/IVF-PQ)와 파라미터 자동 선택
+index, index_config = build_index(embedding_vectors)
 print(f"FAISS index size: {index.ntotal}")
 
-# embedding_function에 Embeddings 객체를 직접 전달
-vectorstore = FAISS(
-    embedding_function=embeddings,
-    index=index,
-    docstore=docstore,
-    index_to_docstore_id={str(i): str(i) for i in range(len(docs))}
-)
-
-vectorstore_dir = "vectorstore_dir"
-os.makedirs(vectorstore_dir, exist_ok=True)
+# 새 버전 디렉토리에 모두 기록한 뒤 공개 (실행 중인 API는 새 버전을 로드해 교체)
+vectorstore_root = "vectorstore_dir"
+vectorstore_dir = str(new_version_dir(vectorstore_root))
 
-# VectorStore 로컬 저장 (index.faiss, index.pkl 포함)
-vectorstore.save_local(vectorstore_dir)
+# FAISS 인덱스 저장 (문서 텍스트는 아래 압축 docstore에만 저장)
+faiss.write_index(index, os.path.join(vectorstore_dir, "index.faiss"))
+# 로더가 검색 파라미터(nprobe/efSearch)를 복원하도록 인덱스 구성 저장
+save_index_config(vectorstore_dir, index_config)
 print("VectorStore saved to vectorstore_dir")
 
-# all_texts_backup.txt 저장
-with open(os.path.join(vectorstore_dir, "all_texts_backup.txt"), "w", encoding="utf-8") as f:
-    for line in all_texts:
-        f.write(line + "\n")
-
-# metadata.json 저장
-with open(os.path.join(vectorstore_dir, "metadata.json"), "w", encoding="utf-8") as f:
-    json.dump(metadata, f, indent=2, ensure_ascii=False)
+# 메타데이터 저장 (SQLite, FAISS ID/문서 키/타입/상태/작성자/날짜로 조회)
+metadata_path = os.path.join(vectorstore_dir, METADATA_FILE)
+metadata_store = MetadataStore(metadata_path)
+for project_name, frame, labels in metadata:
+    metadata_store.add_frame(frame, labels, project=project_name)
+metadata_store.close()
 
-# docstore.json 저장
-# Document 객체는 직렬화 불가하므로 page_content만 추출
-serializable_doc_dict = {k: {"page_content": v.page_content} for k, v in doc_dict.items()}
-with open(os.path.join(vectorstore_dir, "docstore.json"), "w", encoding="utf-8") as f:
-    json.dump(serializable_doc_dict, f, ensure_ascii=False, indent=2)
+# 압축 docstore 저장 (텍스트를 하나의 바이트 파일 + 오프셋 배열로, FAISS ID = 행 번호)
+write_compact_docstore(vectorstore_dir, all_keys, all_texts)
+publish_version(vectorstore_root, vectorstore_dir)
 
-print("Files saved to vectorstore_dir:")
+print(f"Files saved to {vectorstore_dir}:")
 print(" - index.faiss")
-print(" - all_texts_backup.txt")
-print(" - metadata.json")
-print(" - docstore.json")
-
-# 문서 확인: InMemoryDocstore는 search(key) 메서드를 통해 문서 접근
-for i in range(min(5, len(docs))):
-    doc = docstore.search(str(i))
-    print(f"Document {i}: {doc}")
+print(" - index_config.json")
+print(f" - {METADATA_FILE}")
+print(" - docs_text.bin, docs_keys.bin (+ offsets)")
+
+# 문서 확인: FAISS ID(행 번호)로 압축 docstore에서 조회
+docstore = CompactDocstore(vectorstore_dir)
+for doc in docstore.documents_for_labels(np.arange(min(5, len(docstore)))):
+    print(f"Document {doc.metadata['label']}: {doc}")
@@ -1,81 +1,79 @@
 import os
+import sys
 import pandas as pd
-import numpy as np
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
-import faiss
 from langchain.docstore.in_memory import InMemoryDocstore
 
-# HuggingFace Embeddings 설정
-EMBEDDINGS = HuggingFaceEmbeddings(model_name="intfloat/multilingual-e5-small")
-
-
-def process_csv(file_path, data_type, project_name):
-    df = pd.read_csv(file_path)
-    documents = []
-    
-    if data_type == "commits":
-        for _, row in df.iterrows():
-            content = f"Commit Message: {row['Message']} (Author: {row['Author']}, Date: {row['Date']})"
-            metadata = {"type": "commit", "author": row["Author"], "date": row["Date"], "project": project_name}
-            documents.append(Document(page_content=content, metadata=metadata))
-    
-    elif data_type == "pull_requests":
-        for _, row in df.iterrows():
-            content = (
-                f"PR Title: {row['Title']} (Author: {row['Author']}, State: {row['State']}, "
-                f"Created At: {row['Created At']}, Merged At: {row.get('Merged At', 'N/A')}, "
-                f"Closed At: {row.get('Closed At', 'N/A')})"
-            )
-            metadata = {
-                "type": "pull_request",
-                "author": row["Author"],
-                "state": row["State"],
-                "created_at": row["Created At"],
-                "merged_at": row.get("Merged At", None),
-                "closed_at": row.get("Closed At", None),
-                "project": project_name
-            }
-            documents.append(Document(page_content=content, metadata=metadata))
-    
-    elif data_type == "issues":
-        for _, row in df.iterrows():
-            content = (
-                f"Issue Title: {row['Title']} (State: {row['State']}, Created At: {row['Created At']}, "
-                f"Closed At: {row.get('Closed At', 'N/A')})"
-            )
-            metadata = {
-                "type": "issue",
-                "state": row["State"],
-                "created_at": row["Created At"],
-                "closed_at": row.get("Closed At", None),
-                "project": project_name
-            }
-            documents.append(Document(page_content=content, metadata=metadata))
-    
-    elif data_type == "contributors":
-        for _, row in df.iterrows():
-            content = f"Contributor: {row['Name']} (Commits: {row['Commit Count']})"
-            metadata = {"type": "contributor", "name": row["Name"], "commits": row["Commit Count"], "project": project_name}
-            documents.append(Document(page_content=content, metadata=metadata))
-    
-    return documents
-
+# Backend의 공용 모듈(services.*) 사용
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Backend"))
+from services.document_builder import build_documents, metadata_frame
+from services.embedding_cache import get_embedding_cache
+from services.embedding_executor import EmbeddingExecutor
+from services.index_factory import build_index, save_index_config
+from services.model_registry import get_embeddings
+from services.vector_files import save_vectors
+from services.project_store import locate_table, read_table
 
-def create_vectorstore_for_project(project_path, project_name, output_dir):
+# HuggingFace Embeddings 설정
+MODEL_NAME = "intfloat/multilingual-e5-small"
+
+
+# 데이터 타입 → (문서 타입, 텍스트 템플릿, {메타데이터 키: 원본 컬럼})
+TEMPLATES = {
+    "commits": (
+        "commit",
+        "Commit Message: {Message} (Author: {Author}, Date: {Date})",
+        {"author": "Author", "date": "Date"},
+    ),
+    "pull_requests": (
+        "pull_request",
+        "PR Title: {Title} (Author: {Author}, State: {State}, Created At: {Created At}, "
+        "Merged At: {Merged At}, Closed At: {Closed At})",
+        {"author": "Author", "state": "State", "created_at": "Created At",
+         "merged_at": "Merged At", "closed_at": "Closed At"},
+    ),
+    "issues": (
+        "issue",
+        "Issue Title: {Title} (State: {State}, Created At: {Created At}, Closed At: {Closed At})",
+        {"state": "State", "created_at": "Created At", "closed_at": "Closed At"},
+    ),
+    "contributors": (
+        "contributor",
+        "Contributor: {Name} (Commits: {Commit Count})",
+        {"name": "Name", "commits": "Commit Count"},
+    ),
+}
+
+
+def process_csv(project_path, data_type, project_name):
+    if data_type not in TEMPLATES:
+        return []
+    # Parquet이 있으면 Parquet, 없으면 CSV에서 읽기
+    df = read_table(project_path, project_name, data_type)
+
+    # 텍스트와 메타데이터는 컬럼 단위로 만들고, Document 객체만 마지막에 생성
+    doc_type, template, metadata_columns = TEMPLATES[data_type]
+    frame = build_documents(df, doc_type, template, metadata_columns=metadata_columns)
+    metadata = metadata_frame(frame).assign(type=doc_type, project=project_name).to_dict("records")
+    return [Document(page_content=text, metadata=meta) for text, meta in zip(frame["text"].tolist(), metadata)]
+
+
+def create_vectorstore_for_project(project_path, project_name, output_dir, executor):
+    """
+    프로젝트의 문서를 임베딩해 벡터 스토어 저장.
+    executor(EmbeddingExecutor)는 호출하는 쪽에서 만들어 여러 프로젝트에 재사용
+    """
     data_types = ["commits", "pull_requests", "contributors", "issues"]
     all_documents = []
 
     for data_type in data_types:
-        file_path = os.path.join(project_path, f"{project_name}_{data_type}.csv")
-        
-        if not os.path.exists(file_path):
-            print(f"File not found: {file_path}")
+        if locate_table(project_path, project_name, data_type) is None:
+            print(f"File not found: {project_name}_{data_type} in {project_path}")
             continue
 
-        documents = process_csv(file_path, data_type, project_name)
+        documents = process_csv(project_path, data_type, project_name)
         if not documents:
             print(f"No {data_type} data found for project: {project_name}")
             continue
@@ -95,34 +93,22 @@ def create_vectorstore_for_project(project_path, project_name, output_dir):
         print(f"No chunked documents for project: {project_name}")
         return
 
-    # 임베딩 계산
+    # 임베딩 계산 (캐시에 없는 텍스트만 임베딩)
     doc_texts = [doc.page_content for doc in chunked_documents]
-    vectors = EMBEDDINGS.embed_documents(doc_texts)
-    vectors_np = np.array(vectors, dtype=np.float32)
+    vectors_np = get_embedding_cache(MODEL_NAME).embed(doc_texts, executor.embed)
 
     # 임베딩 저장
     os.makedirs(output_dir, exist_ok=True)
     project_dir = os.path.join(output_dir, project_name)
     os.makedirs(project_dir, exist_ok=True)
     embeddings_file_path = os.path.join(project_dir, f"embeddings.npy")
-    np.save(embeddings_file_path, vectors_np)
+    # VECTOR_PRECISION에 따라 float32/float16/int8로 저장 (로더는 mmap으로 읽음)
+    save_vectors(embeddings_file_path, vectors_np)
     print(f"Embeddings for {project_name} saved to {embeddings_file_path}")
 
-    # 클러스터 수 동적 설정
-    num_vectors = len(vectors_np)
-    min_training_per_cluster = 10  # 각 클러스터당 최소 벡터 수
-    nlist = max(1, min(30, num_vectors // min_training_per_cluster))  # 동적 클러스터 수 설정
-
-    print(f"Creating FAISS IVF index with nlist={nlist} for project: {project_name}")
-
-    # IVF 인덱스 생성
-    D = vectors_np.shape[1]
-    quantizer = faiss.IndexFlatL2(D)
-    ivf_index = faiss.IndexIVFFlat(quantizer, D, nlist, faiss.METRIC_L2)
-    
-    # IVF 인덱스 훈련 (벡터 수가 적으면 nlist(클러스터 수)를 줄여야 함)
-    ivf_index.train(vectors_np)
-    ivf_index.add(vectors_np)
+    # 벡터 수와 메모리/지연 예산으로 인덱스 종류, nlist/nprobe 등을 자동 선택하고 학습
+    print(f"Creating FAISS index for project: {project_name}")
+    index, index_config = build_index(vectors_np)
 
     # docstore 생성
     docstore_records = {}
@@ -135,17 +121,18 @@ def create_vectorstore_for_project(project_path, project_name, output_dir):
 
     # VectorStore 생성 (texts, metadatas 인자 대신 docstore 사용)
     vectorstore = FAISS(
-        embedding_function=EMBEDDINGS.embed_query,
-        index=ivf_index,
+        embedding_function=get_embeddings(MODEL_NAME).embed_query,
+        index=index,
         docstore=docstore,
         index_to_docstore_id=index_to_docstore_id
     )
 
     vectorstore.save_local(os.path.join(output_dir, f"{project_name}"))
-    print(f"IVF Vectorstore for {project_name} saved in {output_dir}")
+    save_index_config(os.path.join(output_dir, f"{project_name}"), index_config)
+    print(f"{index_config['type'].upper()} Vectorstore for {project_name} saved in {output_dir}")
 
 
-def process_all_projects(base_dir, output_dir):
+def process_all_projects(base_dir, output_dir, executor):
     projects_file = os.path.join(base_dir, "all_projects.csv")
     if not os.path.exists(projects_file):
         print(f"File not found: {projects_file}")
@@ -164,11 +151,22 @@ def process_all_projects(base_dir, output_dir):
             print(f"Project directory not found: {project_path}")
             continue
 
-        create_vectorstore_for_project(project_path, project_name, output_dir)
+        create_vectorstore_for_project(project_path, project_name, output_dir, executor)
 
 
-# 실행
+# 실행 (임베딩 워커는 spawn으로 이 모듈을 다시 import하므로 실행 코드는 main에서만)
 BASE_DIR = "./data"
 OUTPUT_DIR = "./vectorstores_npy_cluster"
 
-process_all_projects(base_dir=BASE_DIR, output_dir=OUTPUT_DIR)
+if __name__ == "__main__":
+    # 워커 수/배치 크기는 EMBED_WORKERS, EMBED_BATCH_SIZE 환경 변수로 설정
+    executor = EmbeddingExecutor(MODEL_NAME, local_embeddings=get_embeddings(MODEL_NAME))
+    try:
+        process_all_projects(base_dir=BASE_DIR, output_dir=OUTPUT_DIR, executor=executor)
+    finally:
+        executor.shutdown()
+
+    # 임베딩 캐시 저장
+    embedding_cache = get_embedding_cache(MODEL_NAME)
+    embedding_cache.save()
+    print(f"Embedding cache: {embedding_cache.summary()}")
@@ -2,20 +2,26 @@ import requests
 import random
 import csv
 import os
+import sys
 import shutil
 
 from dotenv import load_dotenv
 
+# Backend의 공용 모듈(services.*) 사용
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Backend"))
+from services.rate_limiter import GitHubAPIError, RateLimitScheduler
+
 # Load the .env file
 load_dotenv()
 
 # Get the token from the environment variable
 TOKEN = os.getenv("GITHUB_TOKEN")
+# 여러 토큰을 쉼표로 구분하여 지정하면 남은 한도에 따라 번갈아 사용
+TOKENS = [t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",") if t.strip()] or [TOKEN]
 
-# 인증 헤더
-HEADERS = {
-    "Authorization": f"Bearer {TOKEN}"
-}
+# 토큰별 남은 한도를 추적하는 요청 스케줄러와 커넥션 재사용용 세션
+SCHEDULER = RateLimitScheduler(TOKENS)
+SESSION = requests.Session()
 
 # GitHub Search API URL
 SEARCH_URL = "https://api.github.com/search/repositories"
@@ -29,7 +35,7 @@ def get_random_project():
     }
 
 
-    response = requests.get(SEARCH_URL, headers=HEADERS, params=params)
+    response = SCHEDULER.request(SESSION, SEARCH_URL, params=params, resource="search")
 
     if response.status_code == 200:
         projects = response.json().get("items", [])
@@ -52,7 +58,8 @@ def fetch_all_data(url, params=None):
         # 페이지 번호 추가
         params.update({"per_page": 100, "page": page})
         
-        response = requests.get(url, headers=HEADERS, params=params)
+        # 한도 초과/2차 제한은 스케줄러가 대기 후 재시도
+        response = SCHEDULER.request(SESSION, url, params=params)
         if response.status_code == 200:
             data = response.json()
             if not data:  # 더 이상 데이터가 없으면 종료
@@ -60,8 +67,8 @@ def fetch_all_data(url, params=None):
             all_data.extend(data)
             page += 1
         else:
-            print(f"Error fetching data from {url}: {response.status_code}")
-            break
+            # 일부만 받은 채로 CSV가 저장되지 않도록 실패 처리
+            raise GitHubAPIError(response.status_code, url, f"(page {page})")
     return all_data
 
 def get_project_details(owner, repo):
@@ -69,7 +76,7 @@ def get_project_details(owner, repo):
     base_url = f"https://api.github.com/repos/{owner}/{repo}"
 
     # 리포지토리 기본 정보
-    repo_info = requests.get(base_url, headers=HEADERS).json()
+    repo_info = SCHEDULER.request(SESSION, base_url).json()
 
     # 모든 커밋 데이터
     commits = fetch_all_data(f"{base_url}/commits")
@@ -239,4 +246,5 @@ if __name__ == "__main__":
 
 
     print(f"Successfully downloaded {downloaded_projects} projects!")
+    print(f"Rate limit stats: {SCHEDULER.metrics()}")
 
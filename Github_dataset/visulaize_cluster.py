@@ -1,12 +1,15 @@
 import os
-import numpy as np
+import sys
 import faiss
 import matplotlib.pyplot as plt
 from sklearn.manifold import TSNE
 from langchain.schema import Document
 from langchain.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
+
+# Backend의 공용 모듈(services.*) 사용
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Backend"))
+from services.vector_files import load_vectors, read_index
 
 def visualize_faiss_clusters_all_projects(output_dir, n_components=2, perplexity_default=30, random_state=42):
     """
@@ -18,9 +21,6 @@ def visualize_faiss_clusters_all_projects(output_dir, n_components=2, perplexity
         perplexity_default (float): 기본 TSNE의 perplexity 값
         random_state (int): TSNE의 랜덤 상태
     """
-    # HuggingFace Embeddings 설정 (이미 임베딩이 완료된 상태이므로 실제로는 필요 없음)
-    EMBEDDINGS = HuggingFaceEmbeddings(model_name="intfloat/multilingual-e5-small")
-    
     # 프로젝트 리스트 가져오기
     projects = [d for d in os.listdir(output_dir) if os.path.isdir(os.path.join(output_dir, d))]
     
@@ -39,14 +39,14 @@ def visualize_faiss_clusters_all_projects(output_dir, n_components=2, perplexity
         
         # FAISS 인덱스 로드
         try:
-            index = faiss.read_index(index_path)
+            index = read_index(index_path)
         except Exception as e:
             print(f"프로젝트 {project}의 FAISS 인덱스 로드 중 오류 발생: {e}")
             continue
         
         # 임베딩 로드
         try:
-            embeddings = np.load(embeddings_path).astype('float32')  # FAISS는 float32 타입을 사용
+            embeddings = load_vectors(embeddings_path).get()  # float16/int8로 저장되어 있어도 float32로 복원
         except Exception as e:
             print(f"프로젝트 {project}의 임베딩 로드 중 오류 발생: {e}")
             continue
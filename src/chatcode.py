@@ -1,5 +1,6 @@
 import os
 import subprocess
+import sys
 from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
@@ -7,10 +8,13 @@ from fastapi import FastAPI
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
 
-# HuggingFace Embeddings 설정
-EMBEDDINGS = HuggingFaceEmbeddings(model_name="intfloat/multilingual-e5-small")
+# Backend의 공용 모듈(services.*) 사용
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Backend"))
+from services.model_registry import get_embeddings
+
+# HuggingFace Embeddings 설정 (프로세스 안에서 한 번만 로드되는 공유 모델)
+EMBEDDINGS = get_embeddings("intfloat/multilingual-e5-small")
 
 # FastAPI 앱 생성
 app = FastAPI()